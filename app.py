@@ -26,43 +26,59 @@ try:
     from routes.admin_routes import admin_bp
     from routes.officer_routes import officer_bp
     from routes.vendor_routes import vendor_bp
+    from routes.blob_routes import blob_bp
 except Exception as e:
     import traceback
     IMPORT_ERROR = f"{type(e).__name__}: {str(e)}\n{traceback.format_exc()}"
     print(f"CRITICAL IMPORT ERROR: {IMPORT_ERROR}")
-    auth_bp = complaint_bp = admin_bp = officer_bp = vendor_bp = None
+    auth_bp = complaint_bp = admin_bp = officer_bp = vendor_bp = blob_bp = None
 
 app = Flask(__name__)
 app.config.from_object(Config)
 
+# Faster JSON encoding for large RealDictCursor payloads (Decimal / datetime handled natively)
+from utils.json_provider import init_app as init_json_provider
+init_json_provider(app)
+
+# gzip / brotli for large responses. Registered before the other after_request hooks so it runs
+# last and compresses the final body.
+from utils.compression import init_app as init_compression
+init_compression(app)
+
 # Robust CORS configuration
 CORS(app, resources={r"/*": {
     "origins": "*",
     "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-    "allow_headers": ["Content-Type", "Authorization", "Access-Control-Allow-Origin"]
+    "allow_headers": ["Content-Type", "Authorization", "Access-Control-Allow-Origin", "X-Last-Write"],
+    "expose_headers": ["X-Last-Write"]
 }})
 
 @app.after_request
 def after_request(response):
     response.headers.add('Access-Control-Allow-Origin', '*')
-    response.headers.add('Access-Control-Allow-Headers', 'Content-Type,Authorization')
+    response.headers.add('Access-Control-Allow-Headers', 'Content-Type,Authorization,X-Last-Write')
     response.headers.add('Access-Control-Allow-Methods', 'GET,PUT,POST,DELETE,OPTIONS')
     return response
 
-# Migration helper from database.py
-from database import run_db_migrations
+# One pooled connection + one transaction per request, committed or rolled back at the end.
+# Registered after the CORS hook so it runs first and a commit-failure response still gets CORS headers.
+import database
+database.init_app(app)
 
-# Run migrations once on startup
-print("Starting database migrations...")
+# Versioned migrations: a single fingerprint check when the schema is already current
+from migrations import run_db_migrations
+
+print("Checking database migrations...")
 run_db_migrations()
 
 # Register Blueprints only if they were imported successfully
-if all([auth_bp, complaint_bp, admin_bp, officer_bp, vendor_bp]):
+if all([auth_bp, complaint_bp, admin_bp, officer_bp, vendor_bp, blob_bp]):
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
     app.register_blueprint(complaint_bp, url_prefix='/api')
     app.register_blueprint(admin_bp, url_prefix='/api/admin')
     app.register_blueprint(officer_bp, url_prefix='/api/officer')
     app.register_blueprint(vendor_bp, url_prefix='/api/vendor')
+    app.register_blueprint(blob_bp, url_prefix='/api/blobs')
 else:
     print(f"⚠️ Warning: Some blueprints failed to load. Migration still attempted. Error: {IMPORT_ERROR}")
 
@@ -75,17 +91,22 @@ def home():
         "import_error": IMPORT_ERROR
     }
 
+@app.errorhandler(413)
+def handle_413(e):
+    return {"success": False, "message": "Request body too large", "data": None}, 413
+
 @app.errorhandler(500)
 def handle_500(e):
     return {"status": "error", "message": "Internal Server Error", "details": str(e)}, 500
 
 @app.route('/api/db-check')
 def db_check():
-    from database import get_db_connection
+    from database import get_db_connection, get_pool_stats, get_replica_stats
     conn = get_db_connection()
     if conn:
         conn.close()
-        return {"status": "success", "message": "Database connection successful"}, 200
+        return {"status": "success", "message": "Database connection successful", "pool": get_pool_stats(),
+                "replicas": get_replica_stats()}, 200
     else:
         return {"status": "error", "message": "Database connection failed. Check server logs."}, 500
 
@@ -0,0 +1,230 @@
+"""
+ASGI entry point for the async serving mode:
+
+    pip install -r requirements-async.txt
+    uvicorn asgi:app --workers 4
+
+The hot, polled reads (the citizen / vendor / officer lists, the vendor marketplace, the
+admin listing and the complaint detail) are answered by async handlers over
+async_database, so a request waiting on Neon holds no thread. They build the same SQL,
+ETags, envelopes and compression as the Flask routes. Every other route and method goes to
+the Flask app from app.py, run in a thread pool of ASGI_WSGI_WORKERS, so the API is the
+same in both modes and the WSGI deployment (gunicorn app:app, Vercel) is unchanged.
+
+Only those six GET endpoints scale past the thread pool. Writes, exports, blob transfers,
+the remaining reads and the Server-Sent Events streams still take one of the
+ASGI_WSGI_WORKERS threads (default 16) each while they run - an open event stream holds
+its thread for as long as the client stays connected. Size ASGI_WSGI_WORKERS for those, or
+keep event streams on a separate WSGI deployment.
+"""
+from contextlib import asynccontextmanager
+from a2wsgi import WSGIMiddleware
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import Response
+from starlette.routing import Mount, Route
+from werkzeug.datastructures import MultiDict
+from werkzeug.http import parse_accept_header, parse_etags
+from config import Config
+from database import LAST_WRITE_COOKIE, LAST_WRITE_HEADER, wrote_recently
+from app import app as flask_app
+from routes.admin_routes import complaint_filters
+from routes.complaint_routes import can_view
+from models.async_complaint_model import AsyncComplaint
+from models.async_vendor_model import AsyncVendor
+import async_database
+from utils.auth_middleware import verify_token
+from utils.compression import choose_encoding, compress_body
+from utils.conditional import compute_etag
+from utils.json_provider import dumps_bytes
+from utils.pagination import parse_limit, parse_fields, encode_cursor, decode_cursor, decode_since
+from utils.sync import sync_list_async
+
+# Same headers the Flask after_request hook adds
+CORS_HEADERS = {
+    "Access-Control-Allow-Origin": "*",
+    "Access-Control-Allow-Headers": "Content-Type,Authorization,X-Last-Write",
+    "Access-Control-Allow-Methods": "GET,PUT,POST,DELETE,OPTIONS",
+}
+
+
+def json_response(request, body, status_code=200, etag=None):
+    data = dumps_bytes(body)
+    headers = dict(CORS_HEADERS)
+    if etag:
+        headers["ETag"] = f'W/"{etag}"'
+        headers["Cache-Control"] = "private, no-cache"
+    if Config.COMPRESSION_ENABLED:
+        headers["Vary"] = "Accept-Encoding"
+        encoding = choose_encoding(parse_accept_header(request.headers.get("accept-encoding")))
+        compressed = compress_body(data, encoding) if encoding else None
+        if compressed is not None:
+            data = compressed
+            headers["Content-Encoding"] = encoding
+    return Response(data, status_code=status_code, headers=headers, media_type="application/json")
+
+
+def success_response(request, data=None, meta=None, etag=None):
+    body = {"success": True, "message": "Success", "data": data}
+    if meta is not None:
+        body["meta"] = meta
+    return json_response(request, body, etag=etag)
+
+
+def error_response(request, message, status_code=400):
+    return json_response(request, {"success": False, "message": message, "data": None}, status_code)
+
+
+def not_modified_response(etag):
+    return Response(status_code=304, headers=dict(CORS_HEADERS, **{
+        "ETag": f'W/"{etag}"', "Cache-Control": "private, no-cache",
+    }))
+
+
+def etag_matches(request, etag):
+    return etag is not None and parse_etags(request.headers.get("if-none-match")).contains_weak(etag)
+
+
+def query_args(request):
+    return MultiDict(request.query_params.multi_items())
+
+
+def authenticated(role=None):
+    """token_required (+ role_required) for async handlers; the payload is passed as `user`."""
+    def decorator(handler):
+        async def endpoint(request):
+            header = request.headers.get("authorization", "")
+            token = header.split(" ")[1] if header.startswith("Bearer ") else None
+            if not token:
+                return json_response(request, {'message': 'Token is missing!', 'success': False}, 403)
+            try:
+                # A token-cache miss looks the token up in the revocation tables (blocking psycopg2)
+                user = await run_in_threadpool(verify_token, token)
+            except Exception:
+                return json_response(request, {'message': 'Token is invalid!', 'success': False}, 403)
+            if role and user.get('role') != role:
+                return json_response(request, {'message': f'Access denied: {role} role required', 'success': False}, 403)
+            last_write = request.cookies.get(LAST_WRITE_COOKIE) or request.headers.get(LAST_WRITE_HEADER)
+            with async_database.read_routing(primary=wrote_recently(last_write)):
+                return await handler(request, user)
+        return endpoint
+    return decorator
+
+
+def sync_list_endpoint(scope, fetch, role=None):
+    """/complaints/my, /vendor/my-jobs and /officer/assigned: ETag check, then a delta-sync listing."""
+    @authenticated(role)
+    async def endpoint(request, user):
+        args = query_args(request)
+        try:
+            since = decode_since(args['since']) if args.get('since') else None
+        except ValueError as e:
+            return error_response(request, str(e), 400)
+        version = await AsyncComplaint.list_version(scope, user['id'], reader_id=user['id'])
+        etag = compute_etag(request.url.path, args.items(multi=True), version, user['id'])
+        if etag_matches(request, etag):
+            return not_modified_response(etag)
+        fields = parse_fields(args.get('fields'))
+        try:
+            rows, meta = await sync_list_async(scope, user['id'], since,
+                                               lambda since: fetch(user['id'], fields, since))
+        except ValueError as e:
+            return error_response(request, str(e), 400)
+        if rows is None:
+            return error_response(request, "Retrieval Error: database query failed", 500)
+        return success_response(request, rows, meta=meta, etag=etag)
+    return endpoint
+
+
+@authenticated()
+async def get_complaint(request, user):
+    complaint, ok = await AsyncComplaint.get_by_id(request.path_params['complaint_id'], user['id'])
+    if not ok:
+        return error_response(request, "Retrieval Error: database query failed", 500)
+    if not complaint or not can_view(user, complaint):
+        return error_response(request, "Complaint not found", 404)
+    return success_response(request, complaint)
+
+
+@authenticated('vendor')
+async def get_available_jobs(request, user):
+    try:
+        vendor = await AsyncVendor.get_by_user_id(user['id'])
+    except Exception as e:
+        print(f"Error fetching vendor: {e}")
+        return error_response(request, "Retrieval Error: database query failed", 500)
+    if not vendor or not vendor['verified']:
+        return error_response(request, "Vendor not verified. Please contact admin.", 403)
+
+    args = query_args(request)
+    try:
+        after = decode_cursor(args['cursor']) if args.get('cursor') else None
+    except ValueError as e:
+        return error_response(request, str(e), 400)
+    limit = parse_limit(args.get('limit'))
+    service_type = vendor['service_type'] if args.get('match_service') == '1' else None
+    exclude_quoted = args.get('exclude_quoted') == '1'
+
+    try:
+        jobs, has_more = await AsyncComplaint.get_available_for_vendor(
+            user['id'], service_type, exclude_quoted, after, limit, parse_fields(args.get('fields'))
+        )
+    except ValueError as e:
+        return error_response(request, str(e), 400)
+    if jobs is None:
+        return error_response(request, "Retrieval Error: database query failed", 500)
+
+    next_cursor = encode_cursor(jobs[-1]['created_at'], jobs[-1]['id']) if has_more else None
+    return success_response(request, jobs, meta={"next_cursor": next_cursor, "limit": limit})
+
+
+@authenticated('admin')
+async def get_all_complaints(request, user):
+    args = query_args(request)
+    try:
+        filters = complaint_filters(args)
+        after = decode_cursor(args['cursor']) if args.get('cursor') else None
+    except ValueError as e:
+        return error_response(request, str(e), 400)
+    limit = parse_limit(args.get('limit'))
+
+    version = await AsyncComplaint.list_version('admin', filters=filters, reader_id=user['id'])
+    etag = compute_etag(request.url.path, args.items(multi=True), version)
+    if etag_matches(request, etag):
+        return not_modified_response(etag)
+
+    try:
+        complaints, has_more = await AsyncComplaint.get_page(
+            filters, after, limit, parse_fields(args.get('fields')), reader_id=user['id']
+        )
+    except ValueError as e:
+        return error_response(request, str(e), 400)
+    if complaints is None:
+        return error_response(request, "Retrieval Error: database query failed", 500)
+
+    next_cursor = encode_cursor(complaints[-1]['created_at'], complaints[-1]['id']) if has_more else None
+    return success_response(request, complaints, meta={"next_cursor": next_cursor, "limit": limit}, etag=etag)
+
+
+@asynccontextmanager
+async def lifespan(app):
+    await async_database.open_pools()
+    try:
+        yield
+    finally:
+        await async_database.close_pools()
+
+
+# Only GET (and HEAD) is matched here; other methods on these paths fall through to Flask
+app = Starlette(
+    routes=[
+        Route('/api/complaints/my', sync_list_endpoint('user', AsyncComplaint.get_by_user), methods=['GET']),
+        Route('/api/complaints/{complaint_id:int}', get_complaint, methods=['GET']),
+        Route('/api/vendor/available', get_available_jobs, methods=['GET']),
+        Route('/api/vendor/my-jobs', sync_list_endpoint('vendor', AsyncComplaint.get_by_vendor, 'vendor'), methods=['GET']),
+        Route('/api/officer/assigned', sync_list_endpoint('officer', AsyncComplaint.get_assigned_to_officer, 'officer'), methods=['GET']),
+        Route('/api/admin/complaints', get_all_complaints, methods=['GET']),
+        Mount('/', app=WSGIMiddleware(flask_app, workers=Config.ASGI_WSGI_WORKERS)),
+    ],
+    lifespan=lifespan,
+)
@@ -0,0 +1,158 @@
+"""
+Async database access for the ASGI serving mode (see asgi.py).
+
+psycopg 3's AsyncConnectionPool plays the part of database.ConnectionPool: a request waiting
+for Postgres awaits instead of holding a thread, so one process can keep thousands of
+requests in flight over ASYNC_DB_POOL_MAX connections. Read replicas, read-your-writes and
+the DB_PREPARED_STATEMENTS switch behave as in database.py / utils/prepared.py; psycopg 3
+prepares frequently run queries on its own, so no statement registry is needed here.
+
+The psycopg / psycopg_pool packages are only needed for this mode (requirements-async.txt).
+"""
+import itertools
+import time
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from config import Config
+from database import normalize_dsn, is_recent_writer
+from utils import prepared
+
+try:
+    from psycopg.rows import dict_row
+    from psycopg_pool import AsyncConnectionPool
+except ImportError:
+    dict_row = AsyncConnectionPool = None
+
+_pool = None
+_replica_pools = []
+_replica_down_until = {}     # index -> monotonic time it may be retried
+_replica_turn = itertools.count()
+
+# Per-request read routing set by asgi.py (see read_routing); None outside a request
+_routing = ContextVar("read_routing", default=None)
+
+
+def available():
+    return AsyncConnectionPool is not None
+
+
+def _make_pool(url, min_size, timeout):
+    return AsyncConnectionPool(
+        normalize_dsn(url),
+        min_size=min_size,
+        max_size=max(1, Config.ASYNC_DB_POOL_MAX, min_size),
+        timeout=timeout,
+        max_lifetime=Config.DB_POOL_MAX_LIFETIME,
+        max_idle=Config.DB_POOL_CHECK_INTERVAL * 10,
+        # Same checks as ConnectionPool: idle connections dropped by Neon are replaced on checkout
+        check=AsyncConnectionPool.check_connection,
+        kwargs={
+            "row_factory": dict_row,
+            "connect_timeout": 10,
+            # None turns psycopg's automatic server-side prepare off (transaction poolers)
+            "prepare_threshold": 5 if prepared.enabled(url) else None,
+        },
+        open=False,
+    )
+
+
+async def open_pools():
+    """Opens the primary (and replica) pools; called once from the ASGI lifespan."""
+    global _pool, _replica_pools
+    if not available():
+        raise RuntimeError("The async serving mode needs psycopg[pool] (pip install -r requirements-async.txt)")
+    if not Config.DATABASE_URL:
+        print("CRITICAL: DATABASE_URL is not set.")
+        return
+    _pool = _make_pool(Config.DATABASE_URL, Config.ASYNC_DB_POOL_MIN, Config.ASYNC_DB_POOL_TIMEOUT)
+    _replica_pools = [_make_pool(url, 0, Config.REPLICA_POOL_TIMEOUT) for url in Config.DATABASE_REPLICA_URLS]
+    _replica_down_until.clear()
+    # wait=False: start serving even if Neon is still waking up; requests wait for connections instead
+    for pool in [_pool] + _replica_pools:
+        await pool.open(wait=False)
+
+
+async def close_pools():
+    global _pool, _replica_pools
+    for pool in ([_pool] if _pool else []) + _replica_pools:
+        await pool.close()
+    _pool, _replica_pools = None, []
+
+
+def get_async_pool_stats():
+    if _pool is None:
+        return None
+    return {"primary": _pool.get_stats(), "replicas": [pool.get_stats() for pool in _replica_pools]}
+
+
+@contextmanager
+def read_routing(primary=False):
+    """
+    Scope of one request: reads go to the primary when `primary` (the client wrote recently),
+    otherwise all of them to the same replica, like database._get_replica_connection pins one.
+    """
+    token = _routing.set({"primary": primary, "replica": None})
+    try:
+        yield
+    finally:
+        _routing.reset(token)
+
+
+async def _replica_connection():
+    routing = _routing.get()
+    if routing and routing["replica"] is not None:
+        candidates = [routing["replica"]]
+    else:
+        start = next(_replica_turn)
+        candidates = [(start + offset) % len(_replica_pools) for offset in range(len(_replica_pools))]
+    for index in candidates:
+        if _replica_down_until.get(index, 0) > time.monotonic():
+            continue
+        pool = _replica_pools[index]
+        try:
+            conn = await pool.getconn()
+            if routing:
+                routing["replica"] = index
+            return pool, conn
+        except Exception as err:
+            # psycopg_pool reports an unreachable server as a timeout too, so any failure skips it
+            print(f"WARNING: Read replica {index} unavailable, skipping it for {Config.REPLICA_RETRY_SECONDS}s: {err}")
+            _replica_down_until[index] = time.monotonic() + Config.REPLICA_RETRY_SECONDS
+    return None, None
+
+
+@asynccontextmanager
+async def connection(read_only=False, user_id=None):
+    """
+    Borrows a connection for one unit of work, committed on success and rolled back on error.
+    With read_only=True a replica is used when configured, unless `user_id` (or, within
+    read_routing, the client) wrote recently.
+    """
+    if _pool is None:
+        raise RuntimeError("Database connection failed")
+    pool = conn = None
+    routing = _routing.get()
+    if read_only and _replica_pools and not is_recent_writer(user_id) and not (routing and routing["primary"]):
+        pool, conn = await _replica_connection()
+    if conn is None:
+        pool, conn = _pool, await _pool.getconn()
+        if routing and read_only:
+            # Replicas unavailable: the rest of this request reads the primary as well
+            routing["primary"] = True
+    try:
+        async with conn.transaction():
+            yield conn
+    finally:
+        await pool.putconn(conn)
+
+
+async def fetch_all(query, params=None, user_id=None, read_only=True):
+    async with connection(read_only, user_id) as conn:
+        cursor = await conn.execute(query, params)
+        return await cursor.fetchall()
+
+
+async def fetch_one(query, params=None, user_id=None, read_only=True):
+    async with connection(read_only, user_id) as conn:
+        cursor = await conn.execute(query, params)
+        return await cursor.fetchone()
@@ -0,0 +1,90 @@
+"""
+Micro-benchmark: Flask's default JSON provider vs utils.json_provider.FastJSONProvider
+on a 10k-row complaint listing shaped like Complaint.get_page() output.
+
+    python benchmarks/bench_json.py [rows] [repeat]
+"""
+import datetime
+import decimal
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+from psycopg2.extras import RealDictRow
+from config import Config
+from utils.json_provider import FastJSONProvider, encode_rows, orjson
+from utils.response import success_response
+
+CATEGORIES = ['Road Damage', 'Garbage', 'Street Light', 'Water Leakage', 'Drainage', 'Other']
+STATUSES = ['Pending', 'Routed', 'Awaiting Quotes', 'Awaiting Payment', 'In Progress', 'Resolved']
+
+
+def make_rows(n):
+    base = datetime.datetime(2024, 1, 1, 9, 30)
+    rows = []
+    for i in range(n):
+        row = RealDictRow()
+        row.update({
+            "id": i,
+            "user_id": i % 500,
+            "category_id": i % 6 + 1,
+            "category_name": CATEGORIES[i % 6],
+            "description": f"Pothole near house number {i}, getting worse after the rain",
+            "location": f"Ward {i % 40}, Main Road",
+            "status": STATUSES[i % 6],
+            "resolution_type": "private" if i % 2 else "government",
+            "payment_status": "unpaid",
+            "quote_count": i % 5,
+            "min_quote_price": decimal.Decimal("1250.50"),
+            "agreed_price": decimal.Decimal("1400.00") if i % 3 else None,
+            "vendor_rating": decimal.Decimal("4.25"),
+            "citizen_name": f"Citizen {i % 500}",
+            "vendor_name": "Fixer Ltd" if i % 3 else None,
+            "created_at": base + datetime.timedelta(minutes=i),
+            "updated_at": base + datetime.timedelta(minutes=i, seconds=30),
+        })
+        rows.append(row)
+    return rows
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    rows = make_rows(n)
+
+    default_app = Flask("default")
+    default_app.json = DefaultJSONProvider(default_app)
+    fast_app = Flask("fast")
+    fast_app.json = FastJSONProvider(fast_app)
+
+    def envelope(app, data):
+        with app.app_context():
+            return success_response(data=data)[0].get_data()
+
+    # With the default datetime format the fast path must produce the same document
+    if Config.JSON_DATETIME_FORMAT == 'http':
+        assert default_app.json.loads(envelope(default_app, rows)) == fast_app.json.loads(envelope(fast_app, rows))
+
+    encoded = encode_rows(rows)
+    cases = [
+        ("default provider, dumps", lambda: default_app.json.dumps(rows)),
+        ("fast provider, dumps", lambda: fast_app.json.dumps(rows)),
+        ("default provider, success_response", lambda: envelope(default_app, rows)),
+        ("fast provider, success_response", lambda: envelope(fast_app, rows)),
+        ("fast provider, pre-encoded rows", lambda: envelope(fast_app, encoded)),
+    ]
+
+    print(f"{n} rows, best of {repeat} runs, backend: {'orjson' if orjson else 'stdlib json'}")
+    baseline = None
+    for name, fn in cases:
+        best = min(timeit.repeat(fn, number=1, repeat=repeat))
+        baseline = baseline or best
+        print(f"  {name:<40} {best * 1000:8.2f} ms   {baseline / best:5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
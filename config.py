@@ -6,6 +6,74 @@ load_dotenv()
 class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'dev_secret_key'
     DATABASE_URL = os.environ.get('DATABASE_URL')
+
+    # Connection pool (see database.ConnectionPool)
+    DB_POOL_MIN = int(os.environ.get('DB_POOL_MIN', 1))
+    DB_POOL_MAX = int(os.environ.get('DB_POOL_MAX', 10))
+    DB_POOL_TIMEOUT = float(os.environ.get('DB_POOL_TIMEOUT', 10))                  # seconds to wait for a free connection
+    DB_POOL_CHECK_INTERVAL = float(os.environ.get('DB_POOL_CHECK_INTERVAL', 30))    # ping connections idle longer than this
+    DB_POOL_MAX_LIFETIME = float(os.environ.get('DB_POOL_MAX_LIFETIME', 1800))      # recycle connections older than this
+    DB_PREPARED_STATEMENTS = os.environ.get('DB_PREPARED_STATEMENTS', 'auto')       # on | off | auto (off behind pgbouncer / -pooler)
+
+    # Optional read replicas (comma-separated) for read-only model methods (see database.get_read_connection)
+    DATABASE_REPLICA_URLS = [url.strip() for url in
+                             (os.environ.get('DATABASE_REPLICA_URLS') or os.environ.get('DATABASE_REPLICA_URL') or '').split(',')
+                             if url.strip()]
+    READ_YOUR_WRITES_SECONDS = float(os.environ.get('READ_YOUR_WRITES_SECONDS', 5))  # a writer's reads stay on the primary this long
+    REPLICA_RETRY_SECONDS = float(os.environ.get('REPLICA_RETRY_SECONDS', 30))      # skip a failed replica this long
+    REPLICA_POOL_TIMEOUT = float(os.environ.get('REPLICA_POOL_TIMEOUT', 1))         # then fall back to the primary
+
+    VENDOR_STATS_CACHE_TTL = float(os.environ.get('VENDOR_STATS_CACHE_TTL', 10))    # seconds
+    ANALYTICS_CACHE_TTL = float(os.environ.get('ANALYTICS_CACHE_TTL', 30))          # seconds an admin analytics result is reused
+    ANALYTICS_FOLD_THRESHOLD = int(os.environ.get('ANALYTICS_FOLD_THRESHOLD', 1000))  # pending rollup deltas that make a read fold them
+
+    TOKEN_LIFETIME_HOURS = int(os.environ.get('TOKEN_LIFETIME_HOURS', 24))
+    TOKEN_CACHE_SIZE = int(os.environ.get('TOKEN_CACHE_SIZE', 10000))               # verified JWTs kept per worker
+    TOKEN_RECHECK_SECONDS = int(os.environ.get('TOKEN_RECHECK_SECONDS', 30))          # a revocation reaches other workers within this
+
+    # Password hashing (see utils/passwords.py). Method is any werkzeug method string,
+    # e.g. "scrypt", "scrypt:16384:8:1" or "pbkdf2:sha256:600000" - changing it rehashes on next login.
+    PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD', 'scrypt')
+    PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', 2))         # 0 = hash inline
+    PASSWORD_HASH_QUEUE = int(os.environ.get('PASSWORD_HASH_QUEUE', 16))            # waiting jobs before 503
+    PASSWORD_HASH_TIMEOUT = float(os.environ.get('PASSWORD_HASH_TIMEOUT', 10))      # seconds
+
+    # JSON encoding (see utils/json_provider.py): 'fast' (orjson when installed) or 'default' (Flask's own)
+    JSON_PROVIDER = os.environ.get('JSON_PROVIDER', 'fast')
+    JSON_DATETIME_FORMAT = os.environ.get('JSON_DATETIME_FORMAT', 'http')           # 'http' (Flask default) or 'iso'
+
+    # Response compression (see utils/compression.py); brotli is used when the package is installed
+    COMPRESSION_ENABLED = os.environ.get('COMPRESSION_ENABLED', '1') == '1'
+    COMPRESSION_MIN_SIZE = int(os.environ.get('COMPRESSION_MIN_SIZE', 1024))        # bytes
+    COMPRESSION_LEVEL = int(os.environ.get('COMPRESSION_LEVEL', 6))                 # gzip, 1-9
+    BROTLI_LEVEL = int(os.environ.get('BROTLI_LEVEL', 5))                           # brotli, 0-11
+    COMPRESSION_CACHE_SIZE = int(os.environ.get('COMPRESSION_CACHE_SIZE', 256))     # compressed bodies kept per worker, 0 = off
+    COMPRESSION_CACHE_TTL = float(os.environ.get('COMPRESSION_CACHE_TTL', 300))     # seconds
+
+    # Image blob store (see utils/blob_store.py). Must be writable; on Vercel point it at /tmp or shared storage.
+    BLOB_STORE_PATH = os.environ.get('BLOB_STORE_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'storage', 'blobs'))
+    BLOB_MAX_SIZE = int(os.environ.get('BLOB_MAX_SIZE', 10 * 1024 * 1024))         # bytes per upload
+    # Request bodies (Flask answers 413 beyond this); leaves room for a base64 image inside JSON
+    MAX_CONTENT_LENGTH = int(os.environ.get('MAX_CONTENT_LENGTH', BLOB_MAX_SIZE * 4 // 3 + 1024 * 1024))
+    IMPORT_MAX_SIZE = int(os.environ.get('IMPORT_MAX_SIZE', 200 * 1024 * 1024))     # bytes per /admin/complaints/import body
+
+    # Server-Sent Events (see utils/events.py). LISTEN needs a session, so behind a transaction
+    # pooler set EVENTS_DATABASE_URL to the direct endpoint.
+    EVENTS_DATABASE_URL = os.environ.get('EVENTS_DATABASE_URL') or DATABASE_URL
+    EVENTS_HEARTBEAT = float(os.environ.get('EVENTS_HEARTBEAT', 15))                # seconds between keepalive comments
+    EVENTS_QUEUE_SIZE = int(os.environ.get('EVENTS_QUEUE_SIZE', 100))               # pending events per stream before it is dropped
+    EVENTS_MAX_SUBSCRIBERS = int(os.environ.get('EVENTS_MAX_SUBSCRIBERS', 500))     # open streams per worker
+    EVENTS_LISTEN_TIMEOUT = float(os.environ.get('EVENTS_LISTEN_TIMEOUT', 5))       # wait for the listener before answering 503
+
+    # Delta sync (?since=) on the citizen / vendor / officer lists (see utils/sync.py)
+    SYNC_OVERLAP_SECONDS = float(os.environ.get('SYNC_OVERLAP_SECONDS', 5))          # re-send window covering in-flight transactions
+    SYNC_TOMBSTONE_RETENTION_DAYS = int(os.environ.get('SYNC_TOMBSTONE_RETENTION_DAYS', 30))  # older tokens get a full list
+
+    # Async serving mode (see asgi.py and async_database.py)
+    ASYNC_DB_POOL_MIN = int(os.environ.get('ASYNC_DB_POOL_MIN', 1))
+    ASYNC_DB_POOL_MAX = int(os.environ.get('ASYNC_DB_POOL_MAX', 20))               # shared by every in-flight async request
+    ASYNC_DB_POOL_TIMEOUT = float(os.environ.get('ASYNC_DB_POOL_TIMEOUT', 10))      # seconds to wait for a free connection
+    ASGI_WSGI_WORKERS = int(os.environ.get('ASGI_WSGI_WORKERS', 16))                # threads serving the remaining Flask routes
     
     @staticmethod
     def validate():
@@ -1,24 +1,251 @@
+import itertools
+import math
+import os
+import re
+import threading
+import time
 import psycopg2
+import psycopg2.extensions
 import psycopg2.extras
+from flask import g, has_request_context, request
 from config import Config
+from utils.cache import TTLCache
 
-def get_db_connection():
-    db_url = Config.DATABASE_URL
-    if not db_url:
-        print("CRITICAL: DATABASE_URL is not set.")
-        return None
-    
+
+class PoolTimeout(Exception):
+    """Raised when no pooled connection frees up within DB_POOL_TIMEOUT."""
+
+
+class PooledConnection:
+    """
+    Thin proxy around a psycopg2 connection borrowed from the pool.
+    Models keep calling conn.cursor()/commit()/rollback()/close() as before;
+    close() hands the connection back to the pool instead of closing the socket.
+    Attribute writes (autocommit, readonly, isolation_level, ...) reach the driver connection.
+    As a context manager it commits (or rolls back on error) and then returns to the pool.
+    """
+
+    def __init__(self, pool, raw):
+        object.__setattr__(self, "_pool", pool)
+        object.__setattr__(self, "_raw", raw)
+
+    @property
+    def raw(self):
+        if self._raw is None:
+            raise psycopg2.InterfaceError("connection already returned to the pool")
+        return self._raw
+
+    def close(self):
+        if self._raw is None:
+            return
+        raw = self._raw
+        object.__setattr__(self, "_raw", None)
+        self._pool.putconn(raw)
+
+    def __getattr__(self, name):
+        return getattr(self.raw, name)
+
+    def __setattr__(self, name, value):
+        setattr(self.raw, name, value)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if exc_type is None:
+                self.raw.commit()
+            else:
+                self.raw.rollback()
+        finally:
+            self.close()
+
+    def __del__(self):
+        # Safety net for code paths that forget to close()
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+class ConnectionPool:
+    """
+    Thread-safe, bounded pool of psycopg2 connections.
+
+    - keeps at least `minconn` warm connections and never opens more than `maxconn`
+    - getconn() blocks up to `timeout` seconds for a free connection, then raises PoolTimeout
+    - connections idle for longer than `check_interval` are pinged before being handed out,
+      so a connection dropped by Neon while idle is replaced transparently
+    - connections older than `max_lifetime` are recycled when they come back
+    """
+
+    def __init__(self, dsn, minconn=1, maxconn=10, timeout=10.0, check_interval=30.0, max_lifetime=1800.0):
+        self.dsn = dsn
+        self.minconn = max(0, minconn)
+        self.maxconn = max(1, maxconn, self.minconn)
+        self.timeout = timeout
+        self.check_interval = check_interval
+        self.max_lifetime = max_lifetime
+        self.pid = os.getpid()
+
+        self._cond = threading.Condition()
+        self._idle = []       # [(conn, returned_at)] - used as a LIFO stack so the warmest conn goes out first
+        self._born = {}       # id(conn) -> created_at
+        self._size = 0        # open connections, idle + in use
+        self._closed = False
+        self._stats = {
+            "checkouts": 0,
+            "connections_created": 0,
+            "connections_closed": 0,
+            "waits": 0,
+            "timeouts": 0,
+            "failed_health_checks": 0,
+        }
+
+        for _ in range(self.minconn):
+            try:
+                conn = self._open()
+            except Exception as e:
+                print(f"WARNING: Could not pre-open pooled connection: {e}")
+                break
+            with self._cond:
+                self._size += 1
+                self._idle.append((conn, time.monotonic()))
+
+    def _open(self):
+        conn = _connect(self.dsn)
+        with self._cond:
+            self._born[id(conn)] = time.monotonic()
+            self._stats["connections_created"] += 1
+        return conn
+
+    def _discard(self, conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+        with self._cond:
+            self._born.pop(id(conn), None)
+            self._size -= 1
+            self._stats["connections_closed"] += 1
+            self._cond.notify()
+
+    def _is_alive(self, conn, returned_at):
+        if conn.closed:
+            return False
+        if conn.get_transaction_status() == psycopg2.extensions.TRANSACTION_STATUS_UNKNOWN:
+            return False
+        if time.monotonic() - returned_at < self.check_interval:
+            return True
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT 1")
+            cursor.close()
+            conn.rollback()
+            return True
+        except Exception:
+            return False
+
+    def getconn(self):
+        deadline = time.monotonic() + self.timeout
+        while True:
+            conn = None
+            returned_at = None
+            with self._cond:
+                if self._closed:
+                    raise psycopg2.InterfaceError("connection pool is closed")
+                waited = False
+                while not self._idle and self._size >= self.maxconn:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._stats["timeouts"] += 1
+                        raise PoolTimeout(f"No database connection available within {self.timeout}s")
+                    if not waited:
+                        self._stats["waits"] += 1
+                        waited = True
+                    self._cond.wait(remaining)
+                if self._idle:
+                    conn, returned_at = self._idle.pop()
+                else:
+                    # Reserve a slot before connecting outside the lock
+                    self._size += 1
+
+            if conn is None:
+                try:
+                    conn = self._open()
+                except Exception:
+                    with self._cond:
+                        self._size -= 1
+                        self._cond.notify()
+                    raise
+            elif not self._is_alive(conn, returned_at):
+                with self._cond:
+                    self._stats["failed_health_checks"] += 1
+                self._discard(conn)
+                continue
+
+            with self._cond:
+                self._stats["checkouts"] += 1
+            return conn
+
+    def putconn(self, conn):
+        if self._closed or conn.closed:
+            self._discard(conn)
+            return
+        with self._cond:
+            born = self._born.get(id(conn), 0)
+        if time.monotonic() - born > self.max_lifetime:
+            self._discard(conn)
+            return
+        try:
+            # Never hand out a connection with a half-finished transaction
+            if conn.get_transaction_status() != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                conn.rollback()
+        except Exception:
+            self._discard(conn)
+            return
+        with self._cond:
+            self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    def closeall(self):
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+        for conn, _ in idle:
+            self._discard(conn)
+
+    def stats(self):
+        with self._cond:
+            data = dict(self._stats)
+            data.update({
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": self._size - len(self._idle),
+                "min": self.minconn,
+                "max": self.maxconn,
+            })
+        return data
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def normalize_dsn(db_url):
     db_url = db_url.strip()
-        
+
     # Standardize URL and fix typos (handle postgresq1, postgres, etc.)
-    import re
     db_url = re.sub(r'^postgres(q1)?://', 'postgresql://', db_url)
-    
+
     # Ensure SSL is enabled (required by Neon)
     if "sslmode=" not in db_url:
         separator = "&" if "?" in db_url else "?"
         db_url += f"{separator}sslmode=require"
-        
+    return db_url
+
+
+def _connect(db_url):
     try:
         # Try direct connection first
         return psycopg2.connect(db_url, connect_timeout=10)
@@ -33,160 +260,358 @@ def get_db_connection():
                     return psycopg2.connect(base_url, sslmode='require', connect_timeout=10)
             except Exception as fallback_err:
                 print(f"Fallback connection also failed: {fallback_err}")
-        
-        print(f"CRITICAL Database connection error: {type(err).__name__}: {err}")
+
         clean_url_start = db_url.split('@')[-1] if '@' in db_url else db_url[:30]
         print(f"DEBUG: Attempted connection to host part: {clean_url_start}")
+        raise
+
+
+def get_pool():
+    """Returns the process-wide pool, creating it on first use (and again after a fork)."""
+    global _pool
+    if _pool is not None and _pool.pid == os.getpid():
+        return _pool
+    with _pool_lock:
+        if _pool is None or _pool.pid != os.getpid():
+            db_url = Config.DATABASE_URL
+            if not db_url:
+                return None
+            _pool = ConnectionPool(
+                normalize_dsn(db_url),
+                minconn=Config.DB_POOL_MIN,
+                maxconn=Config.DB_POOL_MAX,
+                timeout=Config.DB_POOL_TIMEOUT,
+                check_interval=Config.DB_POOL_CHECK_INTERVAL,
+                max_lifetime=Config.DB_POOL_MAX_LIFETIME,
+            )
+    return _pool
+
+
+def get_pool_stats():
+    pool = _pool
+    if pool is None or pool.pid != os.getpid():
         return None
+    return pool.stats()
 
-def run_db_migrations():
-    conn = None
-    try:
-        conn = get_db_connection()
-        if not conn: 
-            print("Migration failed: Could not connect to database.")
-            return
-        cursor = conn.cursor()
-        
-        # Ensure critical columns exist
-        print("Ensuring critical columns...")
-        cursor.execute("ALTER TABLE complaints ADD COLUMN IF NOT EXISTS resolution_notes TEXT;")
-        cursor.execute("ALTER TABLE complaints ADD COLUMN IF NOT EXISTS resolution_type VARCHAR(20);")
-        cursor.execute("ALTER TABLE complaints ADD COLUMN IF NOT EXISTS selected_vendor_id INT;")
-        cursor.execute("ALTER TABLE complaints ADD COLUMN IF NOT EXISTS payment_status VARCHAR(20) DEFAULT 'unpaid';")
-        cursor.execute("ALTER TABLE users ADD COLUMN IF NOT EXISTS department VARCHAR(100);")
-
-        # Fix users_role_check constraint to include 'vendor'
-        print("Updating users_role_check constraint...")
-        cursor.execute("""
-            ALTER TABLE users DROP CONSTRAINT IF EXISTS users_role_check;
-            ALTER TABLE users ADD CONSTRAINT users_role_check 
-            CHECK (role IN ('citizen', 'admin', 'officer', 'vendor'));
-        """)
-
-        # Fix complaints_status_check constraint to include 'Routed' and 'Awaiting Quotes'
-        print("Updating complaints_status_check constraint...")
-        # We try multiple common names just in case
-        names = ['complaints_status_check', 'status_check']
-        for name in names:
-            cursor.execute(f"ALTER TABLE complaints DROP CONSTRAINT IF EXISTS {name};")
-        
-        cursor.execute("""
-            ALTER TABLE complaints ADD CONSTRAINT complaints_status_check 
-            CHECK (status IN ('Pending', 'Routed', 'Awaiting Quotes', 'Awaiting Payment', 'In Progress', 'Resolved'));
-        """)
-
-        # Ensure categories exist
-        print("Syncing categories...")
-        categories = ['Road Damage', 'Garbage', 'Street Light', 'Water Leakage', 'Drainage', 'Other']
-        for cat in categories:
-            cursor.execute("INSERT INTO categories (name) VALUES (%s) ON CONFLICT (name) DO NOTHING;", (cat,))
-        
-        # Ensure vendors table exists (to prevent relation does not exist error)
-        print("Ensuring vendors table exists...")
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS vendors (
-                id SERIAL PRIMARY KEY,
-                user_id INT UNIQUE NOT NULL,
-                business_name VARCHAR(100) NOT NULL,
-                service_type VARCHAR(100),
-                verified BOOLEAN DEFAULT FALSE,
-                rating DECIMAL(3,2) DEFAULT 0,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
-            );
-        """)
-
-        # Ensure quotations table exists
-        print("Ensuring quotations table exists...")
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS quotations (
-                id SERIAL PRIMARY KEY,
-                complaint_id INT NOT NULL,
-                vendor_id INT NOT NULL,
-                price DECIMAL(10,2) NOT NULL,
-                estimated_time VARCHAR(50),
-                status VARCHAR(20) DEFAULT 'Pending' CHECK (status IN ('Pending', 'Approved', 'Rejected')),
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (complaint_id) REFERENCES complaints(id) ON DELETE CASCADE,
-                FOREIGN KEY (vendor_id) REFERENCES users(id) ON DELETE CASCADE
-            );
-        """)
-
-        # Ensure feedback table exists
-        print("Ensuring feedback table exists...")
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS feedback (
-                id SERIAL PRIMARY KEY,
-                complaint_id INT NOT NULL,
-                rating INT CHECK (rating BETWEEN 1 AND 5),
-                comment TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (complaint_id) REFERENCES complaints(id) ON DELETE CASCADE
-            );
-        """)
-
-        # Ensure job_updates table exists
-        print("Ensuring job_updates table exists...")
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS job_updates (
-                id SERIAL PRIMARY KEY,
-                complaint_id INT NOT NULL,
-                vendor_id INT NOT NULL,
-                message TEXT NOT NULL,
-                image_url TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (complaint_id) REFERENCES complaints(id) ON DELETE CASCADE,
-                FOREIGN KEY (vendor_id) REFERENCES users(id) ON DELETE CASCADE
-            );
-        """)
-
-        # Seed Test Users
-        print("Seeding test users (Officers & Vendors)...")
-        # Direct passwords as requested by user
-        
-        test_users = [
-            # Admin & Officers
-            ('System Admin', 'admin@system.com', 'admin@123', 'admin', 'General'),
-            ('General Off', 'general@test.com', 'password123', 'officer', 'General'),
-            ('Road Off', 'road@test.com', 'password123', 'officer', 'Road Damage'),
-            # Vendors
-            ('Waste Expert', 'waste@test.com', 'password123', 'vendor', 'Waste Management'),
-            ('Fixer Ltd', 'fixer@test.com', 'password123', 'vendor', 'Road Damage'),
-            ('Test Vendor', 'vendor@test.com', 'password123', 'vendor', 'General')
-        ]
-
-        for name, email, password, role, dept in test_users:
-            # Get or create user
-            cursor.execute("SELECT id FROM users WHERE email = %s", (email,))
-            user_row = cursor.fetchone()
-            
-            if not user_row:
-                cursor.execute(
-                    "INSERT INTO users (name, email, password, role, department) VALUES (%s, %s, %s, %s, %s) RETURNING id",
-                    (name, email, password, role, dept)
+
+# --- Read replicas -----------------------------------------------------------------------
+# Read-only model methods borrow from get_read_connection(). With DATABASE_REPLICA_URLS set
+# they go to a replica (round robin), except when the request or user has to see its own
+# writes; a replica that fails is skipped for REPLICA_RETRY_SECONDS and reads fall back to
+# the primary.
+
+_replica_pools = None
+_replica_pools_pid = None
+_replica_down_until = {}     # index -> monotonic time it may be retried
+_replica_turn = itertools.count()
+_replica_lock = threading.Lock()
+
+# Users whose last write was less than READ_YOUR_WRITES_SECONDS ago read from the primary.
+# Per worker process: a user's next request on another worker may still hit a replica.
+_recent_writers = TTLCache(maxsize=10000, ttl=Config.READ_YOUR_WRITES_SECONDS)
+
+
+def get_replica_pools():
+    global _replica_pools, _replica_pools_pid
+    if _replica_pools is not None and _replica_pools_pid == os.getpid():
+        return _replica_pools
+    with _replica_lock:
+        if _replica_pools is None or _replica_pools_pid != os.getpid():
+            _replica_pools = [
+                ConnectionPool(
+                    normalize_dsn(url),
+                    minconn=0,
+                    maxconn=Config.DB_POOL_MAX,
+                    timeout=Config.REPLICA_POOL_TIMEOUT,
+                    check_interval=Config.DB_POOL_CHECK_INTERVAL,
+                    max_lifetime=Config.DB_POOL_MAX_LIFETIME,
                 )
-                uid = cursor.fetchone()[0]
+                for url in Config.DATABASE_REPLICA_URLS
+            ]
+            _replica_pools_pid = os.getpid()
+            _replica_down_until.clear()
+    return _replica_pools
+
+
+def get_replica_stats():
+    pools = _replica_pools
+    if not pools or _replica_pools_pid != os.getpid():
+        return None
+    now = time.monotonic()
+    return [dict(pool.stats(), healthy=_replica_down_until.get(i, 0) <= now) for i, pool in enumerate(pools)]
+
+
+# Read-your-writes across workers: a write response carries the write time in this cookie and
+# header, and a request sending either back within READ_YOUR_WRITES_SECONDS reads the primary.
+# The per-process _recent_writers entry covers clients that echo neither.
+LAST_WRITE_COOKIE = "last_write"
+LAST_WRITE_HEADER = "X-Last-Write"
+
+
+def mark_recent_writer(user_id):
+    if user_id is not None and Config.DATABASE_REPLICA_URLS:
+        _recent_writers.set(user_id, True)
+
+
+def is_recent_writer(user_id):
+    return user_id is not None and bool(_recent_writers.get(user_id))
+
+
+def wrote_recently(last_write):
+    """True when a last-write marker (unix seconds, as sent back by the client) is recent enough."""
+    try:
+        return time.time() - float(last_write) < Config.READ_YOUR_WRITES_SECONDS
+    except (TypeError, ValueError):
+        return False
+
+
+def read_from_primary():
+    """Sends the rest of this request's reads to the primary, e.g. a snapshot that must not lag it."""
+    if has_request_context():
+        g._read_primary = True
+
+
+def _replica_allowed():
+    if not has_request_context():
+        return True
+    if g.get('_read_primary'):
+        return False
+    unit = g.get('_db_unit')
+    if unit is not None and unit.conn is not None:
+        # This request already holds a primary transaction (possibly with uncommitted writes)
+        return False
+    if request.method not in ('GET', 'HEAD'):
+        return False
+    if wrote_recently(request.cookies.get(LAST_WRITE_COOKIE) or request.headers.get(LAST_WRITE_HEADER)):
+        return False
+    user = getattr(request, 'user', None)
+    return not (user and is_recent_writer(user.get('id')))
+
+
+def _get_replica_connection():
+    pools = get_replica_pools()
+    # One replica per request: an ETag version and the listing it stands for must come from
+    # the same server, or a lagging replica can answer 304 for data another one has moved past
+    pinned = g.get('_read_replica') if has_request_context() else None
+    if pinned is not None:
+        candidates = [pinned]
+    else:
+        start = next(_replica_turn)
+        candidates = [(start + offset) % len(pools) for offset in range(len(pools))]
+    for index in candidates:
+        if _replica_down_until.get(index, 0) > time.monotonic():
+            continue
+        pool = pools[index]
+        try:
+            conn = PooledConnection(pool, pool.getconn())
+            if has_request_context():
+                g._read_replica = index
+            return conn
+        except PoolTimeout:
+            # Busy rather than broken: try the next one without marking it down
+            continue
+        except Exception as err:
+            print(f"WARNING: Read replica {index} unavailable, skipping it for {Config.REPLICA_RETRY_SECONDS}s: {err}")
+            _replica_down_until[index] = time.monotonic() + Config.REPLICA_RETRY_SECONDS
+    return None
+
+
+def get_read_connection():
+    """
+    Connection for read-only model methods. A replica when configured and safe for this
+    request, otherwise (or when every replica is down) the same as get_db_connection().
+    """
+    if Config.DATABASE_REPLICA_URLS and _replica_allowed():
+        conn = _get_replica_connection()
+        if conn is not None:
+            return conn
+    # The primary connection joins the request unit, so later reads of this request stay there too
+    return get_db_connection()
+
+
+def close_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.closeall()
+            _pool = None
+
+
+def get_pooled_connection():
+    """Borrows a connection for the caller alone, ignoring any request unit of work (exports, streams)."""
+    if not Config.DATABASE_URL:
+        print("CRITICAL: DATABASE_URL is not set.")
+        return None
+
+    try:
+        pool = get_pool()
+        return PooledConnection(pool, pool.getconn())
+    except PoolTimeout as err:
+        print(f"CRITICAL Database pool exhausted: {err}")
+        return None
+    except Exception as err:
+        print(f"CRITICAL Database connection error: {type(err).__name__}: {err}")
+        return None
+
+
+class RequestUnit:
+    """
+    One pooled connection and one transaction for the whole HTTP request.
+    The connection is only borrowed on the first get_db_connection() call, so requests
+    that never touch the database cost nothing.
+    """
+
+    def __init__(self):
+        self.conn = None
+        self.failed = False
+        self.callbacks = []   # after_commit() hooks, run once the COMMIT succeeded
+
+    def connection(self):
+        if self.conn is None:
+            self.conn = get_pooled_connection()
+            if self.conn is None:
+                return None
+        elif self.conn.get_transaction_status() == psycopg2.extensions.TRANSACTION_STATUS_INERROR:
+            # An earlier model call hit an error without rolling back; the request is lost
+            # either way, but later calls in it should still be able to run.
+            self.failed = True
+            self.conn.rollback()
+        return UnitConnection(self)
+
+    def finish(self, commit):
+        """
+        Commits (or rolls back) the request transaction and returns the connection.
+        False when a commit was asked for but did not happen: the COMMIT failed, or a model
+        already rolled back (failed) and the request's writes are gone.
+        """
+        if self.conn is None:
+            return True
+        conn, self.conn = self.conn, None
+        callbacks, self.callbacks = self.callbacks, []
+        try:
+            if commit and not self.failed:
+                conn.commit()
             else:
-                uid = user_row[0]
-                # Force password and department update for test accounts to ensure login works
-                cursor.execute("UPDATE users SET password = %s, department = %s WHERE id = %s", (password, dept, uid))
-
-            # Always ensure vendor profile exists if role is vendor
-            if role == 'vendor':
-                cursor.execute(
-                    "INSERT INTO vendors (user_id, business_name, service_type, verified) VALUES (%s, %s, %s, TRUE) ON CONFLICT (user_id) DO UPDATE SET service_type = EXCLUDED.service_type, business_name = EXCLUDED.business_name",
-                    (uid, name, dept)
-                )
-        
-        conn.commit()
-        cursor.close()
-        print("✅ Database migration and seeding successful.")
-    except Exception as e:
-        print(f"❌ Migration error: {e}")
-        if conn: conn.rollback()
-    finally:
-        if conn: conn.close()
-
-if __name__ == "__main__":
-    run_db_migrations()
+                conn.rollback()
+        except Exception as e:
+            print(f"Error finishing request transaction: {e}")
+            try:
+                conn.rollback()
+            except Exception:
+                pass
+            return False
+        finally:
+            conn.close()
+        if not commit:
+            return True
+        if self.failed:
+            return False
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                print(f"Error in after-commit hook: {e}")
+        return True
+
+
+class UnitConnection:
+    """
+    What models get inside a request: commit() is deferred to the end of the request,
+    rollback() dooms the whole request, close() is a no-op.
+    """
+
+    def __init__(self, unit):
+        self._unit = unit
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        self._unit.failed = True
+        self._unit.conn.rollback()
+
+    def close(self):
+        pass
+
+    def __getattr__(self, name):
+        return getattr(self._unit.conn, name)
+
+    def __setattr__(self, name, value):
+        if name == "_unit":
+            object.__setattr__(self, name, value)
+        else:
+            setattr(self._unit.conn, name, value)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # The request unit commits at the end of the request; an error still dooms it
+        if exc_type is not None:
+            self.rollback()
+
+
+def get_db_connection():
+    if has_request_context() and '_db_unit' in g:
+        return g._db_unit.connection()
+    return get_pooled_connection()
+
+
+def after_commit(callback):
+    """
+    Runs callback() once the caller's writes are committed: at the end of the request when a
+    request transaction is open (never, if it rolls back), right away otherwise - outside a
+    request, models have already committed when they call this.
+    """
+    unit = g.get('_db_unit') if has_request_context() else None
+    if unit is not None and unit.conn is not None:
+        unit.callbacks.append(callback)
+    else:
+        callback()
+
+
+def init_app(app):
+    """Installs the request-scoped unit of work: every model call in a request shares one transaction."""
+    from utils.response import error_response
+
+    @app.before_request
+    def begin_db_unit():
+        g._db_unit = RequestUnit()
+
+    @app.after_request
+    def finish_db_unit(response):
+        unit = g.pop('_db_unit', None)
+        wrote = unit is not None and unit.conn is not None and request.method not in ('GET', 'HEAD', 'OPTIONS')
+        # Error responses never persist partial writes; a success response whose writes were
+        # rolled back (or failed to commit) becomes an error
+        if unit and not unit.finish(commit=response.status_code < 400):
+            return app.make_response(error_response("Failed to save changes", 500))
+        if wrote and response.status_code < 400 and Config.DATABASE_REPLICA_URLS:
+            # Read-your-writes: this client's reads stay on the primary for a few seconds
+            user = getattr(request, 'user', None)
+            mark_recent_writer(user.get('id') if user else None)
+            last_write = f"{time.time():.3f}"
+            response.headers[LAST_WRITE_HEADER] = last_write
+            response.set_cookie(LAST_WRITE_COOKIE, last_write, max_age=math.ceil(Config.READ_YOUR_WRITES_SECONDS),
+                                httponly=True, samesite='Lax', secure=request.is_secure)
+        return response
+
+    @app.teardown_request
+    def release_db_unit(exc):
+        # Only still set when the request died with an exception before after_request ran
+        unit = g.pop('_db_unit', None)
+        if unit:
+            unit.finish(commit=False)
+
+
+def open_connection(dsn=None):
+    """Opens a dedicated, unpooled connection (migrations, LISTEN, long-running jobs)."""
+    dsn = dsn or Config.DATABASE_URL
+    if not dsn:
+        print("CRITICAL: DATABASE_URL is not set.")
+        return None
+    try:
+        return _connect(normalize_dsn(dsn))
+    except Exception as err:
+        print(f"CRITICAL Database connection error: {type(err).__name__}: {err}")
+        return None
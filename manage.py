@@ -0,0 +1,182 @@
+"""
+Operational commands.
+
+    python manage.py migrate                # apply pending schema migrations
+    python manage.py status                 # show applied / pending migrations
+    python manage.py seed                   # create or reset the demo admin/officer/vendor accounts
+    python manage.py check-indexes          # report hot queries that no index serves
+    python manage.py repair-quote-summary   # recompute quote_count / min_quote_price / agreed_price
+    python manage.py rebuild-vendor-ratings # recompute rating_sum / rating_count / rating from feedback
+    python manage.py rebuild-vendor-stats   # recompute the vendor dashboard counters
+    python manage.py rebuild-complaint-stats # recompute the admin analytics rollup
+    python manage.py fold-complaint-stats   # fold pending analytics deltas into the rollup; reads fold
+                                            # past ANALYTICS_FOLD_THRESHOLD, cron keeps them small
+    python manage.py externalize-images     # move inline base64 images into the blob store
+    python manage.py purge-tombstones       # drop delta-sync tombstones past their retention
+    python manage.py ingest-complaints FILE [--format csv] [--user-id N]
+                                            # bulk-load complaints from NDJSON / CSV via COPY
+"""
+import argparse
+import json
+import sys
+
+
+def cmd_migrate(args):
+    from migrations import run_db_migrations
+    return run_db_migrations()
+
+
+def cmd_status(args):
+    from migrations import migration_status
+    status = migration_status()
+    if status is None:
+        print("Could not connect to database.")
+        return False
+    print(json.dumps(status, indent=2))
+    return True
+
+
+def cmd_seed(args):
+    from migrations import run_db_migrations, seed_test_users
+    return run_db_migrations() and seed_test_users()
+
+
+def cmd_check_indexes(args):
+    from migrations import check_indexes
+    report = check_indexes()
+    if report is None:
+        print("Could not connect to database.")
+        return False
+    unindexed = {name: issues for name, issues in report.items() if issues}
+    for name in report:
+        print(f"{'!!' if name in unindexed else 'ok'}  {name}")
+        for issue in unindexed.get(name, []):
+            print(f"      {issue}")
+    return not unindexed
+
+
+def cmd_repair_quote_summary(args):
+    from models.quotation_model import Quotation
+    repaired = Quotation.refresh_summaries()
+    if repaired is False:
+        return False
+    print(f"Repaired quote summary on {repaired} complaint(s).")
+    return True
+
+
+def cmd_rebuild_vendor_ratings(args):
+    from models.vendor_model import Vendor
+    updated = Vendor.rebuild_ratings()
+    if updated is False:
+        return False
+    print(f"Rebuilt ratings for {updated} vendor(s).")
+    return True
+
+
+def cmd_rebuild_vendor_stats(args):
+    from models.vendor_model import VendorStats
+    written = VendorStats.rebuild()
+    if written is False:
+        return False
+    print(f"Rebuilt dashboard counters for {written} vendor(s).")
+    return True
+
+
+def cmd_rebuild_complaint_stats(args):
+    from models.complaint_model import ComplaintStats
+    written = ComplaintStats.rebuild()
+    if written is False:
+        return False
+    print(f"Rebuilt {written} analytics rollup row(s).")
+    return True
+
+
+def cmd_fold_complaint_stats(args):
+    from models.complaint_model import ComplaintStats
+    folded = ComplaintStats.fold()
+    if folded is False:
+        return False
+    print(f"Folded {folded} analytics delta(s) into the rollup.")
+    return True
+
+
+def cmd_externalize_images(args):
+    from models.complaint_model import Complaint
+    rewritten = Complaint.externalize_images()
+    if rewritten is False:
+        return False
+    print(f"Moved inline images of {rewritten} row(s) into the blob store.")
+    return True
+
+
+def cmd_purge_tombstones(args):
+    from models.complaint_model import Complaint
+    purged = Complaint.purge_tombstones()
+    if purged is False:
+        return False
+    print(f"Purged {purged} tombstone(s).")
+    return True
+
+
+def cmd_ingest_complaints(args):
+    from models.complaint_model import Complaint
+    from utils.ingest import build_batch
+    import_format = args.format or ('csv' if args.file.endswith('.csv') else 'ndjson')
+    with open(args.file, 'rb') as f:
+        batch = build_batch(f, import_format, args.user_id)
+    try:
+        inserted = 0
+        if batch.accepted:
+            inserted = Complaint.bulk_ingest(batch)
+            if inserted is False:
+                return False
+    finally:
+        batch.close()
+    for reject in batch.rejected:
+        print(f"  line {reject['line']}: {reject['error']}")
+    if batch.rejected_count > len(batch.rejected):
+        print(f"  ... and {batch.rejected_count - len(batch.rejected)} more")
+    print(f"Imported {inserted} complaint(s), rejected {batch.rejected_count}.")
+    return True
+
+
+COMMANDS = {
+    "migrate": (cmd_migrate, "Apply pending schema migrations"),
+    "status": (cmd_status, "Show applied and pending migrations"),
+    "seed": (cmd_seed, "Seed demo admin/officer/vendor accounts"),
+    "check-indexes": (cmd_check_indexes, "Report hot queries not served by an index"),
+    "repair-quote-summary": (cmd_repair_quote_summary, "Recompute the denormalized quote summary on complaints"),
+    "rebuild-vendor-ratings": (cmd_rebuild_vendor_ratings, "Recompute vendor rating aggregates from feedback"),
+    "rebuild-vendor-stats": (cmd_rebuild_vendor_stats, "Recompute vendor dashboard counters"),
+    "rebuild-complaint-stats": (cmd_rebuild_complaint_stats, "Recompute the admin analytics rollup"),
+    "fold-complaint-stats": (cmd_fold_complaint_stats, "Fold pending analytics deltas into the rollup"),
+    "externalize-images": (cmd_externalize_images, "Move inline base64 images into the blob store"),
+    "purge-tombstones": (cmd_purge_tombstones, "Drop delta-sync tombstones past their retention"),
+    "ingest-complaints": (cmd_ingest_complaints, "Bulk-load complaints from an NDJSON or CSV file"),
+}
+
+# Positional / optional arguments of the commands that take any
+COMMAND_ARGUMENTS = {
+    "ingest-complaints": [
+        (("file",), {"help": "NDJSON or CSV file"}),
+        (("--format",), {"choices": ["ndjson", "csv"], "help": "defaults to the file extension"}),
+        (("--user-id",), {"type": int, "help": "citizen account for records without user_id"}),
+    ],
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Civic backend management commands")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    for name, (_, help_text) in COMMANDS.items():
+        subparser = subparsers.add_parser(name, help=help_text)
+        for flags, options in COMMAND_ARGUMENTS.get(name, []):
+            subparser.add_argument(*flags, **options)
+
+    args = parser.parse_args(argv)
+    handler = COMMANDS[args.command][0]
+    return 0 if handler(args) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,95 @@
+from config import Config
+from models.complaint_model import Complaint
+from async_database import fetch_all, fetch_one
+
+
+class AsyncComplaint:
+    """
+    Async versions of the hot Complaint reads for the ASGI serving mode. The SQL comes from
+    Complaint's *_query builders, so both modes always run the same statements.
+    Methods return None on a database error (there is no shared last_error across tasks);
+    `reader_id` is the caller, used for read-your-writes routing.
+    """
+
+    @staticmethod
+    async def list_version(scope, scope_id=None, filters=None, reader_id=None):
+        query, params = Complaint.version_query(scope, scope_id, filters)
+        try:
+            row = await fetch_one(query, params, reader_id)
+            return Complaint.format_version(row["count"], row["last_update"], row["ratings"])
+        except Exception as e:
+            print(f"Error computing list version: {e}")
+            return None
+
+    @staticmethod
+    async def sync_point(scope, scope_id, since=None):
+        """Same contract as Complaint.sync_point; runs on the primary for the database clock."""
+        try:
+            row = await fetch_one(Complaint.SYNC_CLOCK_QUERY,
+                                  (Config.SYNC_OVERLAP_SECONDS, Config.SYNC_TOMBSTONE_RETENTION_DAYS),
+                                  read_only=False)
+            next_since, retained_from = row["next_since"], row["retained_from"]
+            if since is None or since < retained_from:
+                return next_since, [], since is not None
+            rows = await fetch_all(*Complaint.tombstone_query(scope, scope_id, since), read_only=False)
+            return next_since, [row["complaint_id"] for row in rows], False
+        except Exception as e:
+            print(f"Error reading sync state: {e}")
+            return None, None, None
+
+    @staticmethod
+    async def get_page(filters=None, after=None, limit=50, fields=None, reader_id=None):
+        """(rows, has_more), or (None, False) on error. Raises ValueError for unknown `fields`."""
+        query, params = Complaint.page_query(filters, after, limit, fields)
+        try:
+            data = await fetch_all(query, params, reader_id)
+        except Exception as e:
+            print(f"Error fetching complaint page: {e}")
+            return None, False
+        return data[:limit], len(data) > limit
+
+    @staticmethod
+    async def get_available_for_vendor(vendor_user_id, service_type=None, exclude_quoted=False, after=None, limit=50, fields=None):
+        query, params = Complaint.available_query(vendor_user_id, service_type, exclude_quoted, after, limit, fields)
+        try:
+            data = await fetch_all(query, params, vendor_user_id)
+        except Exception as e:
+            print(f"Error fetching available jobs: {e}")
+            return None, False
+        return data[:limit], len(data) > limit
+
+    @staticmethod
+    async def get_by_user(user_id, fields=None, since=None):
+        query, params = Complaint.user_list_query(user_id, fields, since)
+        try:
+            return await fetch_all(query, params, user_id)
+        except Exception as e:
+            print(f"Error fetching user complaints: {e}")
+            return None
+
+    @staticmethod
+    async def get_by_vendor(vendor_user_id, fields=None, since=None):
+        query, params = Complaint.vendor_list_query(vendor_user_id, fields, since)
+        try:
+            return await fetch_all(query, params, vendor_user_id)
+        except Exception as e:
+            print(f"Error fetching vendor jobs: {e}")
+            return None
+
+    @staticmethod
+    async def get_assigned_to_officer(officer_id, fields=None, since=None):
+        query, params = Complaint.officer_list_query(officer_id, fields, since)
+        try:
+            return await fetch_all(query, params, officer_id)
+        except Exception as e:
+            print(f"Error fetching officer complaints: {e}")
+            return None
+
+    @staticmethod
+    async def get_by_id(complaint_id, reader_id=None):
+        """(row or None, ok): ok is False on a database error."""
+        try:
+            return await fetch_one(Complaint.DETAIL_QUERY, (complaint_id,), reader_id), True
+        except Exception as e:
+            print(f"Error fetching complaint: {e}")
+            return None, False
@@ -0,0 +1,8 @@
+from async_database import fetch_one
+
+
+class AsyncVendor:
+    @staticmethod
+    async def get_by_user_id(user_id):
+        """The vendor row, None when there is none; raises on database errors."""
+        return await fetch_one("SELECT * FROM vendors WHERE user_id = %s", (user_id,), user_id)
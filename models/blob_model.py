@@ -0,0 +1,25 @@
+from database import get_db_connection
+
+
+class Blob:
+    @staticmethod
+    def record_upload(digest, user_id, content_type, size):
+        """Notes who uploaded a blob; uploading the same content again is a no-op."""
+        conn = get_db_connection()
+        if not conn: return False
+        try:
+            cursor = conn.cursor()
+            cursor.execute("""
+                INSERT INTO blobs (digest, uploaded_by, content_type, size)
+                VALUES (%s, %s, %s, %s)
+                ON CONFLICT (digest, uploaded_by) DO NOTHING
+            """, (digest, user_id, content_type, size))
+            conn.commit()
+            return True
+        except Exception as e:
+            print(f"Error recording blob upload: {e}")
+            conn.rollback()
+            return False
+        finally:
+            cursor.close()
+            conn.close()
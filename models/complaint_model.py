@@ -1,5 +1,10 @@
 import psycopg2.extras
-from database import get_db_connection
+from database import get_db_connection, get_pooled_connection, get_read_connection
+from utils.prepared import execute as execute_prepared
+from models.vendor_model import VendorStats
+from utils.events import notify
+from utils.cache import TTLCache
+from config import Config
 
 class Complaint:
     last_error = None
@@ -29,58 +34,478 @@ class Complaint:
             cursor.close()
             conn.close()
 
+    # Complaint ids listed in a bulk ingest's "created" event (the payload is capped by Postgres)
+    INGEST_EVENT_MAX_IDS = 500
+
     @staticmethod
-    def get_all():
+    def bulk_ingest(batch):
+        """
+        Loads a utils.ingest.IngestBatch: COPY into a temporary staging table, resolve category
+        names and check user ids set-based, then one INSERT ... SELECT for every row that passed.
+        Rows that fail the lookups are added to batch.rejected.
+        Returns the number of inserted complaints, or False on error (nothing is inserted).
+        """
+        from utils.ingest import STAGING_COLUMNS
         conn = get_db_connection()
-        if not conn: 
+        if not conn:
             Complaint.last_error = "Database connection failed"
-            return []
+            return False
+        try:
+            cursor = conn.cursor()
+            cursor.execute("DROP TABLE IF EXISTS complaint_ingest")
+            cursor.execute("""
+                CREATE TEMP TABLE complaint_ingest (
+                    line INT, user_id INT, category_id INT, category_name TEXT, description TEXT,
+                    location TEXT, image_path TEXT, resolution_type VARCHAR(20), created_at TIMESTAMP
+                ) ON COMMIT DROP
+            """)
+            cursor.copy_expert(
+                f"COPY complaint_ingest ({', '.join(STAGING_COLUMNS)}) FROM STDIN WITH (FORMAT csv)",
+                batch.buffer
+            )
+
+            # Category names -> ids in one pass (case-insensitive, like the names in the UI)
+            cursor.execute("""
+                UPDATE complaint_ingest s SET category_id = cat.id
+                FROM categories cat
+                WHERE s.category_id IS NULL AND lower(cat.name) = lower(s.category_name)
+            """)
+            cursor.execute("""
+                SELECT s.line,
+                       CASE WHEN cat.id IS NULL THEN 'Unknown category' ELSE 'Unknown user' END
+                FROM complaint_ingest s
+                LEFT JOIN categories cat ON cat.id = s.category_id
+                LEFT JOIN users u ON u.id = s.user_id
+                WHERE cat.id IS NULL OR u.id IS NULL
+                ORDER BY s.line
+            """)
+            for line, error in cursor.fetchall():
+                batch.reject(line, error)
+
+            # clock_timestamp(): the COPY above may have taken a while, and a since token handed
+            # out meanwhile must not be newer than these rows
+            cursor.execute("""
+                WITH inserted AS (
+                    INSERT INTO complaints (user_id, category_id, description, location, image_path, resolution_type, created_at, updated_at)
+                    SELECT s.user_id, s.category_id, s.description, s.location, s.image_path, s.resolution_type,
+                           COALESCE(s.created_at, clock_timestamp()), clock_timestamp()
+                    FROM complaint_ingest s
+                    JOIN categories cat ON cat.id = s.category_id
+                    JOIN users u ON u.id = s.user_id
+                    ORDER BY s.line
+                    RETURNING id, user_id
+                )
+                SELECT user_id, COUNT(*), (array_agg(id ORDER BY id))[1:%s] FROM inserted GROUP BY user_id
+            """, (Complaint.INGEST_EVENT_MAX_IDS,))
+            # One "created" event per owner and batch rather than one per row
+            inserted = 0
+            for user_id, count, ids in cursor.fetchall():
+                notify(cursor, "created", None, user_id, {"count": count, "ids": ids, "truncated": count > len(ids)})
+                inserted += count
+            conn.commit()
+            return inserted
+        except Exception as e:
+            print(f"Error ingesting complaints: {e}")
+            Complaint.last_error = str(e)
+            conn.rollback()
+            return False
+        finally:
+            cursor.close()
+            conn.close()
+
+    # Whitelist for ?fields= on the complaint listings: JSON name -> SQL expression
+    COLUMNS = {
+        "id": "c.id", "user_id": "c.user_id", "category_id": "c.category_id",
+        "description": "c.description", "location": "c.location", "image_path": "c.image_path",
+        "status": "c.status", "resolution_type": "c.resolution_type",
+        "assigned_officer_id": "c.assigned_officer_id", "selected_vendor_id": "c.selected_vendor_id",
+        "payment_status": "c.payment_status", "quote_count": "c.quote_count",
+        "min_quote_price": "c.min_quote_price", "agreed_price": "c.agreed_price",
+        "resolution_notes": "c.resolution_notes", "resolution_image": "c.resolution_image",
+        "created_at": "c.created_at", "updated_at": "c.updated_at",
+    }
+
+    # Default projection for list views; long text and images only come with fields=all or the detail fetch
+    SUMMARY_FIELDS = (
+        "id", "category_id", "location", "status", "resolution_type", "assigned_officer_id",
+        "selected_vendor_id", "payment_status", "quote_count", "min_quote_price", "agreed_price",
+        "created_at", "updated_at",
+    )
+
+    @staticmethod
+    def projection(fields, joined, required=("id",)):
+        """
+        SELECT list for a listing. `fields` is a list of names, None for the summary projection
+        or ["all"] for every column; `joined` maps the names the listing's joins add to their SQL
+        and is always included in the summary. Raises ValueError for names outside the whitelist.
+        """
+        available = dict(Complaint.COLUMNS, **joined)
+        if fields is None:
+            names = list(Complaint.SUMMARY_FIELDS) + list(joined)
+        elif fields == ["all"]:
+            names = list(available)
+        else:
+            unknown = [name for name in fields if name not in available]
+            if unknown:
+                raise ValueError(f"Unknown field(s): {', '.join(unknown)}")
+            names = list(fields)
+        # Keyset pagination and the clients need these whatever was asked for
+        names = list(dict.fromkeys(list(required) + names))
+        return ", ".join(f"{available[name]} as {name}" for name in names)
+
+    @staticmethod
+    def _filter_clause(filters):
+        """Builds the WHERE conditions shared by the admin listing queries."""
+        conditions = []
+        params = []
+        filters = filters or {}
+        if filters.get('status'):
+            conditions.append("c.status = %s")
+            params.append(filters['status'])
+        if filters.get('category'):
+            conditions.append("cat.name = %s")
+            params.append(filters['category'])
+        if filters.get('category_id'):
+            conditions.append("c.category_id = %s")
+            params.append(filters['category_id'])
+        if filters.get('resolution_type'):
+            conditions.append("c.resolution_type = %s")
+            params.append(filters['resolution_type'])
+        if filters.get('officer_id'):
+            conditions.append("c.assigned_officer_id = %s")
+            params.append(filters['officer_id'])
+        if filters.get('vendor_id'):
+            conditions.append("c.selected_vendor_id = %s")
+            params.append(filters['vendor_id'])
+        if filters.get('date_from'):
+            conditions.append("c.created_at >= %s")
+            params.append(filters['date_from'])
+        if filters.get('date_to'):
+            conditions.append("c.created_at < %s")
+            params.append(filters['date_to'])
+        return conditions, params
+
+    # The hot read queries are built by the *_query methods below and run both by the
+    # methods here and by AsyncComplaint (models/async_complaint_model.py).
+
+    # Only the admin listing shows vendor ratings, and a rating only moves when feedback is
+    # inserted (submit_feedback); the newest feedback id stands in for every vendor's rating
+    # instead of touching each vendor job (see migration 18). One probe of the primary key.
+    VENDOR_RATINGS_VERSION = "(SELECT MAX(id) FROM feedback)"
+
+    @staticmethod
+    def version_query(scope, scope_id=None, filters=None):
+        joins = ""
+        ratings = "NULL"
+        if scope == 'user':
+            conditions, params = ["c.user_id = %s"], [scope_id]
+        elif scope == 'vendor':
+            conditions, params = ["c.selected_vendor_id = %s"], [scope_id]
+        elif scope == 'officer':
+            conditions, params = ["c.assigned_officer_id = %s"], [scope_id]
+        else:
+            conditions, params = Complaint._filter_clause(filters)
+            if filters and filters.get('category'):
+                joins = "JOIN categories cat ON c.category_id = cat.id"
+            ratings = Complaint.VENDOR_RATINGS_VERSION
+        where = ("WHERE " + " AND ".join(conditions)) if conditions else ""
+        return (f"SELECT COUNT(*) AS count, MAX(c.updated_at) AS last_update, {ratings} AS ratings "
+                f"FROM complaints c {joins} {where}"), params
+
+    @staticmethod
+    def format_version(count, last_update, ratings=None):
+        version = f"{count}:{last_update.isoformat() if last_update else ''}"
+        return f"{version}:{ratings}" if ratings is not None else version
+
+    @staticmethod
+    def list_version(scope, scope_id=None, filters=None):
+        """
+        Cheap validator for a listing: row count + newest updated_at of the caller's scope, served
+        by the per-scope indexes. Every write that changes what the listings show bumps updated_at,
+        including the joined names and feedback (triggers from migrations 9, 14 and 18); the
+        admin listing also covers the vendor ratings it shows.
+        Returns a string, or None on error (callers then simply skip the conditional check).
+        """
+        query, params = Complaint.version_query(scope, scope_id, filters)
+        conn = get_read_connection()
+        if not conn: return None
+        try:
+            cursor = conn.cursor()
+            execute_prepared(cursor, "complaint_list_version", query, params)
+            return Complaint.format_version(*cursor.fetchone())
+        except Exception as e:
+            print(f"Error computing list version: {e}")
+            conn.rollback()
+            return None
+        finally:
+            cursor.close()
+            conn.close()
+
+    # Delta sync scopes: list owner column on complaints / on complaint_tombstones
+    SYNC_SCOPES = {
+        "user": ("c.user_id", "user_id"),
+        "vendor": ("c.selected_vendor_id", "vendor_id"),
+        "officer": ("c.assigned_officer_id", "officer_id"),
+    }
+
+    SYNC_CLOCK_QUERY = """
+        SELECT clock_timestamp()::timestamp - make_interval(secs => %s) AS next_since,
+               clock_timestamp()::timestamp - make_interval(days => %s) AS retained_from
+    """
+
+    @staticmethod
+    def tombstone_query(scope, scope_id, since):
+        _, tombstone_column = Complaint.SYNC_SCOPES[scope]
+        return (f"SELECT DISTINCT complaint_id FROM complaint_tombstones WHERE {tombstone_column} = %s AND created_at > %s",
+                (scope_id, since))
+
+    @staticmethod
+    def sync_point(scope, scope_id, since=None):
+        """
+        Bookkeeping for a ?since= request on a citizen / vendor / officer list. Returns
+        (next_since, deleted_ids, reset): next_since is the database clock minus
+        SYNC_OVERLAP_SECONDS, taken before the rows are read; deleted_ids are the complaints
+        that left the list after `since`; reset is True when `since` predates the tombstone
+        retention and the client needs the full list. Returns (None, None, None) on error.
+        """
+        conn = get_db_connection()
+        if not conn:
+            Complaint.last_error = "Database connection failed"
+            return None, None, None
+        try:
+            cursor = conn.cursor()
+            cursor.execute(Complaint.SYNC_CLOCK_QUERY, (Config.SYNC_OVERLAP_SECONDS, Config.SYNC_TOMBSTONE_RETENTION_DAYS))
+            next_since, retained_from = cursor.fetchone()
+            if since is None or since < retained_from:
+                return next_since, [], since is not None
+            cursor.execute(*Complaint.tombstone_query(scope, scope_id, since))
+            return next_since, [row[0] for row in cursor.fetchall()], False
+        except Exception as e:
+            print(f"Error reading sync state: {e}")
+            Complaint.last_error = str(e)
+            conn.rollback()
+            return None, None, None
+        finally:
+            cursor.close()
+            conn.close()
+
+    @staticmethod
+    def purge_tombstones():
+        """Drops tombstones older than SYNC_TOMBSTONE_RETENTION_DAYS. Returns the count, or False on error."""
+        conn = get_db_connection()
+        if not conn: return False
+        try:
+            cursor = conn.cursor()
+            cursor.execute(
+                "DELETE FROM complaint_tombstones WHERE created_at < clock_timestamp()::timestamp - make_interval(days => %s)",
+                (Config.SYNC_TOMBSTONE_RETENTION_DAYS,)
+            )
+            purged = cursor.rowcount
+            conn.commit()
+            return purged
+        except Exception as e:
+            print(f"Error purging tombstones: {e}")
+            conn.rollback()
+            return False
+        finally:
+            cursor.close()
+            conn.close()
+
+    @staticmethod
+    def page_query(filters=None, after=None, limit=50, fields=None):
+        columns = Complaint.projection(fields, {
+            "category_name": "cat.name", "citizen_name": "u.name", "vendor_name": "v.business_name",
+            "vendor_rating": "v.rating", "user_rating": "f.rating", "officer_name": "o.name",
+        }, required=("id", "created_at"))
+        conditions, params = Complaint._filter_clause(filters)
+        if after:
+            conditions.append("(c.created_at, c.id) < (%s, %s)")
+            params.extend(after)
+        where = ("WHERE " + " AND ".join(conditions)) if conditions else ""
+        query = f"""
+            SELECT {columns}
+            FROM complaints c
+            JOIN categories cat ON c.category_id = cat.id
+            JOIN users u ON c.user_id = u.id
+            LEFT JOIN users o ON c.assigned_officer_id = o.id
+            LEFT JOIN vendors v ON c.selected_vendor_id = v.user_id
+            LEFT JOIN feedback f ON c.id = f.complaint_id
+            {where}
+            ORDER BY c.created_at DESC, c.id DESC
+            LIMIT %s
+        """
+        # One extra row tells whether another page exists
+        return query, params + [limit + 1]
+
+    @staticmethod
+    def get_page(filters=None, after=None, limit=50, fields=None):
+        """
+        Keyset-paginated admin listing ordered by (created_at, id) DESC.
+        `after` is the (created_at, id) of the last row of the previous page.
+        Returns (rows, has_more). Raises ValueError for unknown `fields`.
+        """
+        query, params = Complaint.page_query(filters, after, limit, fields)
+        Complaint.last_error = None
+        conn = get_read_connection()
+        if not conn:
+            Complaint.last_error = "Database connection failed"
+            return [], False
         try:
             cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
-            query = """
-                SELECT c.*, cat.name as category_name, u.name as citizen_name, 
-                       v.business_name as vendor_name, v.rating as vendor_rating,
-                       f.rating as user_rating, o.name as officer_name
-                FROM complaints c
-                JOIN categories cat ON c.category_id = cat.id
-                JOIN users u ON c.user_id = u.id
-                LEFT JOIN users o ON c.assigned_officer_id = o.id
-                LEFT JOIN vendors v ON c.selected_vendor_id = v.user_id
-                LEFT JOIN feedback f ON c.id = f.complaint_id
-                ORDER BY c.created_at DESC
-            """
-            cursor.execute(query)
+            execute_prepared(cursor, "complaint_page", query, params)
             data = cursor.fetchall()
-            return data
+            return data[:limit], len(data) > limit
         except Exception as e:
-            print(f"Error fetching all complaints: {e}")
+            print(f"Error fetching complaint page: {e}")
             Complaint.last_error = str(e)
-            return []
+            return [], False
         finally:
             if 'cursor' in locals(): cursor.close()
             if 'conn' in locals(): conn.close()
 
+    # Audit export columns; image payloads are deliberately left out
+    EXPORT_COLUMNS = [
+        ("id", "c.id"), ("user_id", "c.user_id"), ("citizen_name", "u.name"),
+        ("category_id", "c.category_id"), ("category_name", "cat.name"),
+        ("description", "c.description"), ("location", "c.location"), ("status", "c.status"),
+        ("resolution_type", "c.resolution_type"), ("assigned_officer_id", "c.assigned_officer_id"),
+        ("officer_name", "o.name"), ("selected_vendor_id", "c.selected_vendor_id"),
+        ("vendor_name", "v.business_name"), ("payment_status", "c.payment_status"),
+        ("quote_count", "c.quote_count"), ("agreed_price", "c.agreed_price"),
+        ("resolution_notes", "c.resolution_notes"), ("feedback_rating", "f.rating"),
+        ("created_at", "c.created_at"), ("updated_at", "c.updated_at"),
+    ]
+
     @staticmethod
-    def get_by_user(user_id):
-        conn = get_db_connection()
+    def export_rows(filters=None, itersize=2000):
+        """
+        Streams every matching complaint through a server-side (named) cursor, `itersize` rows per
+        round trip, so memory stays flat regardless of table size. Uses its own pooled connection
+        because the stream outlives the request's unit of work.
+        Returns a row generator, or None when no connection is available.
+        """
+        conn = get_pooled_connection()
+        if not conn:
+            Complaint.last_error = "Database connection failed"
+            return None
+
+        conditions, params = Complaint._filter_clause(filters)
+        where = ("WHERE " + " AND ".join(conditions)) if conditions else ""
+        columns = ", ".join(f"{expr} as {name}" for name, expr in Complaint.EXPORT_COLUMNS)
+        query = f"""
+            SELECT {columns}
+            FROM complaints c
+            JOIN categories cat ON c.category_id = cat.id
+            JOIN users u ON c.user_id = u.id
+            LEFT JOIN users o ON c.assigned_officer_id = o.id
+            LEFT JOIN vendors v ON c.selected_vendor_id = v.user_id
+            LEFT JOIN feedback f ON c.id = f.complaint_id
+            {where}
+            ORDER BY c.id
+        """
+
+        def rows():
+            cursor = None
+            try:
+                cursor = conn.cursor(name="complaint_export", cursor_factory=psycopg2.extras.RealDictCursor)
+                cursor.itersize = itersize
+                cursor.execute(query, params)
+                for row in cursor:
+                    yield row
+            except Exception as e:
+                print(f"Error exporting complaints: {e}")
+                raise
+            finally:
+                try:
+                    if cursor is not None: cursor.close()
+                    conn.rollback()
+                except Exception:
+                    pass
+                conn.close()
+
+        return rows()
+
+    @staticmethod
+    def available_query(vendor_user_id, service_type=None, exclude_quoted=False, after=None, limit=50, fields=None):
+        # Vendors quote from the description, so the marketplace summary keeps it
+        columns = Complaint.projection(fields, {
+            "category_name": "cat.name", "citizen_name": "u.name", "description": "c.description",
+        }, required=("id", "created_at"))
+        conditions = ["c.resolution_type = 'private'", "c.status = 'Awaiting Quotes'"]
+        params = []
+        # Same matching rules as User.get_all_by_role: 'General' (or no) service type sees everything
+        if service_type and service_type != 'General':
+            conditions.append("(cat.name = %s OR (%s = 'Waste Management' AND cat.name = 'Garbage'))")
+            params.extend([service_type, service_type])
+        if exclude_quoted:
+            conditions.append("NOT EXISTS (SELECT 1 FROM quotations q WHERE q.complaint_id = c.id AND q.vendor_id = %s)")
+            params.append(vendor_user_id)
+        if after:
+            conditions.append("(c.created_at, c.id) < (%s, %s)")
+            params.extend(after)
+        query = f"""
+            SELECT {columns}
+            FROM complaints c
+            JOIN categories cat ON c.category_id = cat.id
+            JOIN users u ON c.user_id = u.id
+            WHERE {" AND ".join(conditions)}
+            ORDER BY c.created_at DESC, c.id DESC
+            LIMIT %s
+        """
+        return query, params + [limit + 1]
+
+    @staticmethod
+    def get_available_for_vendor(vendor_user_id, service_type=None, exclude_quoted=False, after=None, limit=50, fields=None):
+        """
+        Open private jobs (resolution_type='private', status='Awaiting Quotes') for the vendor marketplace,
+        newest first and keyset-paginated like get_page. Served by the idx_complaints_open_private partial index.
+        Returns (rows, has_more). Raises ValueError for unknown `fields`.
+        """
+        query, params = Complaint.available_query(vendor_user_id, service_type, exclude_quoted, after, limit, fields)
+        Complaint.last_error = None
+        conn = get_read_connection()
+        if not conn:
+            Complaint.last_error = "Database connection failed"
+            return [], False
+        try:
+            cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
+            execute_prepared(cursor, "complaint_available", query, params)
+            data = cursor.fetchall()
+            return data[:limit], len(data) > limit
+        except Exception as e:
+            print(f"Error fetching available jobs: {e}")
+            Complaint.last_error = str(e)
+            return [], False
+        finally:
+            if 'cursor' in locals(): cursor.close()
+            if 'conn' in locals(): conn.close()
+
+    @staticmethod
+    def user_list_query(user_id, fields=None, since=None):
+        columns = Complaint.projection(fields, {
+            "category_name": "cat.name", "vendor_name": "v.business_name", "user_rating": "f.rating",
+        })
+        query = f"""
+            SELECT {columns}
+            FROM complaints c
+            JOIN categories cat ON c.category_id = cat.id
+            LEFT JOIN vendors v ON c.selected_vendor_id = v.user_id
+            LEFT JOIN feedback f ON c.id = f.complaint_id
+            WHERE c.user_id = %s {"AND c.updated_at > %s" if since else ""}
+            ORDER BY c.created_at DESC
+        """
+        return query, (user_id, since) if since else (user_id,)
+
+    @staticmethod
+    def get_by_user(user_id, fields=None, since=None):
+        query, params = Complaint.user_list_query(user_id, fields, since)
+        conn = get_read_connection()
         if not conn: 
             Complaint.last_error = "Database connection failed"
             return []
         try:
             cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
-            query = """
-                SELECT c.*, cat.name as category_name, v.business_name as vendor_name,
-                       (SELECT price FROM quotations WHERE complaint_id = c.id AND status = 'Approved' LIMIT 1) as agreed_price,
-                       (SELECT COUNT(*) FROM quotations WHERE complaint_id = c.id) as quote_count,
-                       f.rating as user_rating
-                FROM complaints c
-                JOIN categories cat ON c.category_id = cat.id
-                LEFT JOIN vendors v ON c.selected_vendor_id = v.user_id
-                LEFT JOIN feedback f ON c.id = f.complaint_id
-                WHERE c.user_id = %s
-                ORDER BY c.created_at DESC
-            """
-            cursor.execute(query, (user_id,))
+            execute_prepared(cursor, "complaint_by_user", query, params)
             data = cursor.fetchall()
             return data
         except Exception as e:
@@ -92,23 +517,30 @@ class Complaint:
             if 'conn' in locals(): conn.close()
 
     @staticmethod
-    def get_by_vendor(vendor_user_id):
-        conn = get_db_connection()
+    def vendor_list_query(vendor_user_id, fields=None, since=None):
+        columns = Complaint.projection(fields, {
+            "citizen_name": "u.name", "category_name": "cat.name", "price": "c.agreed_price",
+        })
+        query = f"""
+            SELECT {columns}
+            FROM complaints c
+            JOIN users u ON c.user_id = u.id
+            JOIN categories cat ON c.category_id = cat.id
+            WHERE c.selected_vendor_id = %s {"AND c.updated_at > %s" if since else ""}
+            ORDER BY c.updated_at DESC
+        """
+        return query, (vendor_user_id, since) if since else (vendor_user_id,)
+
+    @staticmethod
+    def get_by_vendor(vendor_user_id, fields=None, since=None):
+        query, params = Complaint.vendor_list_query(vendor_user_id, fields, since)
+        conn = get_read_connection()
         if not conn: 
             Complaint.last_error = "Database connection failed"
             return []
         try:
             cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
-            query = """
-                SELECT c.*, u.name as citizen_name, cat.name as category_name,
-                       (SELECT price FROM quotations WHERE complaint_id = c.id AND vendor_id = %s LIMIT 1) as price
-                FROM complaints c
-                JOIN users u ON c.user_id = u.id
-                JOIN categories cat ON c.category_id = cat.id
-                WHERE c.selected_vendor_id = %s
-                ORDER BY c.updated_at DESC
-            """
-            cursor.execute(query, (vendor_user_id, vendor_user_id))
+            execute_prepared(cursor, "complaint_by_vendor", query, params)
             data = cursor.fetchall()
             return data
         except Exception as e:
@@ -119,12 +551,86 @@ class Complaint:
             if 'cursor' in locals(): cursor.close()
             if 'conn' in locals(): conn.close()
 
+    DETAIL_QUERY = """
+        SELECT c.*, cat.name as category_name, u.name as citizen_name,
+               v.business_name as vendor_name, v.rating as vendor_rating,
+               o.name as officer_name, f.rating as feedback_rating, f.comment as feedback_comment
+        FROM complaints c
+        JOIN categories cat ON c.category_id = cat.id
+        JOIN users u ON c.user_id = u.id
+        LEFT JOIN users o ON c.assigned_officer_id = o.id
+        LEFT JOIN vendors v ON c.selected_vendor_id = v.user_id
+        LEFT JOIN feedback f ON c.id = f.complaint_id
+        WHERE c.id = %s
+    """
+
+    @staticmethod
+    def get_by_id(complaint_id):
+        """Full row plus every joined name, for the detail view. Returns None when missing or on error."""
+        conn = get_read_connection()
+        if not conn:
+            Complaint.last_error = "Database connection failed"
+            return None
+        try:
+            cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
+            execute_prepared(cursor, "complaint_by_id", Complaint.DETAIL_QUERY, (complaint_id,))
+            return cursor.fetchone()
+        except Exception as e:
+            print(f"Error fetching complaint: {e}")
+            Complaint.last_error = str(e)
+            return None
+        finally:
+            if 'cursor' in locals(): cursor.close()
+            if 'conn' in locals(): conn.close()
+
+    # Appended to status-changing UPDATEs, in the shape notify_status expects
+    STATUS_RETURNING = "RETURNING id, user_id, status, updated_at"
+
+    @staticmethod
+    def lock_statuses(cursor, complaint_ids):
+        """Locks the complaints FOR UPDATE and returns id -> status before the change."""
+        cursor.execute("SELECT id, status FROM complaints WHERE id = ANY(%s) FOR UPDATE", (list(complaint_ids),))
+        return dict(cursor.fetchall())
+
+    @staticmethod
+    def notify_status(cursor, previous, rows):
+        """
+        Pushes a "status" event per (id, user_id, status, updated_at) row to open event streams,
+        like update_status does. Postgres sends them only if the transaction commits.
+        """
+        for complaint_id, user_id, status, updated_at in rows:
+            notify(cursor, "status", complaint_id, user_id, {
+                "id": complaint_id, "status": status, "previous_status": previous.get(complaint_id),
+                "updated_at": updated_at,
+            })
+
+    @staticmethod
+    def unresolve_vendor_jobs(cursor, complaint_ids):
+        """
+        Call before re-routing locked complaints: a 'Resolved' one leaves its vendor's completed
+        jobs and earnings, as in update_status. Returns the vendor ids whose counters changed.
+        """
+        cursor.execute("""
+            SELECT c.selected_vendor_id, COUNT(DISTINCT c.id), COALESCE(SUM(q.price), 0)
+            FROM complaints c
+            LEFT JOIN quotations q ON q.complaint_id = c.id AND q.vendor_id = c.selected_vendor_id
+            WHERE c.id = ANY(%s) AND c.status = 'Resolved' AND c.selected_vendor_id IS NOT NULL
+            GROUP BY c.selected_vendor_id
+        """, (list(complaint_ids),))
+        vendor_ids = []
+        for vendor_id, jobs, earnings in cursor.fetchall():
+            VendorStats.bump(cursor, vendor_id, completed_jobs=-jobs, earnings=-earnings)
+            vendor_ids.append(vendor_id)
+        return vendor_ids
+
     @staticmethod
     def route_to_government(complaint_id, officer_id=None):
         conn = get_db_connection()
         if not conn: return False, "Database connection failed"
         try:
             cursor = conn.cursor()
+            previous = Complaint.lock_statuses(cursor, [complaint_id])
+            affected_vendors = Complaint.unresolve_vendor_jobs(cursor, [complaint_id])
             if officer_id:
                 query = """
                     UPDATE complaints SET 
@@ -133,7 +639,7 @@ class Complaint:
                     status = 'In Progress',
                     updated_at = CURRENT_TIMESTAMP 
                     WHERE id = %s
-                """
+                """ + Complaint.STATUS_RETURNING
                 cursor.execute(query, (officer_id, complaint_id))
             else:
                 query = """
@@ -142,9 +648,11 @@ class Complaint:
                     status = 'Routed',
                     updated_at = CURRENT_TIMESTAMP 
                     WHERE id = %s
-                """
+                """ + Complaint.STATUS_RETURNING
                 cursor.execute(query, (complaint_id,))
+            Complaint.notify_status(cursor, previous, cursor.fetchall())
             conn.commit()
+            VendorStats.invalidate(*affected_vendors)
             return True, "Complaint routed to government"
         except Exception as e:
             error_msg = f"Error routing to government: {str(e)}"
@@ -161,15 +669,19 @@ class Complaint:
         if not conn: return False, "Database connection failed"
         try:
             cursor = conn.cursor()
+            previous = Complaint.lock_statuses(cursor, [complaint_id])
+            affected_vendors = Complaint.unresolve_vendor_jobs(cursor, [complaint_id])
             query = """
                 UPDATE complaints SET 
                 resolution_type = 'private', 
                 status = 'Awaiting Quotes',
                 updated_at = CURRENT_TIMESTAMP 
                 WHERE id = %s
-            """
+            """ + Complaint.STATUS_RETURNING
             cursor.execute(query, (complaint_id,))
+            Complaint.notify_status(cursor, previous, cursor.fetchall())
             conn.commit()
+            VendorStats.invalidate(*affected_vendors)
             return True, "Complaint routed to private marketplace"
         except Exception as e:
             error_msg = f"Error routing to private: {str(e)}"
@@ -186,16 +698,21 @@ class Complaint:
         if not conn: return False, "Database connection failed"
         try:
             cursor = conn.cursor()
+            previous = Complaint.lock_statuses(cursor, [complaint_id])
+            affected_vendors = Complaint.unresolve_vendor_jobs(cursor, [complaint_id])
             query = """
                 UPDATE complaints SET 
                 resolution_type = 'private', 
                 selected_vendor_id = %s, 
                 status = 'In Progress',
+                agreed_price = (SELECT MIN(price) FROM quotations WHERE complaint_id = %s AND vendor_id = %s),
                 updated_at = CURRENT_TIMESTAMP 
                 WHERE id = %s
-            """
-            cursor.execute(query, (vendor_id, complaint_id))
+            """ + Complaint.STATUS_RETURNING
+            cursor.execute(query, (vendor_id, complaint_id, vendor_id, complaint_id))
+            Complaint.notify_status(cursor, previous, cursor.fetchall())
             conn.commit()
+            VendorStats.invalidate(*affected_vendors)
             return True, "Complaint directly assigned to vendor"
         except Exception as e:
             error_msg = f"Error assigning vendor: {str(e)}"
@@ -206,28 +723,143 @@ class Complaint:
             cursor.close()
             conn.close()
 
+    @staticmethod
+    def bulk_route(items):
+        """
+        Applies many routing decisions in one transaction with one statement per action type
+        instead of one round trip per complaint. `items` are validated dicts with complaint_id,
+        action ('government' | 'private' | 'vendor') and officer_id / vendor_id.
+        Returns (results, error): results maps complaint_id -> error message or None on success;
+        on a database error nothing is applied and results is None.
+        """
+        conn = get_db_connection()
+        if not conn: return None, "Database connection failed"
+        try:
+            cursor = conn.cursor()
+            results = {}
+            complaint_ids = [item['complaint_id'] for item in items]
+
+            # Lock the targeted rows so a concurrent single-item route cannot interleave
+            previous = Complaint.lock_statuses(cursor, complaint_ids)
+
+            assignee_ids = list({item.get('officer_id') or item.get('vendor_id') for item in items} - {None})
+            roles = {}
+            if assignee_ids:
+                cursor.execute("SELECT id, role FROM users WHERE id = ANY(%s)", (assignee_ids,))
+                roles = dict(cursor.fetchall())
+
+            government, private, vendor = [], [], []
+            for item in items:
+                complaint_id = item['complaint_id']
+                if complaint_id not in previous:
+                    results[complaint_id] = "Complaint not found"
+                elif item['action'] == 'government':
+                    officer_id = item.get('officer_id')
+                    if officer_id and roles.get(officer_id) != 'officer':
+                        results[complaint_id] = "Officer not found"
+                    else:
+                        government.append((complaint_id, officer_id))
+                elif item['action'] == 'private':
+                    private.append(complaint_id)
+                elif roles.get(item['vendor_id']) != 'vendor':
+                    results[complaint_id] = "Vendor not found"
+                else:
+                    vendor.append((complaint_id, item['vendor_id']))
+
+            # Same column changes and side effects as route_to_government / route_to_private / assign_vendor
+            affected_vendors = Complaint.unresolve_vendor_jobs(
+                cursor, [c for c, _ in government] + private + [c for c, _ in vendor]
+            )
+            updated = []
+            if government:
+                updated += psycopg2.extras.execute_values(cursor, """
+                    UPDATE complaints c SET
+                    resolution_type = 'government',
+                    assigned_officer_id = COALESCE(v.officer_id, c.assigned_officer_id),
+                    status = CASE WHEN v.officer_id IS NULL THEN 'Routed' ELSE 'In Progress' END,
+                    updated_at = CURRENT_TIMESTAMP
+                    FROM (VALUES %s) AS v(id, officer_id)
+                    WHERE c.id = v.id
+                    RETURNING c.id, c.user_id, c.status, c.updated_at
+                """, government, template="(%s::int, %s::int)", page_size=len(government), fetch=True)
+            if private:
+                cursor.execute("""
+                    UPDATE complaints SET
+                    resolution_type = 'private',
+                    status = 'Awaiting Quotes',
+                    updated_at = CURRENT_TIMESTAMP
+                    WHERE id = ANY(%s)
+                """ + Complaint.STATUS_RETURNING, (private,))
+                updated += cursor.fetchall()
+            if vendor:
+                updated += psycopg2.extras.execute_values(cursor, """
+                    UPDATE complaints c SET
+                    resolution_type = 'private',
+                    selected_vendor_id = v.vendor_id,
+                    status = 'In Progress',
+                    agreed_price = (SELECT MIN(q.price) FROM quotations q WHERE q.complaint_id = c.id AND q.vendor_id = v.vendor_id),
+                    updated_at = CURRENT_TIMESTAMP
+                    FROM (VALUES %s) AS v(id, vendor_id)
+                    WHERE c.id = v.id
+                    RETURNING c.id, c.user_id, c.status, c.updated_at
+                """, vendor, template="(%s::int, %s::int)", page_size=len(vendor), fetch=True)
+
+            for row in updated:
+                results[row[0]] = None
+            Complaint.notify_status(cursor, previous, updated)
+            conn.commit()
+            VendorStats.invalidate(*affected_vendors)
+            return results, None
+        except Exception as e:
+            error_msg = f"Error applying bulk routing: {str(e)}"
+            print(error_msg)
+            conn.rollback()
+            return None, error_msg
+        finally:
+            cursor.close()
+            conn.close()
+
     @staticmethod
     def approve_quotation(complaint_id, vendor_id):
         conn = get_db_connection()
         if not conn: return False
         try:
             cursor = conn.cursor()
+            previous = Complaint.lock_statuses(cursor, [complaint_id])
             # 1. Update Complaint status and selected_vendor
             # Change: Status becomes 'Awaiting Payment' instead of 'In Progress'
             query_comp = """
                 UPDATE complaints SET 
                 selected_vendor_id = %s, 
                 status = 'Awaiting Payment',
+                agreed_price = (SELECT MIN(price) FROM quotations WHERE complaint_id = %s AND vendor_id = %s),
                 updated_at = CURRENT_TIMESTAMP 
                 WHERE id = %s
-            """
-            cursor.execute(query_comp, (vendor_id, complaint_id))
+            """ + Complaint.STATUS_RETURNING
+            cursor.execute(query_comp, (vendor_id, complaint_id, vendor_id, complaint_id))
+            Complaint.notify_status(cursor, previous, cursor.fetchall())
             
-            # 2. Update Quotations status
+            # 2. Every still-pending bid on this complaint stops being an active bid for its vendor
+            cursor.execute("""
+                UPDATE vendor_stats vs SET
+                active_bids = vs.active_bids - p.pending,
+                updated_at = CURRENT_TIMESTAMP
+                FROM (
+                    SELECT vendor_id, COUNT(*) AS pending FROM quotations
+                    WHERE complaint_id = %s AND status = 'Pending'
+                    GROUP BY vendor_id
+                ) p
+                WHERE vs.vendor_id = p.vendor_id
+                RETURNING vs.vendor_id
+            """, (complaint_id,))
+            affected_vendors = [row[0] for row in cursor.fetchall()]
+
+            # 3. Update Quotations status
             cursor.execute("UPDATE quotations SET status = 'Rejected' WHERE complaint_id = %s", (complaint_id,))
             cursor.execute("UPDATE quotations SET status = 'Approved' WHERE complaint_id = %s AND vendor_id = %s", (complaint_id, vendor_id))
             
             conn.commit()
+            VendorStats.invalidate(*affected_vendors)
             return True
         except Exception as e:
             print(f"Error approving quotation: {e}")
@@ -243,6 +875,7 @@ class Complaint:
         if not conn: return False
         try:
             cursor = conn.cursor()
+            previous = Complaint.lock_statuses(cursor, [complaint_id])
             # Set status to 'In Progress' and payment_status to 'paid'
             query = """
                 UPDATE complaints SET 
@@ -250,8 +883,9 @@ class Complaint:
                 payment_status = 'paid',
                 updated_at = CURRENT_TIMESTAMP 
                 WHERE id = %s
-            """
+            """ + Complaint.STATUS_RETURNING
             cursor.execute(query, (complaint_id,))
+            Complaint.notify_status(cursor, previous, cursor.fetchall())
             conn.commit()
             return True
         except Exception as e:
@@ -274,26 +908,18 @@ class Complaint:
                 VALUES (%s, %s, %s)
             """
             cursor.execute(query, (complaint_id, rating, comment))
+            # (trg_feedback_touch_complaint bumps the complaint's updated_at for the listings' ETags / delta sync)
             
-            # 2. Get the vendor ID for this complaint
-            cursor.execute("SELECT selected_vendor_id FROM complaints WHERE id = %s", (complaint_id,))
-            vendor_res = cursor.fetchone()
-            if vendor_res and vendor_res[0]:
-                vendor_user_id = vendor_res[0]
-                
-                # 3. Recalculate average rating for this vendor
-                cursor.execute("""
-                    SELECT AVG(rating) as avg_rating 
-                    FROM feedback f
-                    JOIN complaints c ON f.complaint_id = c.id
-                    WHERE c.selected_vendor_id = %s
-                """, (vendor_user_id,))
-                avg_res = cursor.fetchone()
-                if avg_res and avg_res[0] is not None:
-                    new_avg = avg_res[0]
-                    
-                    # 4. Update vendors table
-                    cursor.execute("UPDATE vendors SET rating = %s WHERE user_id = %s", (new_avg, vendor_user_id))
+            # 2. Fold the rating into the selected vendor's running aggregate.
+            # A single-row increment: no AVG over the vendor's history, and concurrent
+            # feedback for the same vendor only contends on that one row.
+            cursor.execute("""
+                UPDATE vendors SET
+                rating_sum = rating_sum + %s::int,
+                rating_count = rating_count + 1,
+                rating = ROUND((rating_sum + %s::int)::numeric / (rating_count + 1), 2)
+                WHERE user_id = (SELECT selected_vendor_id FROM complaints WHERE id = %s)
+            """, (rating, rating, complaint_id))
             
             conn.commit()
             return True
@@ -307,56 +933,35 @@ class Complaint:
 
     @staticmethod
     def get_vendor_stats(vendor_user_id):
-        conn = get_db_connection()
-        if not conn: return {"active_bids": 0, "completed_jobs": 0, "total_earnings": 0}
-        try:
-            cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
-            
-            # Active Bids (Quotations that are still pending)
-            cursor.execute("SELECT COUNT(*) as count FROM quotations WHERE vendor_id = %s AND status = 'Pending'", (vendor_user_id,))
-            active_bids = cursor.fetchone()['count']
-            
-            # Completed Jobs
-            cursor.execute("SELECT COUNT(*) as count FROM complaints WHERE selected_vendor_id = %s AND status = 'Resolved'", (vendor_user_id,))
-            completed_jobs = cursor.fetchone()['count']
-            
-            # Total Earnings (Sum of agreed prices for resolved jobs)
-            cursor.execute("""
-                SELECT SUM(q.price) as total 
-                FROM complaints c
-                JOIN quotations q ON c.id = q.complaint_id AND c.selected_vendor_id = q.vendor_id
-                WHERE c.selected_vendor_id = %s AND c.status = 'Resolved'
-            """, (vendor_user_id,))
-            earnings = cursor.fetchone()['total'] or 0
-            
-            return {
-                "active_bids": active_bids,
-                "completed_jobs": completed_jobs,
-                "total_earnings": float(earnings)
-            }
-        except Exception as e:
-            print(f"Error fetching vendor stats: {e}")
-            return {"active_bids": 0, "completed_jobs": 0, "total_earnings": 0}
-        finally:
-            cursor.close()
-            conn.close()
+        # One indexed row from vendor_stats, cached for a few seconds (see VendorStats)
+        return VendorStats.get(vendor_user_id)
 
     @staticmethod
-    def get_assigned_to_officer(officer_id):
-        conn = get_db_connection()
-        if not conn: return []
-        cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
-        query = """
-            SELECT c.*, u.name as citizen_name, cat.name as category_name,
-                   f.rating as feedback_rating, f.comment as feedback_comment
+    def officer_list_query(officer_id, fields=None, since=None):
+        # Officers work from the description and notes, so their summary keeps them
+        columns = Complaint.projection(fields, {
+            "citizen_name": "u.name", "category_name": "cat.name", "description": "c.description",
+            "resolution_notes": "c.resolution_notes", "feedback_rating": "f.rating",
+            "feedback_comment": "f.comment",
+        })
+        query = f"""
+            SELECT {columns}
             FROM complaints c
             JOIN users u ON c.user_id = u.id
             JOIN categories cat ON c.category_id = cat.id
             LEFT JOIN feedback f ON c.id = f.complaint_id
-            WHERE c.assigned_officer_id = %s
+            WHERE c.assigned_officer_id = %s {"AND c.updated_at > %s" if since else ""}
             ORDER BY c.created_at DESC
         """
-        cursor.execute(query, (officer_id,))
+        return query, (officer_id, since) if since else (officer_id,)
+
+    @staticmethod
+    def get_assigned_to_officer(officer_id, fields=None, since=None):
+        query, params = Complaint.officer_list_query(officer_id, fields, since)
+        conn = get_read_connection()
+        if not conn: return []
+        cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
+        execute_prepared(cursor, "complaint_by_officer", query, params)
         data = cursor.fetchall()
         cursor.close()
         conn.close()
@@ -372,18 +977,43 @@ class Complaint:
             return False
         try:
             cursor = conn.cursor()
-            print(f"DEBUG: Updating complaint {id} to status {status}")
+            cursor.execute("SELECT status, selected_vendor_id, user_id FROM complaints WHERE id = %s FOR UPDATE", (id,))
+            previous = cursor.fetchone()
             if status == 'Resolved' and resolution_notes:
                 if resolution_image:
-                    query = "UPDATE complaints SET status = %s, resolution_notes = %s, resolution_image = %s, updated_at = CURRENT_TIMESTAMP WHERE id = %s"
+                    query = "UPDATE complaints SET status = %s, resolution_notes = %s, resolution_image = %s, updated_at = CURRENT_TIMESTAMP WHERE id = %s RETURNING updated_at"
                     cursor.execute(query, (status, resolution_notes, resolution_image, id))
                 else:
-                    query = "UPDATE complaints SET status = %s, resolution_notes = %s, updated_at = CURRENT_TIMESTAMP WHERE id = %s"
+                    query = "UPDATE complaints SET status = %s, resolution_notes = %s, updated_at = CURRENT_TIMESTAMP WHERE id = %s RETURNING updated_at"
                     cursor.execute(query, (status, resolution_notes, id))
             else:
-                query = "UPDATE complaints SET status = %s, updated_at = CURRENT_TIMESTAMP WHERE id = %s"
+                query = "UPDATE complaints SET status = %s, updated_at = CURRENT_TIMESTAMP WHERE id = %s RETURNING updated_at"
                 cursor.execute(query, (status, id))
+            updated = cursor.fetchone()
+
+            # Push the transition to open event streams (sent by Postgres on commit)
+            if previous and updated:
+                notify(cursor, "status", id, previous[2], {
+                    "id": id, "status": status, "previous_status": previous[0],
+                    "resolution_notes": resolution_notes if status == 'Resolved' else None,
+                    "updated_at": updated[0],
+                })
+
+            # Entering or leaving 'Resolved' moves the job in/out of the vendor's completed jobs and earnings
+            vendor_id = previous[1] if previous else None
+            was_resolved = previous is not None and previous[0] == 'Resolved'
+            if vendor_id and was_resolved != (status == 'Resolved'):
+                cursor.execute(
+                    "SELECT COALESCE(SUM(price), 0) FROM quotations WHERE complaint_id = %s AND vendor_id = %s",
+                    (id, vendor_id)
+                )
+                earnings = cursor.fetchone()[0]
+                sign = 1 if status == 'Resolved' else -1
+                VendorStats.bump(cursor, vendor_id, completed_jobs=sign, earnings=sign * earnings)
+
             conn.commit()
+            if vendor_id:
+                VendorStats.invalidate(vendor_id)
             return True
         except Exception as e:
             print(f"Error updating status: {e}")
@@ -392,3 +1022,255 @@ class Complaint:
         finally:
             cursor.close()
             conn.close()
+
+    # Columns that used to carry base64 images inline (see utils/blob_store.py)
+    IMAGE_COLUMNS = (
+        ("complaints", ("image_path", "resolution_image")),
+        ("job_updates", ("image_url",)),
+    )
+
+    @staticmethod
+    def externalize_images(batch_size=50):
+        """
+        Moves inline base64 images into the blob store, leaving /api/blobs/<digest> references
+        in the rows. Works in id order, one committed batch at a time, so it can be re-run
+        after an interruption. Returns the number of rewritten rows, or False on error.
+        """
+        from utils.blob_store import externalize, BLOB_URL_PREFIX, InvalidBlob
+        conn = get_db_connection()
+        if not conn: return False
+        try:
+            cursor = conn.cursor()
+            rewritten = 0
+            for table, columns in Complaint.IMAGE_COLUMNS:
+                # Short values are URLs, paths or references already
+                candidate = " OR ".join(
+                    f"(length({col}) > 256 AND {col} NOT LIKE %s)" for col in columns
+                )
+                last_id = 0
+                while True:
+                    cursor.execute(
+                        f"SELECT id, {', '.join(columns)} FROM {table} "
+                        f"WHERE id > %s AND ({candidate}) ORDER BY id LIMIT %s",
+                        (last_id, *([BLOB_URL_PREFIX + '%'] * len(columns)), batch_size)
+                    )
+                    rows = cursor.fetchall()
+                    if not rows:
+                        break
+                    for row in rows:
+                        values = []
+                        for value in row[1:]:
+                            try:
+                                values.append(externalize(value))
+                            except InvalidBlob as e:
+                                print(f"Skipping {table} #{row[0]}: {e}")
+                                values.append(value)
+                        if tuple(values) != tuple(row[1:]):
+                            cursor.execute(
+                                f"UPDATE {table} SET {', '.join(f'{col} = %s' for col in columns)} WHERE id = %s",
+                                (*values, row[0])
+                            )
+                            rewritten += 1
+                    last_id = rows[-1][0]
+                    conn.commit()
+            return rewritten
+        except Exception as e:
+            print(f"Error externalizing images: {e}")
+            conn.rollback()
+            return False
+        finally:
+            cursor.close()
+            conn.close()
+
+
+class ComplaintStats:
+    """
+    Admin analytics from the complaint_daily_stats rollup: complaints per creation day and
+    current (category, status, resolution_type). Triggers on complaints (migrations 11, 16)
+    append each write's delta to complaint_stats_deltas in the writer's transaction, and
+    summary() reads both tables, so a fresh result counts every committed write (results are
+    then reused for ANALYTICS_CACHE_TTL seconds). fold() compacts the deltas into the rollup:
+    summary() runs it once ANALYTICS_FOLD_THRESHOLD deltas are pending, and
+    `python manage.py fold-complaint-stats` can run it from cron. rebuild() recomputes the
+    rollup from scratch after manual repairs.
+    """
+    _cache = TTLCache(maxsize=256, ttl=Config.ANALYTICS_CACHE_TTL)
+
+    # pg_try_advisory_xact_lock key: one fold at a time, the others skip ("cstf")
+    FOLD_LOCK_KEY = 0x63737466
+
+    BUCKETS = ('day', 'week', 'month')
+
+    # GROUPING(period, category_id, status, resolution_type) of each grouping set -> result key
+    _GROUPS = {7: "series", 11: "by_category", 13: "by_status", 14: "by_resolution_type", 15: "total"}
+
+    @staticmethod
+    def summary_query(date_from=None, date_to=None, category_id=None, status=None, resolution_type=None, bucket='day'):
+        # The rollup plus the deltas not folded yet (see fold())
+        conditions, params = [], [bucket]
+        if date_from:
+            conditions.append("s.day >= %s")
+            params.append(date_from)
+        if date_to:
+            conditions.append("s.day < %s")
+            params.append(date_to)
+        if category_id is not None:
+            conditions.append("s.category_id = %s")
+            params.append(category_id)
+        if status:
+            conditions.append("s.status = %s")
+            params.append(status)
+        if resolution_type:
+            conditions.append("s.resolution_type = %s")
+            params.append('' if resolution_type == 'none' else resolution_type)
+        where = ("WHERE " + " AND ".join(conditions)) if conditions else ""
+        query = f"""
+            SELECT period, category_id, category_name, status, resolution_type,
+                   GROUPING(period, category_id, status, resolution_type) AS grouping_id,
+                   SUM(complaints) AS complaints
+            FROM (
+                SELECT date_trunc(%s, s.day::timestamp)::date AS period, s.category_id, cat.name AS category_name,
+                       s.status, NULLIF(s.resolution_type, '') AS resolution_type, s.complaints
+                FROM (
+                    SELECT day, category_id, status, resolution_type, complaints FROM complaint_daily_stats
+                    UNION ALL
+                    SELECT day, category_id, status, resolution_type, delta FROM complaint_stats_deltas
+                ) s
+                LEFT JOIN categories cat ON cat.id = s.category_id
+                {where}
+            ) s
+            GROUP BY GROUPING SETS ((period), (category_id, category_name), (status), (resolution_type), ())
+            HAVING SUM(complaints) <> 0 OR GROUPING(period, category_id, status, resolution_type) = 15
+            ORDER BY grouping_id, period, complaints DESC
+        """
+        return query, params
+
+    @staticmethod
+    def summary(date_from=None, date_to=None, category_id=None, status=None, resolution_type=None, bucket='day'):
+        """
+        Totals by status, category and resolution type plus a per-`bucket` series for complaints
+        created in [date_from, date_to). resolution_type 'none' selects complaints not routed yet.
+        Returns a dict, or None on error.
+        """
+        key = (date_from, date_to, category_id, status, resolution_type, bucket)
+        cached = ComplaintStats._cache.get(key)
+        if cached is not None:
+            return cached
+        if ComplaintStats.pending_deltas() >= Config.ANALYTICS_FOLD_THRESHOLD:
+            ComplaintStats.fold()
+
+        query, params = ComplaintStats.summary_query(date_from, date_to, category_id, status, resolution_type, bucket)
+        conn = get_read_connection()
+        if not conn: return None
+        try:
+            cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
+            cursor.execute(query, params)
+            result = {"bucket": bucket, "total": 0, "by_status": [], "by_category": [],
+                      "by_resolution_type": [], "series": []}
+            for row in cursor.fetchall():
+                group = ComplaintStats._GROUPS.get(row['grouping_id'])
+                count = int(row['complaints'] or 0)
+                if group == "total":
+                    result["total"] = count
+                elif group == "series":
+                    result["series"].append({"period": row['period'].isoformat(), "complaints": count})
+                elif group == "by_category":
+                    result["by_category"].append({"category_id": row['category_id'],
+                                                  "category_name": row['category_name'], "complaints": count})
+                elif group == "by_status":
+                    result["by_status"].append({"status": row['status'], "complaints": count})
+                elif group == "by_resolution_type":
+                    result["by_resolution_type"].append({"resolution_type": row['resolution_type'], "complaints": count})
+            ComplaintStats._cache.set(key, result)
+            return result
+        except Exception as e:
+            print(f"Error fetching complaint analytics: {e}")
+            return None
+        finally:
+            cursor.close()
+            conn.close()
+
+    @staticmethod
+    def pending_deltas():
+        """Upper bound of the deltas not folded yet, from the id range (two index probes). 0 on error."""
+        conn = get_read_connection()
+        if not conn: return 0
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT COALESCE(MAX(id) - MIN(id) + 1, 0) FROM complaint_stats_deltas")
+            return cursor.fetchone()[0]
+        except Exception as e:
+            print(f"Error counting analytics deltas: {e}")
+            conn.rollback()
+            return 0
+        finally:
+            cursor.close()
+            conn.close()
+
+    @staticmethod
+    def fold():
+        """
+        Moves the committed deltas into complaint_daily_stats. Only this upserts rollup rows,
+        so writers never wait on each other for them; a fold already running elsewhere makes
+        this one a no-op. Returns deltas folded, or False on error.
+        """
+        conn = get_db_connection()
+        if not conn: return False
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT pg_try_advisory_xact_lock(%s)", (ComplaintStats.FOLD_LOCK_KEY,))
+            if not cursor.fetchone()[0]:
+                conn.commit()
+                return 0
+            cursor.execute("""
+                WITH moved AS (
+                    DELETE FROM complaint_stats_deltas RETURNING day, category_id, status, resolution_type, delta
+                ), folded AS (
+                    INSERT INTO complaint_daily_stats AS s (day, category_id, status, resolution_type, complaints)
+                    SELECT day, category_id, status, resolution_type, SUM(delta)
+                    FROM moved
+                    GROUP BY 1, 2, 3, 4 HAVING SUM(delta) <> 0 ORDER BY 1, 2, 3, 4
+                    ON CONFLICT (day, category_id, status, resolution_type)
+                    DO UPDATE SET complaints = s.complaints + EXCLUDED.complaints
+                )
+                SELECT COUNT(*) FROM moved
+            """)
+            folded = cursor.fetchone()[0]
+            conn.commit()
+            return folded
+        except Exception as e:
+            print(f"Error folding complaint analytics: {e}")
+            conn.rollback()
+            return False
+        finally:
+            cursor.close()
+            conn.close()
+
+    @staticmethod
+    def rebuild():
+        """Recomputes complaint_daily_stats from the complaints table. Returns rows written, or False."""
+        conn = get_db_connection()
+        if not conn: return False
+        try:
+            cursor = conn.cursor()
+            # Writers wait (readers do not) so no delta lands between the delete and the recount
+            cursor.execute("LOCK TABLE complaints IN SHARE MODE")
+            cursor.execute("DELETE FROM complaint_stats_deltas")
+            cursor.execute("DELETE FROM complaint_daily_stats")
+            cursor.execute("""
+                INSERT INTO complaint_daily_stats (day, category_id, status, resolution_type, complaints)
+                SELECT created_at::date, COALESCE(category_id, 0), COALESCE(status, 'Pending'), COALESCE(resolution_type, ''), COUNT(*)
+                FROM complaints
+                GROUP BY 1, 2, 3, 4
+            """)
+            written = cursor.rowcount
+            conn.commit()
+            ComplaintStats._cache.clear()
+            return written
+        except Exception as e:
+            print(f"Error rebuilding complaint analytics: {e}")
+            conn.rollback()
+            return False
+        finally:
+            cursor.close()
+            conn.close()
@@ -1,5 +1,7 @@
 import psycopg2.extras
-from database import get_db_connection
+from database import get_db_connection, get_read_connection
+from utils.prepared import execute as execute_prepared
+from utils.events import notify
 
 class JobUpdate:
     @staticmethod
@@ -11,8 +13,25 @@ class JobUpdate:
             query = """
                 INSERT INTO job_updates (complaint_id, vendor_id, message, image_url) 
                 VALUES (%s, %s, %s, %s)
+                RETURNING id, created_at
             """
             cursor.execute(query, (complaint_id, vendor_id, message, image_url))
+            update_id, created_at = cursor.fetchone()
+
+            # Push to open event streams; delivered by Postgres only if this transaction commits
+            cursor.execute("""
+                SELECT c.user_id, u.name, v.business_name
+                FROM complaints c, users u
+                LEFT JOIN vendors v ON v.user_id = u.id
+                WHERE c.id = %s AND u.id = %s
+            """, (complaint_id, vendor_id))
+            row = cursor.fetchone()
+            if row:
+                notify(cursor, "job_update", complaint_id, row[0], {
+                    "id": update_id, "complaint_id": complaint_id, "vendor_id": vendor_id,
+                    "message": message, "image_url": image_url, "created_at": created_at,
+                    "vendor_name": row[1], "business_name": row[2],
+                })
             conn.commit()
             return True
         except Exception as e:
@@ -23,21 +42,22 @@ class JobUpdate:
             cursor.close()
             conn.close()
 
+    BY_COMPLAINT_QUERY = """
+        SELECT ju.*, u.name as vendor_name, v.business_name
+        FROM job_updates ju
+        JOIN users u ON ju.vendor_id = u.id
+        JOIN vendors v ON u.id = v.user_id
+        WHERE ju.complaint_id = %s
+        ORDER BY ju.created_at ASC
+    """
+
     @staticmethod
     def get_by_complaint(complaint_id):
-        conn = get_db_connection()
+        conn = get_read_connection()
         if not conn: return []
         try:
             cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
-            query = """
-                SELECT ju.*, u.name as vendor_name, v.business_name
-                FROM job_updates ju
-                JOIN users u ON ju.vendor_id = u.id
-                JOIN vendors v ON u.id = v.user_id
-                WHERE ju.complaint_id = %s
-                ORDER BY ju.created_at ASC
-            """
-            cursor.execute(query, (complaint_id,))
+            execute_prepared(cursor, "job_updates_by_complaint", JobUpdate.BY_COMPLAINT_QUERY, (complaint_id,))
             data = cursor.fetchall()
             return data
         except Exception as e:
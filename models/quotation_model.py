@@ -1,5 +1,7 @@
 import psycopg2.extras
-from database import get_db_connection
+from database import get_db_connection, get_read_connection
+from utils.prepared import execute as execute_prepared
+from models.vendor_model import VendorStats
 
 class Quotation:
     @staticmethod
@@ -13,7 +15,17 @@ class Quotation:
                 VALUES (%s, %s, %s, %s)
             """
             cursor.execute(query, (complaint_id, vendor_id, price, estimated_time))
+            # Keep the denormalized quote summary on the complaint row in step (LEAST ignores NULL)
+            cursor.execute("""
+                UPDATE complaints SET
+                quote_count = quote_count + 1,
+                min_quote_price = LEAST(min_quote_price, %s),
+                updated_at = CURRENT_TIMESTAMP
+                WHERE id = %s
+            """, (price, complaint_id))
+            VendorStats.bump(cursor, vendor_id, active_bids=1)
             conn.commit()
+            VendorStats.invalidate(vendor_id)
             return True
         except Exception as e:
             print(f"Error creating quotation: {e}")
@@ -23,38 +35,81 @@ class Quotation:
             cursor.close()
             conn.close()
 
+    BY_COMPLAINT_QUERY = """
+        SELECT q.*, v.business_name, v.rating, u.name as vendor_user_name
+        FROM quotations q
+        JOIN vendors v ON q.vendor_id = v.user_id
+        JOIN users u ON v.user_id = u.id
+        WHERE q.complaint_id = %s
+    """
+
     @staticmethod
     def get_by_complaint(complaint_id):
-        conn = get_db_connection()
+        conn = get_read_connection()
         if not conn: return []
         cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
-        query = """
-            SELECT q.*, v.business_name, v.rating, u.name as vendor_user_name
-            FROM quotations q
-            JOIN vendors v ON q.vendor_id = v.user_id
-            JOIN users u ON v.user_id = u.id
-            WHERE q.complaint_id = %s
-        """
-        cursor.execute(query, (complaint_id,))
+        execute_prepared(cursor, "quotation_by_complaint", Quotation.BY_COMPLAINT_QUERY, (complaint_id,))
         data = cursor.fetchall()
         cursor.close()
         conn.close()
         return data
 
+    BY_VENDOR_QUERY = """
+        SELECT q.*, c.description, c.location, c.status as complaint_status, f.rating as feedback_rating
+        FROM quotations q
+        JOIN complaints c ON q.complaint_id = c.id
+        LEFT JOIN feedback f ON q.complaint_id = f.complaint_id
+        WHERE q.vendor_id = %s
+    """
+
     @staticmethod
     def get_by_vendor(vendor_id):
-        conn = get_db_connection()
+        conn = get_read_connection()
         if not conn: return []
         cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
-        query = """
-            SELECT q.*, c.description, c.location, c.status as complaint_status, f.rating as feedback_rating
-            FROM quotations q
-            JOIN complaints c ON q.complaint_id = c.id
-            LEFT JOIN feedback f ON q.complaint_id = f.complaint_id
-            WHERE q.vendor_id = %s
-        """
-        cursor.execute(query, (vendor_id,))
+        execute_prepared(cursor, "quotation_by_vendor", Quotation.BY_VENDOR_QUERY, (vendor_id,))
         data = cursor.fetchall()
         cursor.close()
         conn.close()
         return data
+
+    @staticmethod
+    def refresh_summaries(complaint_id=None):
+        """
+        Recomputes complaints.quote_count / min_quote_price / agreed_price from the quotations table.
+        agreed_price is the selected vendor's quote. Only rows that drifted are rewritten.
+        Returns the number of repaired complaints, or False on error.
+        """
+        conn = get_db_connection()
+        if not conn: return False
+        try:
+            cursor = conn.cursor()
+            scope = "WHERE c2.id = %s" if complaint_id else ""
+            query = f"""
+                UPDATE complaints c SET
+                quote_count = s.quote_count,
+                min_quote_price = s.min_quote_price,
+                agreed_price = s.agreed_price
+                FROM (
+                    SELECT c2.id, COUNT(q.id) AS quote_count, MIN(q.price) AS min_quote_price,
+                           MIN(q.price) FILTER (WHERE q.vendor_id = c2.selected_vendor_id) AS agreed_price
+                    FROM complaints c2
+                    LEFT JOIN quotations q ON q.complaint_id = c2.id
+                    {scope}
+                    GROUP BY c2.id
+                ) s
+                WHERE c.id = s.id
+                  AND (c.quote_count, c.min_quote_price, c.agreed_price)
+                      IS DISTINCT FROM (s.quote_count, s.min_quote_price, s.agreed_price)
+            """
+            cursor.execute(query, (complaint_id,) if complaint_id else None)
+            repaired = cursor.rowcount
+            conn.commit()
+            return repaired
+        except Exception as e:
+            print(f"Error refreshing quote summaries: {e}")
+            conn.rollback()
+            return False
+        finally:
+            cursor.close()
+            conn.close()
@@ -1,5 +1,6 @@
 import psycopg2.extras
-from database import get_db_connection
+from database import get_db_connection, get_read_connection
+from utils.prepared import execute as execute_prepared
 
 class User:
     last_error = None
@@ -10,13 +11,14 @@ class User:
         self.role = role
         self.name = name
 
+    BY_EMAIL_QUERY = "SELECT * FROM users WHERE email = %s"
+
     @staticmethod
     def get_by_email(email):
         conn = get_db_connection()
         if not conn: return None
         cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
-        query = "SELECT * FROM users WHERE email = %s"
-        cursor.execute(query, (email,))
+        execute_prepared(cursor, "user_by_email", User.BY_EMAIL_QUERY, (email,))
         user = cursor.fetchone()
         cursor.close()
         conn.close()
@@ -28,7 +30,7 @@ class User:
         if not conn: return None
         cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
         query = "SELECT * FROM users WHERE id = %s"
-        cursor.execute(query, (user_id,))
+        execute_prepared(cursor, "user_by_id", query, (user_id,))
         user = cursor.fetchone()
         cursor.close()
         conn.close()
@@ -72,8 +74,25 @@ class User:
             conn.close()
 
     @staticmethod
-    def get_all_by_role(role=None, category=None):
+    def update_password(user_id, password_hash):
         conn = get_db_connection()
+        if not conn: return False
+        try:
+            cursor = conn.cursor()
+            cursor.execute("UPDATE users SET password = %s WHERE id = %s", (password_hash, user_id))
+            conn.commit()
+            return True
+        except Exception as e:
+            print(f"Error updating password: {e}")
+            conn.rollback()
+            return False
+        finally:
+            cursor.close()
+            conn.close()
+
+    @staticmethod
+    def get_all_by_role(role=None, category=None):
+        conn = get_read_connection()
         if not conn: 
             User.last_error = "Database connection failed"
             return []
@@ -92,20 +111,20 @@ class User:
                     query += " AND (v.service_type = %s OR v.service_type = 'General' OR v.service_type IS NULL OR v.service_type = 'Waste Management' AND %s = 'Garbage')"
                     params.append(category)
                     params.append(category)
-                cursor.execute(query, params)
+                execute_prepared(cursor, "user_list_by_role", query, params)
             elif role == 'officer':
                 query = "SELECT id, name, email, phone, role, department, created_at FROM users WHERE role = 'officer'"
                 params = []
                 if category:
                     query += " AND (department = %s OR department = 'General' OR department IS NULL)"
                     params.append(category)
-                cursor.execute(query, params)
+                execute_prepared(cursor, "user_list_by_role", query, params)
             elif role:
                 query = "SELECT id, name, email, phone, role, created_at FROM users WHERE role = %s"
-                cursor.execute(query, (role,))
+                execute_prepared(cursor, "user_list_by_role", query, (role,))
             else:
                 query = "SELECT id, name, email, phone, role, created_at FROM users"
-                cursor.execute(query)
+                execute_prepared(cursor, "user_list_by_role", query)
                 
             users = cursor.fetchall()
             return users
@@ -116,3 +135,70 @@ class User:
         finally:
             if 'cursor' in locals(): cursor.close()
             if 'conn' in locals(): conn.close()
+
+    @staticmethod
+    def revoke_token(digest, expires_at):
+        """Records a logged-out token (SHA-256 digest) until `expires_at` (unix seconds)."""
+        conn = get_db_connection()
+        if not conn: return False
+        try:
+            cursor = conn.cursor()
+            # Rows of tokens that have expired by now can no longer match anything
+            cursor.execute("DELETE FROM revoked_tokens WHERE expires_at < now() AT TIME ZONE 'UTC'")
+            cursor.execute("""
+                INSERT INTO revoked_tokens (digest, expires_at)
+                VALUES (%s, to_timestamp(%s) AT TIME ZONE 'UTC')
+                ON CONFLICT (digest) DO NOTHING
+            """, (digest, expires_at))
+            conn.commit()
+            return True
+        except Exception as e:
+            print(f"Error revoking token: {e}")
+            conn.rollback()
+            return False
+        finally:
+            cursor.close()
+            conn.close()
+
+    @staticmethod
+    def revoke_all_tokens(user_id, issued_until):
+        """Invalidates every token of user_id issued at or before `issued_until` (whole unix seconds)."""
+        conn = get_db_connection()
+        if not conn: return False
+        try:
+            cursor = conn.cursor()
+            cursor.execute(
+                "UPDATE users SET tokens_valid_after = GREATEST(COALESCE(tokens_valid_after, 0), %s) WHERE id = %s",
+                (issued_until, user_id)
+            )
+            conn.commit()
+            return True
+        except Exception as e:
+            print(f"Error revoking user tokens: {e}")
+            conn.rollback()
+            return False
+        finally:
+            cursor.close()
+            conn.close()
+
+    TOKEN_REVOKED_QUERY = """
+        SELECT EXISTS (SELECT 1 FROM revoked_tokens WHERE digest = %s)
+            OR EXISTS (SELECT 1 FROM users WHERE id = %s AND tokens_valid_after >= %s)
+    """
+
+    @staticmethod
+    def is_token_revoked(digest, user_id, issued_at):
+        """True / False, or None when the check itself failed."""
+        conn = get_db_connection()
+        if not conn: return None
+        try:
+            cursor = conn.cursor()
+            execute_prepared(cursor, "token_revoked", User.TOKEN_REVOKED_QUERY, (digest, user_id, issued_at))
+            return cursor.fetchone()[0]
+        except Exception as e:
+            print(f"Error checking token revocation: {e}")
+            conn.rollback()
+            return None
+        finally:
+            cursor.close()
+            conn.close()
@@ -1,5 +1,9 @@
+import datetime
 import psycopg2.extras
-from database import get_db_connection
+from config import Config
+from database import get_db_connection, get_read_connection, after_commit
+from utils.prepared import execute as execute_prepared
+from utils.cache import TTLCache
 
 class Vendor:
     @staticmethod
@@ -20,13 +24,14 @@ class Vendor:
             cursor.close()
             conn.close()
 
+    BY_USER_QUERY = "SELECT * FROM vendors WHERE user_id = %s"
+
     @staticmethod
     def get_by_user_id(user_id):
         conn = get_db_connection()
         if not conn: return None
         cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
-        query = "SELECT * FROM vendors WHERE user_id = %s"
-        cursor.execute(query, (user_id,))
+        execute_prepared(cursor, "vendor_by_user", Vendor.BY_USER_QUERY, (user_id,))
         vendor = cursor.fetchone()
         cursor.close()
         conn.close()
@@ -65,3 +70,135 @@ class Vendor:
         finally:
             cursor.close()
             conn.close()
+
+    @staticmethod
+    def rebuild_ratings():
+        """
+        Recomputes rating_sum / rating_count / rating for every vendor from the feedback table.
+        Returns the number of vendors updated, or False on error.
+        """
+        conn = get_db_connection()
+        if not conn: return False
+        try:
+            cursor = conn.cursor()
+            cursor.execute("""
+                UPDATE vendors v SET
+                rating_sum = COALESCE(s.rating_sum, 0),
+                rating_count = COALESCE(s.rating_count, 0),
+                rating = COALESCE(ROUND(s.rating_sum::numeric / NULLIF(s.rating_count, 0), 2), 0)
+                FROM vendors v2
+                LEFT JOIN (
+                    SELECT c.selected_vendor_id, SUM(f.rating) AS rating_sum, COUNT(f.rating) AS rating_count
+                    FROM feedback f
+                    JOIN complaints c ON f.complaint_id = c.id
+                    WHERE c.selected_vendor_id IS NOT NULL
+                    GROUP BY c.selected_vendor_id
+                ) s ON s.selected_vendor_id = v2.user_id
+                WHERE v.id = v2.id
+            """)
+            updated = cursor.rowcount
+            conn.commit()
+            return updated
+        except Exception as e:
+            print(f"Error rebuilding vendor ratings: {e}")
+            conn.rollback()
+            return False
+        finally:
+            cursor.close()
+            conn.close()
+
+
+class VendorStats:
+    """
+    Per-vendor dashboard counters kept in the vendor_stats table. Write paths call bump() with their
+    own cursor so the counters change in the same transaction as the quote/approval/resolution itself.
+    """
+    _cache = TTLCache(maxsize=4096, ttl=Config.VENDOR_STATS_CACHE_TTL)
+
+    @staticmethod
+    def bump(cursor, vendor_id, active_bids=0, completed_jobs=0, earnings=0):
+        cursor.execute("""
+            INSERT INTO vendor_stats (vendor_id, active_bids, completed_jobs, total_earnings)
+            VALUES (%s, %s, %s, %s)
+            ON CONFLICT (vendor_id) DO UPDATE SET
+            active_bids = vendor_stats.active_bids + EXCLUDED.active_bids,
+            completed_jobs = vendor_stats.completed_jobs + EXCLUDED.completed_jobs,
+            total_earnings = vendor_stats.total_earnings + EXCLUDED.total_earnings,
+            updated_at = CURRENT_TIMESTAMP
+        """, (vendor_id, active_bids, completed_jobs, earnings))
+
+    @staticmethod
+    def invalidate(*vendor_ids):
+        # After the commit: a read between now and then would cache the old counters again
+        def drop():
+            for vendor_id in vendor_ids:
+                VendorStats._cache.pop(vendor_id)
+        after_commit(drop)
+
+    COUNTERS_QUERY = "SELECT active_bids, completed_jobs, total_earnings FROM vendor_stats WHERE vendor_id = %s"
+
+    @staticmethod
+    def get(vendor_user_id):
+        cached = VendorStats._cache.get(vendor_user_id)
+        if cached is not None:
+            return cached
+
+        empty = {"active_bids": 0, "completed_jobs": 0, "total_earnings": 0}
+        conn = get_read_connection()
+        if not conn: return empty
+        try:
+            cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
+            execute_prepared(cursor, "vendor_stats_by_vendor", VendorStats.COUNTERS_QUERY, (vendor_user_id,))
+            row = cursor.fetchone()
+            stats = {
+                "active_bids": row['active_bids'] if row else 0,
+                "completed_jobs": row['completed_jobs'] if row else 0,
+                "total_earnings": float(row['total_earnings']) if row else 0,
+                "computed_at": datetime.datetime.utcnow().isoformat() + "Z"
+            }
+            VendorStats._cache.set(vendor_user_id, stats)
+            return stats
+        except Exception as e:
+            print(f"Error fetching vendor stats: {e}")
+            return empty
+        finally:
+            cursor.close()
+            conn.close()
+
+    @staticmethod
+    def rebuild():
+        """Recomputes every vendor's counters from quotations and complaints. Returns rows written, or False."""
+        conn = get_db_connection()
+        if not conn: return False
+        try:
+            cursor = conn.cursor()
+            cursor.execute("""
+                INSERT INTO vendor_stats (vendor_id, active_bids, completed_jobs, total_earnings)
+                SELECT u.id,
+                       (SELECT COUNT(*) FROM quotations q WHERE q.vendor_id = u.id AND q.status = 'Pending'),
+                       (SELECT COUNT(*) FROM complaints c WHERE c.selected_vendor_id = u.id AND c.status = 'Resolved'),
+                       COALESCE((
+                           SELECT SUM(q.price)
+                           FROM complaints c
+                           JOIN quotations q ON c.id = q.complaint_id AND c.selected_vendor_id = q.vendor_id
+                           WHERE c.selected_vendor_id = u.id AND c.status = 'Resolved'
+                       ), 0)
+                FROM users u
+                WHERE u.role = 'vendor'
+                ON CONFLICT (vendor_id) DO UPDATE SET
+                active_bids = EXCLUDED.active_bids,
+                completed_jobs = EXCLUDED.completed_jobs,
+                total_earnings = EXCLUDED.total_earnings,
+                updated_at = CURRENT_TIMESTAMP
+            """)
+            written = cursor.rowcount
+            conn.commit()
+            VendorStats._cache.clear()
+            return written
+        except Exception as e:
+            print(f"Error rebuilding vendor stats: {e}")
+            conn.rollback()
+            return False
+        finally:
+            cursor.close()
+            conn.close()
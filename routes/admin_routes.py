@@ -1,17 +1,174 @@
-from flask import Blueprint, request
+import csv
+import io
+from flask import Blueprint, request, Response
 from utils.response import success_response, error_response
 from utils.auth_middleware import token_required, role_required
 from models.complaint_model import Complaint
 from models.user_model import User
+from config import Config
+from utils.pagination import parse_limit, parse_fields, encode_cursor, decode_cursor, parse_date, parse_id
+from utils.json_provider import dumps_bytes
+from utils.conditional import list_etag, etag_matches, not_modified_response
 
 admin_bp = Blueprint('admin', __name__)
 
+def complaint_filters(args):
+    """Reads the admin listing filters from the query string. Raises ValueError on malformed values."""
+    filters = {
+        'status': args.get('status'),
+        'category': args.get('category'),
+        'category_id': parse_id(args.get('category_id'), 'category_id'),
+        'resolution_type': args.get('resolution_type'),
+        'officer_id': parse_id(args.get('officer_id'), 'officer_id'),
+        'vendor_id': parse_id(args.get('vendor_id'), 'vendor_id'),
+        'date_from': parse_date(args.get('from')),
+        'date_to': parse_date(args.get('to'), end_of_range=True),
+    }
+    return {k: v for k, v in filters.items() if v is not None}
+
 @admin_bp.route('/complaints', methods=['GET'])
 @token_required
 @role_required('admin')
 def get_all_complaints():
-    complaints = Complaint.get_all()
-    return success_response(data=complaints)
+    try:
+        filters = complaint_filters(request.args)
+        cursor = request.args.get('cursor')
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        return error_response(str(e), 400)
+    limit = parse_limit(request.args.get('limit'))
+
+    etag = list_etag(Complaint.list_version('admin', filters=filters))
+    if etag_matches(etag):
+        return not_modified_response(etag)
+
+    try:
+        complaints, has_more = Complaint.get_page(filters, after, limit, parse_fields(request.args.get('fields')))
+    except ValueError as e:
+        return error_response(str(e), 400)
+    if not complaints and Complaint.last_error:
+        return error_response(f"Retrieval Error: {Complaint.last_error}", 500)
+
+    next_cursor = None
+    if has_more:
+        last = complaints[-1]
+        next_cursor = encode_cursor(last['created_at'], last['id'])
+    return success_response(data=complaints, meta={"next_cursor": next_cursor, "limit": limit}, etag=etag)
+
+@admin_bp.route('/analytics', methods=['GET'])
+@token_required
+@role_required('admin')
+def get_analytics():
+    """
+    Summary tiles for the admin dashboard from the daily rollup: totals by status, category
+    and resolution type, plus a series per ?bucket=day|week|month. Optional filters: from, to,
+    category_id, status, resolution_type (government | private | none).
+    """
+    from models.complaint_model import ComplaintStats
+    bucket = request.args.get('bucket', 'day')
+    if bucket not in ComplaintStats.BUCKETS:
+        return error_response(f"bucket must be one of: {', '.join(ComplaintStats.BUCKETS)}", 400)
+    try:
+        date_from = parse_date(request.args.get('from'))
+        date_to = parse_date(request.args.get('to'), end_of_range=True)
+        category_id = parse_id(request.args.get('category_id'), 'category_id')
+    except ValueError as e:
+        return error_response(str(e), 400)
+
+    summary = ComplaintStats.summary(
+        date_from.date() if date_from else None,
+        date_to.date() if date_to else None,
+        category_id,
+        request.args.get('status'),
+        request.args.get('resolution_type'),
+        bucket,
+    )
+    if summary is None:
+        return error_response("Retrieval Error: could not read analytics", 500)
+    return success_response(data=summary)
+
+EXPORT_BATCH_ROWS = 500
+
+def ndjson_stream(rows):
+    batch = []
+    for row in rows:
+        batch.append(dumps_bytes(row))
+        if len(batch) >= EXPORT_BATCH_ROWS:
+            yield b"\n".join(batch) + b"\n"
+            batch = []
+    if batch:
+        yield b"\n".join(batch) + b"\n"
+
+def csv_stream(rows, columns):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for i, row in enumerate(rows, 1):
+        writer.writerow([row[name] for name in columns])
+        if i % EXPORT_BATCH_ROWS == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+@admin_bp.route('/complaints/export', methods=['GET'])
+@token_required
+@role_required('admin')
+def export_complaints():
+    export_format = request.args.get('format', 'ndjson')
+    if export_format not in ('ndjson', 'csv'):
+        return error_response("format must be 'ndjson' or 'csv'", 400)
+    try:
+        filters = complaint_filters(request.args)
+    except ValueError as e:
+        return error_response(str(e), 400)
+
+    rows = Complaint.export_rows(filters)
+    if rows is None:
+        return error_response(f"Export Error: {Complaint.last_error}", 500)
+
+    if export_format == 'csv':
+        columns = [name for name, _ in Complaint.EXPORT_COLUMNS]
+        body, mimetype = csv_stream(rows, columns), 'text/csv'
+    else:
+        body, mimetype = ndjson_stream(rows), 'application/x-ndjson'
+    return Response(body, mimetype=mimetype, headers={
+        "Content-Disposition": f"attachment; filename=complaints.{export_format}"
+    })
+
+@admin_bp.route('/complaints/import', methods=['POST'])
+@token_required
+@role_required('admin')
+def import_complaints():
+    """
+    Bulk ingest for partner channels. Body: NDJSON (default) or CSV (?format=csv or a text/csv
+    body), raw or as a multipart "file" field. Fields per record: description, location,
+    category or category_id, and optionally user_id (defaults to the caller), image_path,
+    resolution_type, created_at.
+    """
+    from utils.ingest import INGEST_FORMATS, build_batch
+    # Streamed into the staging table, so it may be far larger than the app-wide MAX_CONTENT_LENGTH
+    request.max_content_length = Config.IMPORT_MAX_SIZE
+    upload = request.files.get('file')
+    mimetype = upload.mimetype if upload else request.mimetype
+    import_format = request.args.get('format') or ('csv' if mimetype == 'text/csv' else 'ndjson')
+    if import_format not in INGEST_FORMATS:
+        return error_response("format must be 'ndjson' or 'csv'", 400)
+
+    batch = build_batch(upload.stream if upload else request.stream, import_format, request.user['id'])
+    try:
+        inserted = 0
+        if batch.accepted:
+            inserted = Complaint.bulk_ingest(batch)
+            if inserted is False:
+                return error_response(f"Import failed: {Complaint.last_error}", 500)
+    finally:
+        batch.close()
+
+    return success_response(
+        data={"inserted": inserted, "rejected_count": batch.rejected_count, "rejected": batch.rejected},
+        message=f"Imported {inserted} complaint(s), rejected {batch.rejected_count}"
+    )
 
 @admin_bp.route('/users', methods=['GET'])
 @token_required
@@ -24,6 +181,36 @@ def get_users():
         return error_response(f"Backend error: {User.last_error}", 500)
     return success_response(data=users)
 
+@admin_bp.route('/users/<int:user_id>/revoke-tokens', methods=['POST'])
+@token_required
+@role_required('admin')
+def revoke_user_tokens(user_id):
+    from utils.auth_middleware import revoke_user
+    if not revoke_user(user_id):
+        return error_response("Failed to revoke sessions", 500)
+    return success_response(message="All existing sessions for this user have been revoked")
+
+@admin_bp.route('/token-cache', methods=['GET'])
+@token_required
+@role_required('admin')
+def get_token_cache_stats():
+    from utils.auth_middleware import token_cache_stats
+    return success_response(data=token_cache_stats())
+
+@admin_bp.route('/compression-cache', methods=['GET'])
+@token_required
+@role_required('admin')
+def get_compression_cache_stats():
+    from utils.compression import compression_cache_stats
+    return success_response(data=compression_cache_stats())
+
+@admin_bp.route('/query-stats', methods=['GET'])
+@token_required
+@role_required('admin')
+def get_query_stats():
+    from utils.prepared import stats
+    return success_response(data=stats())
+
 @admin_bp.route('/assign', methods=['POST'])
 @token_required
 @role_required('admin')
@@ -90,6 +277,79 @@ def route_vendor():
     else:
         return error_response(message, 500)
 
+BULK_ROUTE_MAX_ITEMS = 500
+BULK_ROUTE_ACTIONS = ('government', 'private', 'vendor')
+
+def _positive_int(value):
+    if isinstance(value, bool):
+        return None
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        return None
+    return value if value > 0 else None
+
+@admin_bp.route('/route/bulk', methods=['POST'])
+@token_required
+@role_required('admin')
+def route_bulk():
+    """
+    Body: {"items": [{"complaint_id": 1, "action": "government", "officer_id": 7},
+                     {"complaint_id": 2, "action": "private"},
+                     {"complaint_id": 3, "action": "vendor", "vendor_id": 9}, ...]}
+    Valid items are applied together in one transaction; the response reports every item.
+    """
+    data = request.get_json(silent=True) or {}
+    items = data.get('items')
+    if not isinstance(items, list) or not items:
+        return error_response("items must be a non-empty list", 400)
+    if len(items) > BULK_ROUTE_MAX_ITEMS:
+        return error_response(f"At most {BULK_ROUTE_MAX_ITEMS} items per request", 400)
+
+    results = []
+    valid = []
+    seen = set()
+    for raw in items:
+        raw = raw if isinstance(raw, dict) else {}
+        complaint_id = _positive_int(raw.get('complaint_id'))
+        action = raw.get('action')
+        result = {"complaint_id": complaint_id if complaint_id else raw.get('complaint_id'), "action": action,
+                  "success": False, "error": None}
+        results.append(result)
+
+        item = {"complaint_id": complaint_id, "action": action}
+        if not complaint_id:
+            result["error"] = "Complaint ID required"
+        elif action not in BULK_ROUTE_ACTIONS:
+            result["error"] = f"action must be one of: {', '.join(BULK_ROUTE_ACTIONS)}"
+        elif complaint_id in seen:
+            result["error"] = "Complaint appears more than once in this batch"
+        elif action == 'vendor' and not _positive_int(raw.get('vendor_id')):
+            result["error"] = "Vendor ID required"
+        elif action == 'government' and raw.get('officer_id') is not None and not _positive_int(raw.get('officer_id')):
+            result["error"] = "Invalid Officer ID"
+        else:
+            item['officer_id'] = _positive_int(raw.get('officer_id')) if action == 'government' else None
+            item['vendor_id'] = _positive_int(raw.get('vendor_id')) if action == 'vendor' else None
+            valid.append(item)
+        if complaint_id:
+            seen.add(complaint_id)
+
+    if valid:
+        outcome, message = Complaint.bulk_route(valid)
+        if outcome is None:
+            return error_response(message, 500)
+        for result in results:
+            if result["error"] is None:
+                result["error"] = outcome.get(result["complaint_id"], "Not updated")
+                result["success"] = result["error"] is None
+
+    applied = sum(1 for result in results if result["success"])
+    return success_response(
+        data={"results": results, "applied": applied, "failed": len(results) - applied},
+        message=f"Applied {applied} of {len(results)} routing decisions"
+    )
+
 @admin_bp.route('/vendors/verify', methods=['POST'])
 @token_required
 @role_required('admin')
@@ -105,6 +365,9 @@ def verify_vendor():
 @token_required
 @role_required('admin')
 def force_migrate():
-    from database import run_db_migrations
-    run_db_migrations()
-    return success_response(message="Migration triggered successfully.")
+    from migrations import run_db_migrations, seed_test_users, migration_status
+    if not run_db_migrations():
+        return error_response("Migration failed. Check server logs.", 500)
+    if request.args.get('seed') == '1':
+        seed_test_users()
+    return success_response(data=migration_status(), message="Migration triggered successfully.")
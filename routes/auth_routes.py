@@ -1,18 +1,25 @@
 from flask import Blueprint, request
-from werkzeug.security import generate_password_hash, check_password_hash
 import jwt
 import datetime
 from config import Config
 from utils.response import success_response, error_response
-from utils.auth_middleware import token_required
+from utils.auth_middleware import token_required, get_bearer_token, revoke_token
+from utils.passwords import hash_password, verify_password, needs_rehash, HashingBusy
 from models.user_model import User
 from models.vendor_model import Vendor
 
 auth_bp = Blueprint('auth', __name__)
 
+def json_body():
+    """The request's JSON object, or None when the body is missing, malformed or not an object."""
+    data = request.get_json(silent=True)
+    return data if isinstance(data, dict) else None
+
 @auth_bp.route('/register', methods=['POST'])
 def register():
-    data = request.json
+    data = json_body()
+    if data is None:
+        return error_response("Expected a JSON object", 400)
     name = data.get('name')
     email = data.get('email')
     password = data.get('password')
@@ -21,19 +28,26 @@ def register():
 
     if not name or not email or not password:
         return error_response("Missing required fields", 400)
+    if not all(isinstance(value, str) for value in (name, email, password)):
+        return error_response("name, email and password must be strings", 400)
 
     # Check if user exists
     if User.get_by_email(email):
         return error_response("Email already registered", 409)
 
-    hashed_password = generate_password_hash(password)
+    try:
+        hashed_password = hash_password(password)
+    except HashingBusy:
+        return error_response("Server is busy, please try again shortly", 503)
     
     user_id = User.create(name, email, hashed_password, role, phone)
     if user_id:
         if role == 'vendor':
             business_name = data.get('business_name', name)
             service_type = data.get('service_type')
-            Vendor.create(user_id, business_name, service_type)
+            if not Vendor.create(user_id, business_name, service_type):
+                # The error response rolls back the user row created above as well
+                return error_response("Registration failed", 500)
             
         return success_response(message="User registered successfully")
     else:
@@ -41,10 +55,14 @@ def register():
 
 @auth_bp.route('/login', methods=['POST'])
 def login():
-    data = request.json
+    data = json_body()
+    if data is None:
+        return error_response("Expected a JSON object", 400)
     email = data.get('email')
     password = data.get('password')
-    
+    if not isinstance(email, str) or not isinstance(password, str) or not email or not password:
+        return error_response("Email and password are required", 400)
+
     print(f"DEBUG: Login attempt for email: {email}")
     user = User.get_by_email(email)
     
@@ -52,16 +70,22 @@ def login():
     is_valid = False
     if user:
         print(f"DEBUG: User object retrieved for {email}")
-        if check_password_hash(user['password'], password):
-            is_valid = True
-            print("DEBUG: Password match via hash")
-        elif user['password'] == password: # Fallback for plain text default users
-            is_valid = True
-            print("DEBUG: Password match via plain text")
+        try:
+            is_valid = verify_password(user['password'], password)
+        except HashingBusy:
+            return error_response("Server is busy, please try again shortly", 503)
+        if is_valid:
+            print("DEBUG: Password match")
+            # Upgrade plain text seed passwords and hashes made with an older method/cost
+            if needs_rehash(user['password']):
+                try:
+                    User.update_password(user['id'], hash_password(password))
+                except HashingBusy:
+                    pass  # try again on the next login
         else:
             print("DEBUG: Password DOES NOT match")
     else:
-        # Check if it was a connection error or just no user
+        # Check if it was a connection error or just no user (reuses the request's connection)
         from database import get_db_connection
         test_conn = get_db_connection()
         if not test_conn:
@@ -75,12 +99,14 @@ def login():
         return error_response("Invalid credentials", 401)
 
     # Generate Token
+    now = datetime.datetime.utcnow()
     token_payload = {
         'id': user['id'],
         'email': user['email'],
         'role': user['role'],
         'name': user['name'],
-        'exp': datetime.datetime.utcnow() + datetime.timedelta(hours=24)
+        'iat': now,  # lets revoke_user() invalidate tokens issued before a given moment
+        'exp': now + datetime.timedelta(hours=Config.TOKEN_LIFETIME_HOURS)
     }
     
     token = jwt.encode(token_payload, Config.SECRET_KEY, algorithm="HS256")
@@ -95,6 +121,13 @@ def login():
         }
     })
 
+@auth_bp.route('/logout', methods=['POST'])
+@token_required
+def logout():
+    if not revoke_token(get_bearer_token()):
+        return error_response("Failed to log out", 500)
+    return success_response(message="Logged out successfully")
+
 @auth_bp.route('/profile', methods=['GET'])
 @token_required
 def get_profile():
@@ -125,10 +158,10 @@ def update_profile():
 
 @auth_bp.route('/forgot-password', methods=['POST'])
 def forgot_password():
-    data = request.json
-    email = data.get('email')
+    data = json_body()
+    email = data.get('email') if data else None
     
-    if not email:
+    if not email or not isinstance(email, str):
         return error_response("Email is required", 400)
     
     user = User.get_by_email(email)
@@ -0,0 +1,65 @@
+from flask import Blueprint, request, send_file, abort
+from utils.response import success_response, error_response
+from utils.auth_middleware import token_required
+from utils.blob_store import (get_blob_store, make_ref, is_valid_digest, sniff_content_type,
+                              BlobTooLarge, InvalidBlob, UPLOAD_CONTENT_TYPES, SNIFF_SIZE)
+from models.blob_model import Blob
+
+blob_bp = Blueprint('blob', __name__)
+
+# Blobs are immutable (the URL is the content hash), so browsers and proxies may keep them forever
+BLOB_MAX_AGE = 365 * 24 * 3600
+
+@blob_bp.route('', methods=['POST'])
+@token_required
+def upload_blob():
+    # multipart/form-data with a "file" field, or the raw image as the request body
+    upload = request.files.get('file')
+    declared = upload.mimetype if upload else request.mimetype
+    # A generic or missing type is fine; a specific one must be an image type we accept
+    if declared and declared != 'application/octet-stream' and declared not in UPLOAD_CONTENT_TYPES:
+        return error_response(f"Unsupported content type {declared}", 415)
+    # A declared image type must also match the magic bytes
+    allowed = (declared,) if declared in UPLOAD_CONTENT_TYPES else UPLOAD_CONTENT_TYPES
+    stream = upload.stream if upload else request.stream
+    store = get_blob_store()
+    try:
+        digest, size = store.put_stream(stream, allowed)
+    except BlobTooLarge as e:
+        return error_response(str(e), 413)
+    except InvalidBlob as e:
+        return error_response(str(e), 400)
+    except OSError as e:
+        print(f"Error storing blob: {e}")
+        return error_response("Failed to store upload", 500)
+
+    with store.open(digest) as f:
+        content_type = sniff_content_type(f.read(SNIFF_SIZE))
+    if not Blob.record_upload(digest, request.user['id'], content_type, size):
+        return error_response("Failed to store upload", 500)
+    return success_response(data={"ref": make_ref(digest), "digest": digest, "size": size,
+                                  "content_type": content_type}, status_code=201)
+
+# Not behind token_required: the URLs end up in <img src>, which cannot send an Authorization
+# header, and a SHA-256 digest is not guessable.
+@blob_bp.route('/<digest>', methods=['GET'])
+def download_blob(digest):
+    if not is_valid_digest(digest):
+        abort(404)
+    store = get_blob_store()
+    if not store.exists(digest):
+        abort(404)
+
+    path = store.path(digest)
+    size = request.args.get('thumb', type=int)
+    if size:
+        size = max(16, min(size, 1024))
+        thumb_path = store.thumbnail(digest, size)
+        if thumb_path:
+            return send_file(thumb_path, mimetype="image/jpeg", conditional=True,
+                             etag=f"{digest}-{size}", max_age=BLOB_MAX_AGE)
+
+    with store.open(digest) as f:
+        content_type = sniff_content_type(f.read(16))
+    # conditional=True answers If-None-Match and Range requests (206) from the file itself
+    return send_file(path, mimetype=content_type, conditional=True, etag=digest, max_age=BLOB_MAX_AGE)
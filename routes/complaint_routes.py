@@ -1,7 +1,13 @@
 from flask import Blueprint, request
 from utils.response import success_response, error_response
-from utils.auth_middleware import token_required
+from utils.auth_middleware import token_required, query_token_allowed
 from models.complaint_model import Complaint
+from utils.conditional import list_etag, etag_matches, not_modified_response
+from utils.blob_store import externalize, InvalidBlob
+from utils.pagination import parse_fields
+from utils.sync import read_since, sync_list
+from utils.events import get_hub, stream_response, format_event, EventsUnavailable
+from database import read_from_primary
 
 complaint_bp = Blueprint('complaint', __name__)
 
@@ -29,6 +35,11 @@ def create_complaint():
     if not description or not location:
         return error_response("Description and Location are required", 400)
 
+    try:
+        image_path = externalize(image_path)
+    except InvalidBlob as e:
+        return error_response(str(e), 400)
+
     result = Complaint.create(user['id'], category_id, description, location, image_path, resolution_type)
     
     if isinstance(result, int) or result:
@@ -41,10 +52,91 @@ def create_complaint():
 @token_required
 def get_my_complaints():
     user = request.user
+    try:
+        since = read_since()
+    except ValueError as e:
+        return error_response(str(e), 400)
+    etag = list_etag(Complaint.list_version('user', user['id']), user['id'])
+    if etag_matches(etag):
+        return not_modified_response(etag)
+    fields = parse_fields(request.args.get('fields'))
+    Complaint.last_error = None
+    try:
+        complaints, meta = sync_list('user', user['id'], since,
+                                     lambda since: Complaint.get_by_user(user['id'], fields, since))
+    except ValueError as e:
+        return error_response(str(e), 400)
+    if complaints is None:
+        return error_response(f"Retrieval Error: {Complaint.last_error}", 500)
+    return success_response(data=complaints, meta=meta, etag=etag)
+
+@complaint_bp.route('/complaints/<int:complaint_id>', methods=['GET'])
+@token_required
+def get_complaint(complaint_id):
+    # Full row (description, notes, image references): the list endpoints only send a summary
+    user = request.user
+    complaint = Complaint.get_by_id(complaint_id)
+    if not complaint:
+        if Complaint.last_error:
+            return error_response(f"Retrieval Error: {Complaint.last_error}", 500)
+        return error_response("Complaint not found", 404)
+
+    if not can_view(user, complaint):
+        return error_response("Complaint not found", 404)
+    return success_response(data=complaint)
+
+def can_view(user, complaint):
+    role = user.get('role')
+    return (
+        role == 'admin'
+        or complaint['user_id'] == user['id']
+        or (role == 'officer' and complaint['assigned_officer_id'] == user['id'])
+        or (role == 'vendor' and (complaint['selected_vendor_id'] == user['id']
+                                  or (complaint['resolution_type'] == 'private'
+                                      and complaint['status'] == 'Awaiting Quotes')))
+    )
+
+@complaint_bp.route('/complaints/events', methods=['GET'])
+@token_required
+@query_token_allowed
+def stream_my_complaint_events():
+    # All of the caller's complaints: a snapshot of their summaries, then live status / job update events
+    user = request.user
+    # Subscribe before taking the snapshot so nothing committed in between is missed. Events
+    # come from the primary, so the snapshot must too: a lagging replica could predate them.
+    try:
+        subscription = get_hub().subscribe(user_id=user['id'])
+    except EventsUnavailable as e:
+        return error_response(str(e), 503)
+    read_from_primary()
     complaints = Complaint.get_by_user(user['id'])
     if not complaints and Complaint.last_error:
+        subscription.close()
         return error_response(f"Retrieval Error: {Complaint.last_error}", 500)
-    return success_response(data=complaints)
+    return stream_response(subscription, [format_event("snapshot", complaints)])
+
+@complaint_bp.route('/complaints/<int:complaint_id>/events', methods=['GET'])
+@token_required
+@query_token_allowed
+def stream_complaint_events(complaint_id):
+    # Replaces polling /updates: the job update history once, then new updates and status changes
+    from models.job_update_model import JobUpdate
+    # Subscribe before reading the status and history so nothing committed in between is
+    # missed, and read them on the primary the events come from
+    try:
+        subscription = get_hub().subscribe(complaint_id=complaint_id)
+    except EventsUnavailable as e:
+        return error_response(str(e), 503)
+    read_from_primary()
+    complaint = Complaint.get_by_id(complaint_id)
+    if not complaint or not can_view(request.user, complaint):
+        subscription.close()
+        return error_response("Complaint not found", 404)
+    updates = JobUpdate.get_by_complaint(complaint_id)
+    backlog = [format_event("status", {"id": complaint_id, "status": complaint['status'],
+                                       "updated_at": complaint['updated_at']})]
+    backlog += [format_event("job_update", update) for update in updates]
+    return stream_response(subscription, backlog)
 
 @complaint_bp.route('/complaints/<int:complaint_id>/quotes', methods=['GET'])
 @token_required
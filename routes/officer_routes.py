@@ -2,6 +2,10 @@ from flask import Blueprint, request
 from utils.response import success_response, error_response
 from utils.auth_middleware import token_required, role_required
 from models.complaint_model import Complaint
+from utils.conditional import list_etag, etag_matches, not_modified_response
+from utils.blob_store import externalize, InvalidBlob
+from utils.pagination import parse_fields
+from utils.sync import read_since, sync_list
 
 officer_bp = Blueprint('officer', __name__)
 
@@ -10,8 +14,23 @@ officer_bp = Blueprint('officer', __name__)
 @role_required('officer')
 def get_assigned_complaints():
     user = request.user
-    complaints = Complaint.get_assigned_to_officer(user['id'])
-    return success_response(data=complaints)
+    try:
+        since = read_since()
+    except ValueError as e:
+        return error_response(str(e), 400)
+    etag = list_etag(Complaint.list_version('officer', user['id']), user['id'])
+    if etag_matches(etag):
+        return not_modified_response(etag)
+    fields = parse_fields(request.args.get('fields'))
+    Complaint.last_error = None
+    try:
+        complaints, meta = sync_list('officer', user['id'], since,
+                                     lambda since: Complaint.get_assigned_to_officer(user['id'], fields, since))
+    except ValueError as e:
+        return error_response(str(e), 400)
+    if complaints is None:
+        return error_response(f"Retrieval Error: {Complaint.last_error}", 500)
+    return success_response(data=complaints, meta=meta, etag=etag)
 
 @officer_bp.route('/update-status', methods=['POST'])
 @token_required
@@ -44,6 +63,12 @@ def upload_proof():
     
     if not complaint_id:
         return error_response("Complaint ID required", 400)
+
+    # Store the image out of row; the complaint keeps only its /api/blobs/<digest> reference
+    try:
+        image_data = externalize(image_data)
+    except InvalidBlob as e:
+        return error_response(str(e), 400)
         
     if Complaint.update_status(complaint_id, 'Resolved', proof_notes, image_data):
         return success_response(message="Completion proof uploaded and job resolved")
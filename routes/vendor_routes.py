@@ -4,6 +4,10 @@ from utils.auth_middleware import token_required, role_required
 from models.complaint_model import Complaint
 from models.quotation_model import Quotation
 from models.vendor_model import Vendor
+from utils.pagination import parse_limit, parse_fields, encode_cursor, decode_cursor
+from utils.conditional import list_etag, etag_matches, not_modified_response
+from utils.blob_store import externalize, InvalidBlob
+from utils.sync import read_since, sync_list
 
 vendor_bp = Blueprint('vendor', __name__)
 
@@ -17,9 +21,31 @@ def get_available_jobs():
     if not vendor or not vendor['verified']:
         return error_response("Vendor not verified. Please contact admin.", 403)
         
-    complaints = Complaint.get_all() # We could filter for resolution_type='private' and status='Awaiting Quotes'
-    private_jobs = [c for c in complaints if c['resolution_type'] == 'private' and c['status'] == 'Awaiting Quotes']
-    return success_response(data=private_jobs)
+    try:
+        cursor = request.args.get('cursor')
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        return error_response(str(e), 400)
+    limit = parse_limit(request.args.get('limit'))
+    # ?match_service=1 narrows the feed to the vendor's service_type, ?exclude_quoted=1 hides jobs already bid on
+    service_type = vendor['service_type'] if request.args.get('match_service') == '1' else None
+    exclude_quoted = request.args.get('exclude_quoted') == '1'
+
+    try:
+        private_jobs, has_more = Complaint.get_available_for_vendor(
+            request.user['id'], service_type, exclude_quoted, after, limit,
+            parse_fields(request.args.get('fields'))
+        )
+    except ValueError as e:
+        return error_response(str(e), 400)
+    if not private_jobs and Complaint.last_error:
+        return error_response(f"Retrieval Error: {Complaint.last_error}", 500)
+
+    next_cursor = None
+    if has_more:
+        last = private_jobs[-1]
+        next_cursor = encode_cursor(last['created_at'], last['id'])
+    return success_response(data=private_jobs, meta={"next_cursor": next_cursor, "limit": limit})
 
 @vendor_bp.route('/quote', methods=['POST'])
 @token_required
@@ -42,8 +68,24 @@ def submit_quote():
 @token_required
 @role_required('vendor')
 def get_my_jobs():
-    jobs = Complaint.get_by_vendor(request.user['id'])
-    return success_response(data=jobs)
+    vendor_user_id = request.user['id']
+    try:
+        since = read_since()
+    except ValueError as e:
+        return error_response(str(e), 400)
+    etag = list_etag(Complaint.list_version('vendor', vendor_user_id), vendor_user_id)
+    if etag_matches(etag):
+        return not_modified_response(etag)
+    fields = parse_fields(request.args.get('fields'))
+    Complaint.last_error = None
+    try:
+        jobs, meta = sync_list('vendor', vendor_user_id, since,
+                               lambda since: Complaint.get_by_vendor(vendor_user_id, fields, since))
+    except ValueError as e:
+        return error_response(str(e), 400)
+    if jobs is None:
+        return error_response(f"Retrieval Error: {Complaint.last_error}", 500)
+    return success_response(data=jobs, meta=meta, etag=etag)
 
 @vendor_bp.route('/my-quotes', methods=['GET'])
 @token_required
@@ -86,6 +128,11 @@ def post_update():
     
     if not complaint_id or not message:
         return error_response("Complaint ID and Message are required", 400)
+
+    try:
+        image_url = externalize(image_url)
+    except InvalidBlob as e:
+        return error_response(str(e), 400)
         
     if JobUpdate.create(complaint_id, request.user['id'], message, image_url):
         return success_response(message="Progress update posted successfully")
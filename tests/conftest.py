@@ -0,0 +1,150 @@
+"""
+Shared fixtures.
+
+Tests that touch Postgres use the `db` fixture and are skipped unless TEST_DATABASE_URL points
+at a server where the user may create databases, e.g.
+
+    TEST_DATABASE_URL=postgresql://postgres@localhost:5432/postgres?sslmode=disable python -m pytest
+
+A throwaway database is created for the session, given the hand-made base tables
+(tests/base_schema.sql) and migrated; it is dropped at the end.
+"""
+import os
+import tempfile
+import time
+import uuid
+from urllib.parse import urlsplit, urlunsplit
+import psycopg2
+import pytest
+
+TEST_DATABASE_URL = os.environ.get('TEST_DATABASE_URL')
+_TEST_DB_NAME = f"civic_test_{os.getpid()}"
+
+
+def _with_database(url, name):
+    parts = urlsplit(url)
+    return urlunsplit(parts._replace(path="/" + name))
+
+
+def _admin_connection():
+    conn = psycopg2.connect(TEST_DATABASE_URL)
+    conn.autocommit = True
+    return conn
+
+
+# Configuration is read at import time, so the environment is set before any app module loads
+os.environ['SECRET_KEY'] = 'test-secret-key-that-is-long-enough-for-hs256'
+os.environ['BLOB_STORE_PATH'] = tempfile.mkdtemp(prefix="civic-blobs-")
+os.environ['PASSWORD_HASH_WORKERS'] = '0'
+os.environ.pop('DATABASE_REPLICA_URLS', None)
+if TEST_DATABASE_URL:
+    admin = _admin_connection()
+    with admin.cursor() as cursor:
+        cursor.execute(f"DROP DATABASE IF EXISTS {_TEST_DB_NAME}")
+        # UTF8 like any hosted Postgres; psycopg 3 (async mode) returns bytes for SQL_ASCII text
+        cursor.execute(f"CREATE DATABASE {_TEST_DB_NAME} ENCODING 'UTF8' LC_COLLATE 'C' LC_CTYPE 'C' TEMPLATE template0")
+    admin.close()
+    os.environ['DATABASE_URL'] = _with_database(TEST_DATABASE_URL, _TEST_DB_NAME)
+    with psycopg2.connect(os.environ['DATABASE_URL']) as conn, conn.cursor() as cursor:
+        with open(os.path.join(os.path.dirname(__file__), "base_schema.sql")) as f:
+            cursor.execute(f.read())
+else:
+    os.environ['DATABASE_URL'] = ''
+
+# Tables emptied between database tests (categories keep their seed rows)
+DATA_TABLES = ("job_updates", "feedback", "quotations", "complaint_tombstones", "complaint_daily_stats",
+               "complaint_stats_deltas",
+               "vendor_stats", "vendors", "complaints", "revoked_tokens", "blobs", "users")
+
+
+@pytest.fixture(scope="session")
+def flask_app():
+    from app import app
+    app.config['TESTING'] = True
+    return app
+
+
+@pytest.fixture(scope="session")
+def _database(flask_app):
+    if not TEST_DATABASE_URL:
+        pytest.skip("TEST_DATABASE_URL is not set")
+    yield os.environ['DATABASE_URL']
+    import database
+    database.close_pool()
+    admin = _admin_connection()
+    with admin.cursor() as cursor:
+        cursor.execute(f"DROP DATABASE IF EXISTS {_TEST_DB_NAME} WITH (FORCE)")
+    admin.close()
+
+
+@pytest.fixture
+def db(_database):
+    """A migrated, empty database; yields a direct autocommit connection for assertions."""
+    conn = psycopg2.connect(_database)
+    conn.autocommit = True
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT tablename FROM pg_tables WHERE schemaname = 'public'")
+        existing = {row[0] for row in cursor.fetchall()}
+        tables = [t for t in DATA_TABLES if t in existing]
+        cursor.execute(f"TRUNCATE {', '.join(tables)} RESTART IDENTITY CASCADE")
+    from models.vendor_model import VendorStats
+    VendorStats._cache.clear()
+    yield conn
+    conn.close()
+
+
+@pytest.fixture
+def client(flask_app):
+    return flask_app.test_client()
+
+
+def make_token(user_id, role, issued_at=None):
+    import jwt
+    from config import Config
+    now = int(time.time()) if issued_at is None else issued_at
+    return jwt.encode({"id": user_id, "role": role, "iat": now, "exp": now + 3600},
+                      Config.SECRET_KEY, algorithm="HS256")
+
+
+@pytest.fixture
+def make_user(db):
+    """make_user(role) -> (user_id, auth headers); vendors get a verified vendor profile."""
+    def factory(role="citizen", name=None, service_type="General"):
+        name = name or f"{role}-{uuid.uuid4().hex[:8]}"
+        with db.cursor() as cursor:
+            cursor.execute(
+                "INSERT INTO users (name, email, password, role) VALUES (%s, %s, 'x', %s) RETURNING id",
+                (name, f"{name}@test.local", role)
+            )
+            user_id = cursor.fetchone()[0]
+            if role == 'vendor':
+                cursor.execute(
+                    "INSERT INTO vendors (user_id, business_name, service_type, verified) VALUES (%s, %s, %s, TRUE)",
+                    (user_id, f"{name} Ltd", service_type)
+                )
+        return user_id, {"Authorization": f"Bearer {make_token(user_id, role)}"}
+    return factory
+
+
+@pytest.fixture
+def make_complaint(db):
+    def factory(user_id, category_id=1, status='Pending', resolution_type=None, **columns):
+        names = ["user_id", "category_id", "description", "location", "status", "resolution_type"] + list(columns)
+        values = [user_id, category_id, "Broken", "Main St", status, resolution_type] + list(columns.values())
+        with db.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO complaints ({', '.join(names)}) VALUES ({', '.join(['%s'] * len(names))}) RETURNING id",
+                values
+            )
+            return cursor.fetchone()[0]
+    return factory
+
+
+def wait_for(subscription, event_type, timeout=5):
+    """The next event of `event_type` on an EventHub subscription, or None."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        event = subscription.get(0.2)
+        if event and event["type"] == event_type:
+            return event
+    return None
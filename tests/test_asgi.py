@@ -0,0 +1,102 @@
+import pytest
+
+pytest.importorskip("a2wsgi")
+pytest.importorskip("psycopg_pool")
+from starlette.testclient import TestClient
+
+
+@pytest.fixture(scope="module")
+def async_client(_database):
+    import asgi
+    with TestClient(asgi.app) as client:
+        yield client
+
+
+@pytest.fixture
+def world(make_user, make_complaint):
+    citizen_id, citizen = make_user("citizen")
+    officer_id, officer = make_user("officer")
+    vendor_id, vendor = make_user("vendor")
+    _, admin = make_user("admin")
+    ids = [
+        make_complaint(citizen_id, assigned_officer_id=officer_id, resolution_type='government', status='In Progress'),
+        make_complaint(citizen_id, selected_vendor_id=vendor_id, resolution_type='private', status='In Progress'),
+        make_complaint(citizen_id, resolution_type='private', status='Awaiting Quotes'),
+    ]
+    return {"citizen": citizen, "officer": officer, "vendor": vendor, "admin": admin, "ids": ids}
+
+
+def without_since(body):
+    # meta.since is the database clock at request time, so it differs between any two requests
+    if body.get("meta"):
+        body["meta"].pop("since", None)
+    return body
+
+
+@pytest.mark.parametrize("path, who", [
+    ("/api/complaints/my", "citizen"),
+    ("/api/complaints/my?fields=all", "citizen"),
+    ("/api/vendor/my-jobs", "vendor"),
+    ("/api/officer/assigned", "officer"),
+    ("/api/admin/complaints", "admin"),
+    ("/api/admin/complaints?status=In%20Progress&limit=1", "admin"),
+    ("/api/vendor/available", "vendor"),
+])
+def test_async_endpoints_match_flask(client, async_client, world, path, who):
+    flask_response = client.get(path, headers=world[who])
+    async_response = async_client.get(path, headers=world[who])
+    assert async_response.status_code == flask_response.status_code == 200
+    assert without_since(async_response.json()) == without_since(flask_response.get_json())
+    assert async_response.headers.get("ETag") == flask_response.headers.get("ETag")
+
+
+def test_async_detail_matches_flask(client, async_client, world):
+    path = f"/api/complaints/{world['ids'][0]}"
+    assert async_client.get(path, headers=world["citizen"]).json() == client.get(path, headers=world["citizen"]).get_json()
+    # Someone else's complaint
+    assert async_client.get(path, headers=world["vendor"]).status_code == 404
+
+
+def test_async_conditional_get_and_delta_sync(async_client, world, db, monkeypatch):
+    from config import Config
+    monkeypatch.setattr(Config, "SYNC_OVERLAP_SECONDS", 0)
+    first = async_client.get("/api/complaints/my", headers=world["citizen"])
+    etag = first.headers["ETag"]
+    assert async_client.get("/api/complaints/my", headers=dict(world["citizen"], **{"If-None-Match": etag})).status_code == 304
+
+    with db.cursor() as cursor:
+        cursor.execute("DELETE FROM complaints WHERE id = %s", (world["ids"][2],))
+    delta = async_client.get("/api/complaints/my", headers=world["citizen"],
+                             params={"since": first.json()["meta"]["since"]}).json()
+    assert delta["data"] == [] and delta["meta"]["deleted"] == [world["ids"][2]]
+
+
+def test_other_routes_fall_through_to_flask(async_client, world):
+    response = async_client.get("/api/auth/profile", headers=world["citizen"])
+    assert response.status_code == 200 and response.json()["success"]
+
+
+def test_async_sync_rows_come_from_the_primary(monkeypatch):
+    import asyncio
+    import datetime
+    import async_database
+    from models.async_complaint_model import AsyncComplaint
+    from utils.sync import sync_list_async
+
+    async def sync_point(scope, scope_id, since):
+        return datetime.datetime(2024, 5, 1), [], False
+    monkeypatch.setattr(AsyncComplaint, "sync_point", sync_point)
+    seen = []
+
+    async def fetch(since):
+        seen.append(async_database._routing.get()["primary"])
+        return []
+
+    async def request():
+        # A client that has not written: its other reads may use a replica
+        with async_database.read_routing(primary=False):
+            await sync_list_async("user", 1, None, fetch)
+            return async_database._routing.get()["primary"]
+
+    assert asyncio.run(request()) is False
+    assert seen == [True]
@@ -0,0 +1,46 @@
+import pytest
+from utils.passwords import verify_password
+
+
+def test_register_and_login(client, db):
+    account = {"name": "Asha", "email": "asha@test.local", "password": "s3cret-pass"}
+    assert client.post('/api/auth/register', json=account).status_code == 200
+    response = client.post('/api/auth/login', json={"email": account["email"], "password": account["password"]})
+    assert response.status_code == 200 and response.get_json()["data"]["token"]
+    assert client.post('/api/auth/login', json={"email": account["email"], "password": "wrong"}).status_code == 401
+
+
+@pytest.mark.parametrize("body", [
+    {"email": "asha@test.local", "password": 12345678},
+    {"email": "asha@test.local", "password": ["s3cret-pass"]},
+    {"email": {"$ne": ""}, "password": "s3cret-pass"},
+    {"email": "asha@test.local"},
+    ["asha@test.local", "s3cret-pass"],
+])
+def test_login_rejects_non_string_credentials(client, db, body):
+    assert client.post('/api/auth/login', json=body).status_code == 400
+
+
+def test_register_rejects_non_string_fields(client, db):
+    response = client.post('/api/auth/register', json={"name": "Asha", "email": "asha@test.local", "password": 12345678})
+    assert response.status_code == 400
+    assert client.post('/api/auth/register', data="not json", content_type="application/json").status_code == 400
+    assert client.post('/api/auth/forgot-password', json={"email": 42}).status_code == 400
+
+
+def test_verify_password_rejects_non_strings():
+    assert verify_password("plain-seed-password", 12345678) is False
+    assert verify_password("plain-seed-password", None) is False
+
+
+def test_hashing_pool_spawns_its_workers(monkeypatch):
+    from utils import passwords
+    monkeypatch.setattr(passwords.Config, "PASSWORD_HASH_WORKERS", 1)
+    monkeypatch.setattr(passwords, "_executor", None)
+    executor = passwords._get_executor()
+    try:
+        assert executor._mp_context.get_start_method() == "spawn"
+        stored = passwords.hash_password("s3cret-pass")
+        assert passwords.verify_password(stored, "s3cret-pass")
+    finally:
+        executor.shutdown()
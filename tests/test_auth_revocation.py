@@ -0,0 +1,61 @@
+import time
+from config import Config
+from utils import auth_middleware
+from conftest import make_token
+
+
+def bearer(token):
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_logout_revokes_the_token_in_every_worker(client, make_user):
+    user_id, headers = make_user("citizen")
+    assert client.get('/api/auth/profile', headers=headers).status_code == 200
+    assert client.post('/api/auth/logout', headers=headers).status_code == 200
+    assert client.get('/api/auth/profile', headers=headers).status_code == 403
+    # A worker that never saw the logout only has the database to go by
+    auth_middleware._verified_tokens.clear()
+    assert client.get('/api/auth/profile', headers=headers).status_code == 403
+
+
+def test_revocation_from_another_worker_is_seen_after_the_recheck_interval(client, make_user, db, monkeypatch):
+    user_id, headers = make_user("citizen")
+    assert client.get('/api/auth/profile', headers=headers).status_code == 200
+    with db.cursor() as cursor:
+        cursor.execute("UPDATE users SET tokens_valid_after = %s WHERE id = %s", (int(time.time()), user_id))
+    # Still served from this worker's cache...
+    assert client.get('/api/auth/profile', headers=headers).status_code == 200
+    # ...until the entry is due for a recheck
+    monkeypatch.setattr(Config, "TOKEN_RECHECK_SECONDS", 0)
+    auth_middleware._verified_tokens.clear()
+    assert client.get('/api/auth/profile', headers=headers).status_code == 403
+
+
+def test_revoke_user_compares_whole_seconds(client, make_user, db):
+    user_id, _ = make_user("citizen")
+    _, admin_headers = make_user("admin")
+    same_second = make_token(user_id, "citizen", issued_at=int(time.time()))
+    assert client.post(f'/api/admin/users/{user_id}/revoke-tokens', headers=admin_headers).status_code == 200
+    assert client.get('/api/auth/profile', headers=bearer(same_second)).status_code == 403
+    # Other users are unaffected
+    assert client.get('/api/auth/profile', headers=admin_headers).status_code == 200
+
+    # Tokens issued after the revocation second are accepted
+    now = int(time.time())
+    with db.cursor() as cursor:
+        cursor.execute("UPDATE users SET tokens_valid_after = %s WHERE id = %s", (now - 5, user_id))
+    assert client.get('/api/auth/profile', headers=bearer(make_token(user_id, "citizen", issued_at=now - 5))).status_code == 403
+    assert client.get('/api/auth/profile', headers=bearer(make_token(user_id, "citizen", issued_at=now - 4))).status_code == 200
+
+
+def test_query_string_token_only_on_event_streams(client, make_user, make_complaint):
+    user_id, headers = make_user("citizen")
+    complaint_id = make_complaint(user_id)
+    token = headers["Authorization"].split(" ")[1]
+    sse = {"Accept": "text/event-stream"}
+    assert client.get(f'/api/auth/profile?access_token={token}', headers=sse).status_code == 403
+    assert client.get(f'/api/complaints/my?access_token={token}', headers=sse).status_code == 403
+    for path in ('/api/complaints/events', f'/api/complaints/{complaint_id}/events'):
+        response = client.get(f'{path}?access_token={token}', buffered=False)
+        assert response.status_code == 200
+        response.close()
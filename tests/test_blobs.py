@@ -0,0 +1,38 @@
+import io
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 200
+
+
+def test_upload_records_the_uploader(client, db, make_user):
+    user_id, headers = make_user("citizen")
+    response = client.post('/api/blobs', headers=dict(headers, **{"Content-Type": "image/png"}), data=PNG)
+    assert response.status_code == 201
+    body = response.get_json()["data"]
+    assert body["content_type"] == "image/png" and body["size"] == len(PNG)
+    with db.cursor() as cursor:
+        cursor.execute("SELECT uploaded_by, content_type, size FROM blobs WHERE digest = %s", (body["digest"],))
+        assert cursor.fetchall() == [(user_id, "image/png", len(PNG))]
+    assert client.get(body["ref"]).mimetype == "image/png"
+
+
+def test_multipart_upload(client, make_user):
+    _, headers = make_user("citizen")
+    response = client.post('/api/blobs', headers=headers,
+                           data={"file": (io.BytesIO(PNG), "photo.png", "image/png")})
+    assert response.status_code == 201
+
+
+def test_non_images_are_rejected(client, make_user):
+    _, headers = make_user("citizen")
+    html = b"<html><script>alert(1)</script></html>" * 4
+    assert client.post('/api/blobs', headers=headers, data=html).status_code == 400
+    assert client.post('/api/blobs', headers=dict(headers, **{"Content-Type": "text/html"}), data=html).status_code == 415
+    # Declared type and magic bytes disagree
+    assert client.post('/api/blobs', headers=dict(headers, **{"Content-Type": "image/jpeg"}), data=PNG).status_code == 400
+
+
+def test_request_body_limit(client, flask_app, make_user, monkeypatch):
+    _, headers = make_user("citizen")
+    monkeypatch.setitem(flask_app.config, "MAX_CONTENT_LENGTH", 100)
+    response = client.post('/api/blobs', headers=dict(headers, **{"Content-Type": "image/png"}), data=PNG)
+    assert response.status_code == 413
@@ -0,0 +1,36 @@
+from models.vendor_model import VendorStats
+from utils.events import EventHub
+from conftest import wait_for
+
+
+def test_bulk_route_matches_the_single_item_side_effects(client, db, make_user, make_complaint, _database):
+    citizen_id, _ = make_user("citizen")
+    vendor_id, _ = make_user("vendor")
+    _, admin_headers = make_user("admin")
+    resolved = make_complaint(citizen_id, status='Resolved', resolution_type='private', selected_vendor_id=vendor_id)
+    pending = make_complaint(citizen_id)
+    with db.cursor() as cursor:
+        cursor.execute("INSERT INTO quotations (complaint_id, vendor_id, price, status) VALUES (%s, %s, 120, 'Approved')",
+                       (resolved, vendor_id))
+        cursor.execute("INSERT INTO vendor_stats (vendor_id, completed_jobs, total_earnings) VALUES (%s, 1, 120)",
+                       (vendor_id,))
+    assert VendorStats.get(vendor_id)["completed_jobs"] == 1
+
+    subscription = EventHub(_database).subscribe(user_id=citizen_id)
+    response = client.post('/api/admin/route/bulk', headers=admin_headers, json={"items": [
+        {"complaint_id": resolved, "action": "private"},
+        {"complaint_id": pending, "action": "government"},
+    ]})
+    assert response.get_json()["data"]["applied"] == 2
+
+    # The re-routed job left the vendor's completed jobs, and the cached counters were dropped
+    stats = VendorStats.get(vendor_id)
+    assert stats["completed_jobs"] == 0 and stats["total_earnings"] == 0
+
+    events = {}
+    for _ in range(2):
+        event = wait_for(subscription, "status")
+        events[event["complaint_id"]] = event["data"]
+    assert events[resolved]["previous_status"] == "Resolved" and events[resolved]["status"] == "Awaiting Quotes"
+    assert events[pending]["previous_status"] == "Pending" and events[pending]["status"] == "Routed"
+    subscription.close()
@@ -0,0 +1,97 @@
+import threading
+import psycopg2
+import pytest
+
+
+def etag_of(client, path, headers):
+    response = client.get(path, headers=headers)
+    assert response.status_code == 200 and response.headers.get("ETag")
+    return response.headers["ETag"]
+
+
+def test_unchanged_listing_answers_304(client, make_user, make_complaint):
+    citizen_id, headers = make_user("citizen")
+    make_complaint(citizen_id)
+    etag = etag_of(client, '/api/complaints/my', headers)
+    response = client.get('/api/complaints/my', headers=dict(headers, **{"If-None-Match": etag}))
+    assert response.status_code == 304 and not response.data
+    # Query parameters are part of the validator
+    assert client.get('/api/complaints/my?fields=all', headers=dict(headers, **{"If-None-Match": etag})).status_code == 200
+
+
+@pytest.mark.parametrize("change", [
+    "UPDATE users SET name = 'Renamed citizen' WHERE id = %(citizen)s",
+    "UPDATE users SET name = 'Renamed officer' WHERE id = %(officer)s",
+    "UPDATE vendors SET business_name = 'Renamed Ltd' WHERE user_id = %(vendor)s",
+    "UPDATE categories SET name = name || ' (renamed)' WHERE id = 1",
+    "INSERT INTO feedback (complaint_id, rating, comment) VALUES (%(complaint)s, 5, 'Great')",
+])
+def test_joined_data_changes_the_admin_listing_etag(client, db, make_user, make_complaint, change):
+    citizen_id, _ = make_user("citizen")
+    officer_id, _ = make_user("officer")
+    vendor_id, _ = make_user("vendor")
+    _, admin_headers = make_user("admin")
+    complaint_id = make_complaint(citizen_id, assigned_officer_id=officer_id, selected_vendor_id=vendor_id)
+    before = etag_of(client, '/api/admin/complaints', admin_headers)
+
+    with db.cursor() as cursor:
+        cursor.execute(change, {"citizen": citizen_id, "officer": officer_id, "vendor": vendor_id, "complaint": complaint_id})
+    response = client.get('/api/admin/complaints', headers=dict(admin_headers, **{"If-None-Match": before}))
+    assert response.status_code == 200 and response.headers["ETag"] != before
+    with db.cursor() as cursor:
+        cursor.execute("UPDATE categories SET name = replace(name, ' (renamed)', '') WHERE id = 1")
+
+
+def test_a_rating_change_reaches_filtered_admin_listings(client, db, make_user, make_complaint):
+    citizen_id, _ = make_user("citizen")
+    vendor_id, _ = make_user("vendor")
+    _, admin_headers = make_user("admin")
+    make_complaint(citizen_id, status='In Progress', selected_vendor_id=vendor_id)
+    resolved = make_complaint(citizen_id, status='Resolved', selected_vendor_id=vendor_id)
+    path = '/api/admin/complaints?status=In Progress'
+    before = etag_of(client, path, admin_headers)
+    with db.cursor() as cursor:
+        cursor.execute("SELECT updated_at FROM complaints WHERE status = 'In Progress'")
+        touched = cursor.fetchone()[0]
+    # Feedback on the resolved job moves the rating shown on the in-progress one
+    assert client.post(f'/api/complaints/{resolved}/feedback', headers=admin_headers,
+                       json={"rating": 2}).status_code == 200
+    assert etag_of(client, path, admin_headers) != before
+    with db.cursor() as cursor:
+        cursor.execute("SELECT updated_at FROM complaints WHERE status = 'In Progress'")
+        assert cursor.fetchone()[0] == touched
+
+
+def test_concurrent_feedback_for_one_vendor_does_not_deadlock(db, _database, make_user, make_complaint):
+    citizen_id, _ = make_user("citizen")
+    vendor_id, _ = make_user("vendor")
+    complaints = [make_complaint(citizen_id, status='Resolved', selected_vendor_id=vendor_id) for _ in range(2)]
+    both_inserted = threading.Barrier(2)
+    errors = []
+
+    def feedback(complaint_id):
+        # submit_feedback's two statements, with both feedback rows in before either vendor update
+        conn = psycopg2.connect(_database)
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("INSERT INTO feedback (complaint_id, rating) VALUES (%s, 4)", (complaint_id,))
+                both_inserted.wait(5)
+                cursor.execute("""
+                    UPDATE vendors SET rating_sum = rating_sum + 4, rating_count = rating_count + 1,
+                    rating = ROUND((rating_sum + 4)::numeric / (rating_count + 1), 2) WHERE user_id = %s
+                """, (vendor_id,))
+            conn.commit()
+        except Exception as e:
+            errors.append(e)
+        finally:
+            conn.close()
+
+    threads = [threading.Thread(target=feedback, args=(c,)) for c in complaints]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+    assert errors == []
+    with db.cursor() as cursor:
+        cursor.execute("SELECT rating_count FROM vendors WHERE user_id = %s", (vendor_id,))
+        assert cursor.fetchone()[0] == 2
@@ -0,0 +1,43 @@
+import pytest
+from utils.events import EventHub, notify
+from conftest import wait_for
+
+
+@pytest.fixture
+def hub(_database):
+    return EventHub(_database)
+
+
+def test_subscribe_returns_once_listening(hub, db):
+    subscription = hub.subscribe(complaint_id=42)
+    assert hub.stats()["listening"]
+    # Sent right after subscribe() returned, yet received: no window before LISTEN
+    with db.cursor() as cursor:
+        notify(cursor, "status", 42, 1, {"id": 42, "status": "Routed"})
+    assert wait_for(subscription, "status")["data"] == {"id": 42, "status": "Routed"}
+    subscription.close()
+
+
+def test_routing_pushes_a_status_event(hub, db, make_user, make_complaint):
+    from models.complaint_model import Complaint
+    user_id, _ = make_user("citizen")
+    complaint_id = make_complaint(user_id)
+    subscription = hub.subscribe(user_id=user_id)
+    assert Complaint.route_to_private(complaint_id)[0]
+    event = wait_for(subscription, "status")
+    assert event["complaint_id"] == complaint_id
+    assert event["data"]["status"] == "Awaiting Quotes" and event["data"]["previous_status"] == "Pending"
+    subscription.close()
+
+
+def test_reconnect_sends_resync(hub, db):
+    subscription = hub.subscribe(user_id=7)
+    with db.cursor() as cursor:
+        cursor.execute("""
+            SELECT bool_and(pg_terminate_backend(pid)) FROM pg_stat_activity
+            WHERE datname = current_database() AND query LIKE 'LISTEN%%'
+        """)
+        assert cursor.fetchone()[0]
+    assert wait_for(subscription, "resync")["data"] == {"reason": "reconnected"}
+    assert hub.stats()["listening"]
+    subscription.close()
@@ -0,0 +1,38 @@
+def test_listing_returns_only_the_requested_fields(client, make_user, make_complaint):
+    citizen_id, headers = make_user("citizen")
+    make_complaint(citizen_id)
+    response = client.get('/api/complaints/my?fields=status,location', headers=headers)
+    assert response.status_code == 200
+    [row] = response.get_json()["data"]
+    assert set(row) == {"id", "status", "location"}
+
+
+def test_summary_and_all_projections(client, make_user, make_complaint):
+    citizen_id, headers = make_user("citizen")
+    make_complaint(citizen_id)
+    [summary] = client.get('/api/complaints/my', headers=headers).get_json()["data"]
+    assert "description" not in summary and {"id", "status", "location"} <= set(summary)
+    [full] = client.get('/api/complaints/my?fields=all', headers=headers).get_json()["data"]
+    assert full["description"] == "Broken" and set(summary) <= set(full)
+
+
+def test_keyset_listing_always_carries_its_cursor_columns(client, make_user, make_complaint):
+    citizen_id, _ = make_user("citizen")
+    _, admin_headers = make_user("admin")
+    for _ in range(3):
+        make_complaint(citizen_id)
+    response = client.get('/api/admin/complaints?fields=status,citizen_name&limit=2', headers=admin_headers)
+    assert response.status_code == 200
+    body = response.get_json()
+    assert {frozenset(row) for row in body["data"]} == {frozenset({"id", "created_at", "status", "citizen_name"})}
+    assert body["meta"]["next_cursor"]
+
+
+def test_unknown_field_is_rejected(client, make_user, make_complaint):
+    citizen_id, headers = make_user("citizen")
+    _, admin_headers = make_user("admin")
+    make_complaint(citizen_id)
+    for path, auth in (('/api/complaints/my', headers), ('/api/admin/complaints', admin_headers)):
+        response = client.get(path + '?fields=status,password', headers=auth)
+        assert response.status_code == 400
+        assert "password" in response.get_json()["message"]
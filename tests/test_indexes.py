@@ -0,0 +1,28 @@
+import migrations
+from models.complaint_model import Complaint
+from utils import prepared
+
+
+def test_every_hot_query_is_served_by_an_index(db, monkeypatch):
+    # Only the queries the models build, not the probes other tests prepared
+    monkeypatch.setattr(prepared, "registered", lambda: [])
+    report = migrations.check_indexes()
+    assert "Complaint.get_page ?cursor=" in report and "User.is_token_revoked" in report
+    assert "ComplaintStats.summary ?from=" in report
+    assert {name: issues for name, issues in report.items() if issues} == {}
+
+
+def test_variants_prepared_at_runtime_are_checked_too(db):
+    Complaint.get_page(fields=["id", "status", "citizen_name"])
+    query, _ = Complaint.page_query(fields=["id", "status", "citizen_name"])
+    assert query in [sql for _, sql in migrations.index_checks()]
+
+
+def test_an_unindexed_query_is_reported(db, monkeypatch):
+    monkeypatch.setattr(migrations, "index_checks", lambda: [
+        ("by description", "SELECT id FROM complaints WHERE description = %s"),
+        ("sorted by location", "SELECT id FROM complaints WHERE user_id = %s ORDER BY location"),
+    ])
+    report = migrations.check_indexes()
+    assert report["by description"] == ["sequential scan on complaints"]
+    assert report["sorted by location"] == ["explicit sort on location"]
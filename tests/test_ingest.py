@@ -0,0 +1,23 @@
+import json
+from utils.events import EventHub
+from conftest import wait_for
+
+
+def test_import_notifies_each_owner_once_per_batch(client, db, make_user, _database):
+    citizen_id, _ = make_user("citizen")
+    admin_id, admin_headers = make_user("admin")
+    records = [{"description": f"Pothole {i}", "location": "Main St", "category_id": 1, "user_id": citizen_id}
+               for i in range(3)]
+    records.append({"description": "Unknown", "location": "Main St", "category": "No such category"})
+    subscription = EventHub(_database).subscribe(user_id=citizen_id)
+
+    response = client.post('/api/admin/complaints/import', headers=admin_headers,
+                           data="\n".join(json.dumps(r) for r in records), content_type="application/x-ndjson")
+    body = response.get_json()
+    assert body["data"]["inserted"] == 3 and body["data"]["rejected_count"] == 1
+
+    event = wait_for(subscription, "created")
+    assert event["user_id"] == citizen_id
+    assert event["data"]["count"] == 3 and len(event["data"]["ids"]) == 3
+    assert wait_for(subscription, "created", timeout=0.5) is None
+    subscription.close()
@@ -0,0 +1,28 @@
+import threading
+import time
+import psycopg2
+import migrations
+
+
+def test_waiting_worker_does_not_block_concurrent_index_builds(db, _database, monkeypatch):
+    # Another worker holds the migration lock and builds an index concurrently
+    holder = psycopg2.connect(_database)
+    holder.autocommit = True
+    cursor = holder.cursor()
+    cursor.execute("SELECT pg_advisory_lock(%s)", (migrations.MIGRATION_LOCK_KEY,))
+
+    monkeypatch.setattr(migrations, "expected_fingerprint", lambda: "pending")
+    monkeypatch.setattr(migrations, "MIGRATION_LOCK_POLL_SECONDS", 0.05)
+    result = []
+    waiter = threading.Thread(target=lambda: result.append(migrations.run_db_migrations()))
+    waiter.start()
+    time.sleep(0.3)
+    try:
+        cursor.execute("SET statement_timeout = '5s'")
+        cursor.execute("CREATE INDEX CONCURRENTLY idx_test_lock_wait ON complaints (location)")
+        cursor.execute("DROP INDEX idx_test_lock_wait")
+    finally:
+        cursor.execute("SELECT pg_advisory_unlock(%s)", (migrations.MIGRATION_LOCK_KEY,))
+        holder.close()
+    waiter.join(10)
+    assert result == [True]
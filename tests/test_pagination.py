@@ -0,0 +1,56 @@
+import datetime
+
+
+def walk(client, path, headers, **params):
+    """Follows next_cursor until the last page; returns the ids in order and the page count."""
+    ids, pages, cursor = [], 0, None
+    while True:
+        query = dict(params, **({'cursor': cursor} if cursor else {}))
+        body = client.get(path, headers=headers, query_string=query).get_json()
+        ids += [row['id'] for row in body['data']]
+        pages += 1
+        cursor = body['meta']['next_cursor']
+        if not cursor:
+            return ids, pages
+
+
+def test_admin_listing_pages_through_ties_without_gaps(client, db, make_user, make_complaint):
+    citizen_id, _ = make_user("citizen")
+    _, headers = make_user("admin")
+    tie = datetime.datetime(2024, 5, 1, 12, 0, 0, 123456)
+    # Three complaints share one created_at: the id breaks the tie
+    ids = [make_complaint(citizen_id, created_at=tie) for _ in range(3)]
+    ids += [make_complaint(citizen_id, created_at=tie + datetime.timedelta(seconds=i)) for i in (1, 2)]
+
+    listed, pages = walk(client, '/api/admin/complaints', headers, limit=2)
+    # Newest first; within the tie, highest id first
+    assert listed == ids[::-1]
+    assert pages == 3
+
+
+def test_filters_and_cursor_combine(client, db, make_user, make_complaint):
+    citizen_id, _ = make_user("citizen")
+    _, headers = make_user("admin")
+    pending = [make_complaint(citizen_id) for _ in range(3)]
+    make_complaint(citizen_id, status='Routed')
+    listed, _ = walk(client, '/api/admin/complaints', headers, limit=1, status='Pending')
+    assert listed == pending[::-1]
+
+
+def test_vendor_feed_pages_with_a_cursor(client, db, make_user, make_complaint):
+    citizen_id, _ = make_user("citizen")
+    _, headers = make_user("vendor")
+    open_jobs = [make_complaint(citizen_id, status='Awaiting Quotes', resolution_type='private') for _ in range(5)]
+    make_complaint(citizen_id)
+    listed, pages = walk(client, '/api/vendor/available', headers, limit=2)
+    assert listed == open_jobs[::-1]
+    assert pages == 3
+
+
+def test_malformed_cursor_is_rejected(client, db, make_user):
+    _, admin_headers = make_user("admin")
+    _, vendor_headers = make_user("vendor")
+    assert client.get('/api/admin/complaints', headers=admin_headers,
+                      query_string={'cursor': 'not-a-cursor'}).status_code == 400
+    assert client.get('/api/vendor/available', headers=vendor_headers,
+                      query_string={'cursor': 'not-a-cursor'}).status_code == 400
@@ -0,0 +1,82 @@
+import threading
+import pytest
+import psycopg2.extensions
+from database import ConnectionPool, PooledConnection, PoolTimeout, normalize_dsn
+
+
+@pytest.fixture
+def pool(_database):
+    pool = ConnectionPool(normalize_dsn(_database), minconn=1, maxconn=2, timeout=0.2, check_interval=30)
+    yield pool
+    pool.closeall()
+
+
+def test_checkout_is_bounded_and_times_out(pool):
+    first, second = pool.getconn(), pool.getconn()
+    with pytest.raises(PoolTimeout):
+        pool.getconn()
+    pool.putconn(first)
+    assert pool.getconn() is first
+    stats = pool.stats()
+    assert stats["timeouts"] == 1 and stats["size"] == 2
+    pool.putconn(first)
+    pool.putconn(second)
+
+
+def test_half_finished_transaction_is_rolled_back_on_return(pool):
+    conn = pool.getconn()
+    conn.cursor().execute("SELECT 1")
+    assert conn.get_transaction_status() == psycopg2.extensions.TRANSACTION_STATUS_INTRANS
+    pool.putconn(conn)
+    assert conn.get_transaction_status() == psycopg2.extensions.TRANSACTION_STATUS_IDLE
+
+
+def test_dead_idle_connection_is_replaced(pool):
+    pool.check_interval = 0
+    conn = pool.getconn()
+    pool.putconn(conn)
+    conn.close()
+    replacement = pool.getconn()
+    assert replacement is not conn and not replacement.closed
+    assert pool.stats()["failed_health_checks"] == 1
+    pool.putconn(replacement)
+
+
+def test_proxy_forwards_attribute_writes(pool):
+    conn = PooledConnection(pool, pool.getconn())
+    raw = conn.raw
+    conn.autocommit = True
+    assert raw.autocommit is True
+    conn.autocommit = False
+    conn.close()
+
+
+def test_proxy_context_manager_commits_and_returns(pool, db):
+    with PooledConnection(pool, pool.getconn()) as conn:
+        conn.cursor().execute("INSERT INTO categories (name) VALUES ('Pool test')")
+    assert pool.stats()["in_use"] == 0
+    with pytest.raises(RuntimeError):
+        with PooledConnection(pool, pool.getconn()) as conn:
+            conn.cursor().execute("INSERT INTO categories (name) VALUES ('Rolled back')")
+            raise RuntimeError
+    with db.cursor() as cursor:
+        cursor.execute("SELECT name FROM categories WHERE name IN ('Pool test', 'Rolled back')")
+        assert [row[0] for row in cursor.fetchall()] == ['Pool test']
+        cursor.execute("DELETE FROM categories WHERE name = 'Pool test'")
+
+
+def test_counters_are_consistent_under_concurrency(pool):
+    pool.timeout = 5
+
+    def worker():
+        for _ in range(25):
+            pool.putconn(pool.getconn())
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    stats = pool.stats()
+    assert stats["checkouts"] == 200
+    assert stats["in_use"] == 0 and stats["size"] <= 2
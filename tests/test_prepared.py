@@ -0,0 +1,83 @@
+import threading
+import psycopg2
+import pytest
+from config import Config
+from utils import prepared
+
+
+@pytest.fixture
+def conn(_database, monkeypatch):
+    monkeypatch.setattr(Config, "DB_PREPARED_STATEMENTS", "on")
+    conn = psycopg2.connect(_database)
+    yield conn
+    conn.close()
+
+
+def test_lost_statements_are_prepared_again_inside_the_transaction(conn, db):
+    cursor = conn.cursor()
+    cursor.execute("INSERT INTO categories (name) VALUES ('Prepared test')")
+    prepared.execute(cursor, "test_category_by_name", "SELECT id FROM categories WHERE name = %s", ("Prepared test",))
+    assert cursor.fetchone()
+    # What a pooler handing out another session (or DISCARD ALL) looks like to us
+    cursor.execute("DEALLOCATE ALL")
+    prepared.execute(cursor, "test_category_by_name", "SELECT id FROM categories WHERE name = %s", ("Prepared test",))
+    assert cursor.fetchone()
+    # The caller's transaction survived the failed EXECUTE
+    conn.commit()
+    with db.cursor() as check:
+        check.execute("DELETE FROM categories WHERE name = 'Prepared test' RETURNING id")
+        assert check.fetchone()
+
+
+def test_savepoints_do_not_pile_up_inside_a_transaction(conn, db):
+    cursor = conn.cursor()
+    for i in range(100):
+        prepared.execute(cursor, "test_category_by_id", "SELECT name FROM categories WHERE id = %s", (1,))
+        assert cursor.fetchone()
+    cursor.execute("INSERT INTO categories (name) VALUES ('Prepared savepoints')")
+    # Every prepared_execute savepoint was released again
+    with pytest.raises(psycopg2.errors.InvalidSavepointSpecification):
+        cursor.execute("RELEASE SAVEPOINT prepared_execute")
+    conn.rollback()
+
+
+def test_plan_invalidated_by_a_migration_is_retried(conn, db):
+    db.cursor().execute("CREATE TABLE prepared_probe (id INT)")
+    try:
+        cursor = conn.cursor()
+        prepared.execute(cursor, "test_probe_all", "SELECT * FROM prepared_probe")
+        conn.commit()
+        db.cursor().execute("ALTER TABLE prepared_probe ADD COLUMN extra INT")
+        prepared.execute(cursor, "test_probe_all", "SELECT * FROM prepared_probe")
+        assert [column.name for column in cursor.description] == ["id", "extra"]
+        conn.commit()
+    finally:
+        conn.rollback()
+        db.cursor().execute("DROP TABLE prepared_probe")
+
+
+def test_auto_mode_checks_each_connection_dsn(monkeypatch):
+    monkeypatch.setattr(Config, "DB_PREPARED_STATEMENTS", "auto")
+    assert prepared.enabled("postgresql://u@db.example.com/civic")
+    assert not prepared.enabled("postgresql://u@ep-1-pooler.neon.tech/civic")
+    assert not prepared.enabled("host=pgbouncer.internal dbname=civic")
+
+
+def test_counters_are_exact_under_concurrency(_database, monkeypatch):
+    monkeypatch.setattr(Config, "DB_PREPARED_STATEMENTS", "on")
+
+    def worker():
+        conn = psycopg2.connect(_database)
+        conn.autocommit = True
+        cursor = conn.cursor()
+        for _ in range(50):
+            prepared.execute(cursor, "test_counter", "SELECT 1")
+        conn.close()
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    statement = next(s for s in prepared.stats()["statements"] if s["query"] == "test_counter")
+    assert statement["executions"] == 400 and statement["prepares"] == 8
@@ -0,0 +1,51 @@
+from models.complaint_model import Complaint
+from models.quotation_model import Quotation
+
+# The per-row subqueries the citizen and vendor listings used to run
+OLD_USER_SUMMARY = """
+    SELECT c.id,
+           (SELECT price FROM quotations WHERE complaint_id = c.id AND status = 'Approved' LIMIT 1) as agreed_price,
+           (SELECT COUNT(*) FROM quotations WHERE complaint_id = c.id) as quote_count,
+           (SELECT MIN(price) FROM quotations WHERE complaint_id = c.id) as min_quote_price
+    FROM complaints c
+    WHERE c.user_id = %s
+"""
+OLD_VENDOR_PRICE = """
+    SELECT c.id, (SELECT price FROM quotations WHERE complaint_id = c.id AND vendor_id = %s LIMIT 1) as price
+    FROM complaints c
+    WHERE c.selected_vendor_id = %s
+"""
+
+
+def test_quote_summary_matches_the_old_subqueries(db, make_user, make_complaint):
+    citizen_id, _ = make_user("citizen")
+    vendors = [make_user("vendor")[0] for _ in range(3)]
+    approved = make_complaint(citizen_id, status='Awaiting Quotes', resolution_type='private')
+    open_bids = make_complaint(citizen_id, status='Awaiting Quotes', resolution_type='private')
+    unquoted = make_complaint(citizen_id, status='Awaiting Quotes', resolution_type='private')
+    cheapest_won = make_complaint(citizen_id, status='Awaiting Quotes', resolution_type='private')
+    for vendor_id, price in zip(vendors, (450, 300, 525.5)):
+        assert Quotation.create(approved, vendor_id, price, "3 days")
+    assert Quotation.create(open_bids, vendors[2], 80, "1 day")
+    assert Quotation.create(cheapest_won, vendors[0], 120, "1 day")
+    assert Quotation.create(cheapest_won, vendors[1], 150, "2 days")
+    assert Complaint.approve_quotation(approved, vendors[0])
+    assert Complaint.approve_quotation(cheapest_won, vendors[0])
+
+    with db.cursor() as cursor:
+        cursor.execute(OLD_USER_SUMMARY, (citizen_id,))
+        expected = {row[0]: row[1:] for row in cursor.fetchall()}
+    got = {row['id']: (row['agreed_price'], row['quote_count'], row['min_quote_price'])
+           for row in Complaint.get_by_user(citizen_id)}
+    assert got == expected
+    assert got[unquoted] == (None, 0, None)
+    assert got[approved] == (450, 3, 300)
+
+    for vendor_id in vendors:
+        with db.cursor() as cursor:
+            cursor.execute(OLD_VENDOR_PRICE, (vendor_id, vendor_id))
+            expected = dict(cursor.fetchall())
+        assert {row['id']: row['price'] for row in Complaint.get_by_vendor(vendor_id)} == expected
+
+    # The repair command finds nothing to fix on rows the write paths maintained
+    assert Quotation.refresh_summaries() == 0
@@ -0,0 +1,61 @@
+import time
+import pytest
+import database
+from config import Config
+
+
+@pytest.fixture
+def replicas(_database, monkeypatch):
+    """Two "replicas" that are really the test database."""
+    monkeypatch.setattr(Config, "DATABASE_REPLICA_URLS", [_database, _database])
+    monkeypatch.setattr(database, "_replica_pools", None)
+    database._recent_writers.clear()
+    yield
+    for pool in database._replica_pools or []:
+        pool.closeall()
+    database._recent_writers.clear()
+
+
+def test_write_response_carries_the_last_write_marker(client, make_user, replicas):
+    _, headers = make_user("citizen")
+    response = client.post('/api/auth/profile/update', headers=headers, json={"name": "New name"})
+    assert response.status_code == 200
+    assert abs(float(response.headers[database.LAST_WRITE_HEADER]) - time.time()) < 5
+    assert database.LAST_WRITE_COOKIE in response.headers["Set-Cookie"]
+
+
+def test_marker_from_another_worker_keeps_reads_on_the_primary(flask_app, replicas):
+    with flask_app.test_request_context(headers={database.LAST_WRITE_HEADER: str(time.time())}):
+        assert not database._replica_allowed()
+    with flask_app.test_request_context(headers={"Cookie": f"{database.LAST_WRITE_COOKIE}={time.time()}"}):
+        assert not database._replica_allowed()
+    stale = time.time() - Config.READ_YOUR_WRITES_SECONDS - 1
+    with flask_app.test_request_context(headers={database.LAST_WRITE_HEADER: str(stale)}):
+        assert database._replica_allowed()
+    with flask_app.test_request_context(headers={database.LAST_WRITE_HEADER: "garbage"}):
+        assert database._replica_allowed()
+
+
+def test_reads_of_one_request_use_one_replica(flask_app, replicas):
+    from flask import g
+    for _ in range(3):
+        with flask_app.test_request_context():
+            first = database.get_read_connection()
+            pinned = g._read_replica
+            second = database.get_read_connection()
+            assert g._read_replica == pinned
+            assert first._pool is second._pool is database._replica_pools[pinned]
+            first.close()
+            second.close()
+
+
+@pytest.mark.parametrize("path", ["/api/complaints/events", "/api/complaints/{id}/events"])
+def test_event_stream_snapshots_read_the_primary(client, make_user, make_complaint, replicas, monkeypatch, path):
+    user_id, headers = make_user("citizen")
+    complaint_id = make_complaint(user_id)
+    replica_reads = []
+    monkeypatch.setattr(database, "_get_replica_connection", lambda: replica_reads.append(True))
+    response = client.get(path.format(id=complaint_id), headers=headers, buffered=False)
+    assert response.status_code == 200
+    response.close()
+    assert replica_reads == []
@@ -0,0 +1,93 @@
+import pytest
+from flask import Flask
+import database
+from database import get_db_connection, after_commit
+from utils.response import success_response, error_response
+
+
+@pytest.fixture
+def unit_app(_database):
+    """A bare app with the request-transaction hooks, so routes can be added per test."""
+    app = Flask(__name__)
+    database.init_app(app)
+    return app
+
+
+def category_names(db):
+    with db.cursor() as cursor:
+        cursor.execute("SELECT name FROM categories WHERE name LIKE 'Unit %%' ORDER BY name")
+        return [row[0] for row in cursor.fetchall()]
+
+
+def insert_category(name):
+    conn = get_db_connection()
+    conn.cursor().execute("INSERT INTO categories (name) VALUES (%s)", (name,))
+    return conn
+
+
+def test_success_response_commits(unit_app, db):
+    @unit_app.route('/ok', methods=['POST'])
+    def ok():
+        insert_category('Unit ok')
+        return success_response()
+
+    assert unit_app.test_client().post('/ok').status_code == 200
+    assert category_names(db) == ['Unit ok']
+    db.cursor().execute("DELETE FROM categories WHERE name LIKE 'Unit %%'")
+
+
+def test_error_response_rolls_back(unit_app, db):
+    @unit_app.route('/bad', methods=['POST'])
+    def bad():
+        insert_category('Unit bad')
+        return error_response("Nope", 400)
+
+    assert unit_app.test_client().post('/bad').status_code == 400
+    assert category_names(db) == []
+
+
+def test_model_rollback_turns_success_into_500(unit_app, db):
+    ran = []
+
+    @unit_app.route('/partial', methods=['POST'])
+    def partial():
+        conn = insert_category('Unit first')
+        after_commit(lambda: ran.append('first'))
+        conn.rollback()     # a model's error path
+        insert_category('Unit second')
+        return success_response()
+
+    response = unit_app.test_client().post('/partial')
+    assert response.status_code == 500
+    assert category_names(db) == []
+    assert ran == []
+
+
+def test_after_commit_hooks_run_only_after_commit(unit_app, db):
+    ran = []
+
+    @unit_app.route('/hooked', methods=['POST'])
+    def hooked():
+        insert_category('Unit hooked')
+        after_commit(lambda: ran.append(category_names(db)))
+        assert ran == []
+        return success_response()
+
+    @unit_app.route('/hooked-error', methods=['POST'])
+    def hooked_error():
+        insert_category('Unit error')
+        after_commit(lambda: ran.append('error'))
+        return error_response("Nope", 409)
+
+    client = unit_app.test_client()
+    assert client.post('/hooked').status_code == 200
+    assert ran == [['Unit hooked']]
+    assert client.post('/hooked-error').status_code == 409
+    assert ran == [['Unit hooked']]
+    db.cursor().execute("DELETE FROM categories WHERE name LIKE 'Unit %%'")
+
+
+def test_after_commit_outside_a_request_runs_now(_database):
+    ran = []
+    after_commit(lambda: ran.append(True))
+    assert ran == [True]
@@ -0,0 +1,116 @@
+from models.complaint_model import Complaint, ComplaintStats
+
+
+def recount(db):
+    """The rollup computed from scratch, as rebuild() would."""
+    with db.cursor() as cursor:
+        cursor.execute("""
+            SELECT created_at::date, COALESCE(category_id, 0), COALESCE(status, 'Pending'), COALESCE(resolution_type, ''), COUNT(*)
+            FROM complaints GROUP BY 1, 2, 3, 4
+        """)
+        return {tuple(row[:4]): row[4] for row in cursor.fetchall()}
+
+
+def rollup(db):
+    with db.cursor() as cursor:
+        cursor.execute("SELECT day, category_id, status, resolution_type, complaints FROM complaint_daily_stats WHERE complaints <> 0")
+        return {tuple(row[:4]): row[4] for row in cursor.fetchall()}
+
+
+def delta_count(db):
+    with db.cursor() as cursor:
+        cursor.execute("SELECT COUNT(*) FROM complaint_stats_deltas")
+        return cursor.fetchone()[0]
+
+
+def by_status(summary):
+    return {row["status"]: row["complaints"] for row in summary["by_status"]}
+
+
+def test_deltas_track_inserts_updates_and_deletes(db, make_user, make_complaint):
+    user_id, _ = make_user("citizen")
+    routed, moved, deleted = (make_complaint(user_id) for _ in range(3))
+    with db.cursor() as cursor:
+        # One statement, many rows: a single aggregated delta per key
+        cursor.execute("INSERT INTO complaints (user_id, category_id, description, location) "
+                       "SELECT %s, 2, 'Bulk', 'Main St' FROM generate_series(1, 4)", (user_id,))
+    assert Complaint.route_to_government(routed)[0]
+    with db.cursor() as cursor:
+        cursor.execute("UPDATE complaints SET category_id = 2 WHERE id = %s", (moved,))
+        cursor.execute("DELETE FROM complaints WHERE id = %s", (deleted,))
+
+    ComplaintStats._cache.clear()
+    summary = ComplaintStats.summary()
+    assert summary["total"] == 6
+    assert by_status(summary) == {"Pending": 5, "Routed": 1}
+
+    pending = delta_count(db)
+    assert ComplaintStats.fold() == pending > 0
+    assert delta_count(db) == 0
+    assert rollup(db) == recount(db)
+    ComplaintStats._cache.clear()
+    assert ComplaintStats.summary() == summary
+
+
+def test_updates_that_change_no_key_append_nothing(db, make_user, make_complaint):
+    user_id, _ = make_user("citizen")
+    complaint_id = make_complaint(user_id)
+    before = delta_count(db)
+    with db.cursor() as cursor:
+        cursor.execute("UPDATE complaints SET description = 'Still broken', updated_at = clock_timestamp() WHERE id = %s",
+                       (complaint_id,))
+        cursor.execute("UPDATE complaints SET status = status, category_id = category_id WHERE id = %s", (complaint_id,))
+    assert delta_count(db) == before
+
+
+def test_fold_keeps_the_summary_and_matches_a_rebuild(db, make_user, make_complaint):
+    user_id, _ = make_user("citizen")
+    for status in ('Pending', 'Pending', 'Resolved'):
+        make_complaint(user_id, status=status)
+    assert ComplaintStats.fold() == 3
+    make_complaint(user_id)
+    ComplaintStats._cache.clear()
+    assert by_status(ComplaintStats.summary()) == {"Pending": 3, "Resolved": 1}
+
+    assert ComplaintStats.rebuild() is not False
+    assert delta_count(db) == 0
+    assert rollup(db) == recount(db)
+    assert ComplaintStats.fold() == 0
+
+
+def test_analytics_rejects_a_malformed_category_id(client, make_user):
+    _, headers = make_user("admin")
+    response = client.get('/api/admin/analytics', headers=headers, query_string={'category_id': 'abc'})
+    assert response.status_code == 400
+    assert client.get('/api/admin/analytics', headers=headers, query_string={'category_id': '1'}).status_code == 200
+
+
+def test_summary_folds_once_enough_deltas_are_pending(db, make_user, make_complaint, monkeypatch):
+    from config import Config
+    monkeypatch.setattr(Config, "ANALYTICS_FOLD_THRESHOLD", 3)
+    user_id, _ = make_user("citizen")
+    make_complaint(user_id)
+    make_complaint(user_id)
+    ComplaintStats._cache.clear()
+    assert ComplaintStats.summary()["total"] == 2
+    assert delta_count(db) == 2
+    make_complaint(user_id)
+    ComplaintStats._cache.clear()
+    assert ComplaintStats.summary()["total"] == 3
+    assert delta_count(db) == 0
+
+
+def test_concurrent_folds_skip_instead_of_waiting(db, _database, make_user, make_complaint):
+    import psycopg2
+    user_id, _ = make_user("citizen")
+    make_complaint(user_id)
+    other = psycopg2.connect(_database)
+    try:
+        with other.cursor() as cursor:
+            cursor.execute("SELECT pg_advisory_xact_lock(%s)", (ComplaintStats.FOLD_LOCK_KEY,))
+            assert ComplaintStats.fold() == 0
+            assert delta_count(db) == 1
+    finally:
+        other.rollback()
+        other.close()
+    assert ComplaintStats.fold() == 1
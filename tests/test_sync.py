@@ -0,0 +1,63 @@
+import time
+from config import Config
+
+
+def test_insert_is_stamped_with_the_clock_not_the_transaction_start(db, make_user):
+    user_id, _ = make_user("citizen")
+    db.autocommit = False
+    with db.cursor() as cursor:
+        cursor.execute("SELECT now()")
+        started = cursor.fetchone()[0]
+        cursor.execute("SELECT pg_sleep(0.05)")
+        cursor.execute(
+            "INSERT INTO complaints (user_id, category_id, description, location) VALUES (%s, 1, 'x', 'y') RETURNING updated_at",
+            (user_id,)
+        )
+        assert cursor.fetchone()[0] > started.replace(tzinfo=None)
+    db.commit()
+    db.autocommit = True
+
+
+def test_since_token_returns_changes_and_tombstones(client, db, make_user, make_complaint, monkeypatch):
+    monkeypatch.setattr(Config, "SYNC_OVERLAP_SECONDS", 0)
+    user_id, headers = make_user("citizen")
+    kept, changed, deleted = (make_complaint(user_id) for _ in range(3))
+
+    first = client.get('/api/complaints/my', headers=headers).get_json()
+    assert {row['id'] for row in first['data']} == {kept, changed, deleted}
+    assert first['meta']['full'] is True
+
+    time.sleep(0.01)
+    with db.cursor() as cursor:
+        cursor.execute("UPDATE complaints SET description = 'Still broken' WHERE id = %s", (changed,))
+        cursor.execute("DELETE FROM complaints WHERE id = %s", (deleted,))
+    added = make_complaint(user_id)
+
+    delta = client.get('/api/complaints/my', headers=headers,
+                       query_string={'since': first['meta']['since']}).get_json()
+    assert {row['id'] for row in delta['data']} == {changed, added}
+    assert delta['meta']['deleted'] == [deleted]
+    assert delta['meta']['full'] is False
+
+    # Nothing new: an empty delta
+    again = client.get('/api/complaints/my', headers=headers,
+                       query_string={'since': delta['meta']['since']}).get_json()
+    assert again['data'] == [] and again['meta']['deleted'] == []
+
+
+def test_reassigned_complaint_leaves_the_officer_list(client, db, make_user, make_complaint, monkeypatch):
+    monkeypatch.setattr(Config, "SYNC_OVERLAP_SECONDS", 0)
+    citizen_id, _ = make_user("citizen")
+    officer_id, headers = make_user("officer")
+    other_officer_id, _ = make_user("officer")
+    complaint_id = make_complaint(citizen_id, assigned_officer_id=officer_id)
+
+    first = client.get('/api/officer/assigned', headers=headers).get_json()
+    assert [row['id'] for row in first['data']] == [complaint_id]
+    time.sleep(0.01)
+    with db.cursor() as cursor:
+        cursor.execute("UPDATE complaints SET assigned_officer_id = %s WHERE id = %s", (other_officer_id, complaint_id))
+
+    delta = client.get('/api/officer/assigned', headers=headers,
+                       query_string={'since': first['meta']['since']}).get_json()
+    assert delta['data'] == [] and delta['meta']['deleted'] == [complaint_id]
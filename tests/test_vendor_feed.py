@@ -0,0 +1,75 @@
+import datetime
+from models.complaint_model import Complaint
+
+# What /api/vendor/available used to serve: Complaint.get_all() filtered in Python
+OLD_FEED = """
+    SELECT c.*, cat.name as category_name, u.name as citizen_name
+    FROM complaints c
+    JOIN categories cat ON c.category_id = cat.id
+    JOIN users u ON c.user_id = u.id
+    ORDER BY c.created_at DESC
+"""
+
+
+def old_feed(db, vendor_id, service_type=None, exclude_quoted=False):
+    with db.cursor() as cursor:
+        cursor.execute(OLD_FEED)
+        names = [column.name for column in cursor.description]
+        rows = [dict(zip(names, row)) for row in cursor.fetchall()]
+        cursor.execute("SELECT complaint_id FROM quotations WHERE vendor_id = %s", (vendor_id,))
+        quoted = {row[0] for row in cursor.fetchall()}
+    jobs = [c for c in rows if c['resolution_type'] == 'private' and c['status'] == 'Awaiting Quotes']
+    if service_type and service_type != 'General':
+        jobs = [c for c in jobs if c['category_name'] == service_type
+                or (service_type == 'Waste Management' and c['category_name'] == 'Garbage')]
+    if exclude_quoted:
+        jobs = [c for c in jobs if c['id'] not in quoted]
+    return jobs
+
+
+def new_feed(vendor_id, service_type=None, exclude_quoted=False, limit=2):
+    jobs, after = [], None
+    while True:
+        page, has_more = Complaint.get_available_for_vendor(vendor_id, service_type, exclude_quoted, after, limit)
+        jobs.extend(page)
+        if not has_more:
+            return jobs
+        after = (page[-1]['created_at'], page[-1]['id'])
+
+
+def test_feed_matches_the_old_filter(db, make_user, make_complaint):
+    citizen_id, _ = make_user("citizen")
+    vendor_id, _ = make_user("vendor", service_type="Waste Management")
+    with db.cursor() as cursor:
+        cursor.execute("SELECT name, id FROM categories")
+        categories = dict(cursor.fetchall())
+    start = datetime.datetime(2026, 1, 1)
+    layout = [
+        ('Garbage', 'Awaiting Quotes', 'private'), ('Road Damage', 'Awaiting Quotes', 'private'),
+        ('Garbage', 'Awaiting Quotes', 'private'), ('Street Light', 'Awaiting Quotes', 'private'),
+        ('Garbage', 'Awaiting Quotes', 'government'), ('Garbage', 'In Progress', 'private'),
+        ('Garbage', 'Pending', None), ('Drainage', 'Awaiting Quotes', 'private'),
+        ('Garbage', 'Awaiting Quotes', 'private'),
+    ]
+    ids = [make_complaint(citizen_id, categories[name], status, resolution_type,
+                          created_at=start + datetime.timedelta(hours=i))
+           for i, (name, status, resolution_type) in enumerate(layout)]
+    # Two jobs created in the same instant still page in a stable order
+    ids.append(make_complaint(citizen_id, categories['Garbage'], 'Awaiting Quotes', 'private',
+                              created_at=start + datetime.timedelta(hours=8)))
+    with db.cursor() as cursor:
+        for complaint_id in (ids[0], ids[3]):
+            cursor.execute("INSERT INTO quotations (complaint_id, vendor_id, price, estimated_time) "
+                           "VALUES (%s, %s, 100, '2 days')", (complaint_id, vendor_id))
+
+    for service_type in (None, 'Waste Management', 'Road Damage'):
+        for exclude_quoted in (False, True):
+            expected = old_feed(db, vendor_id, service_type, exclude_quoted)
+            got = new_feed(vendor_id, service_type, exclude_quoted)
+            assert {c['id'] for c in got} == {c['id'] for c in expected}, (service_type, exclude_quoted)
+            assert len(got) == len(expected)
+            # Same newest-first order wherever created_at differs
+            assert [c['created_at'] for c in got] == [c['created_at'] for c in expected]
+            old_by_id = {c['id']: c for c in expected}
+            for job in got:
+                assert {k: old_by_id[job['id']][k] for k in job} == job
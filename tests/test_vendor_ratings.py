@@ -0,0 +1,61 @@
+from decimal import Decimal
+from models.complaint_model import Complaint
+from models.vendor_model import Vendor
+
+# What the rating used to be: an AVG over the vendor's whole feedback history
+RECOMPUTED = """
+    SELECT v.user_id, v.rating_sum, v.rating_count, v.rating,
+           COALESCE(SUM(f.rating), 0) AS expected_sum, COUNT(f.rating) AS expected_count,
+           COALESCE(ROUND(AVG(f.rating), 2), 0) AS expected_rating
+    FROM vendors v
+    LEFT JOIN complaints c ON c.selected_vendor_id = v.user_id
+    LEFT JOIN feedback f ON f.complaint_id = c.id
+    GROUP BY v.user_id, v.rating_sum, v.rating_count, v.rating
+    ORDER BY v.user_id
+"""
+
+
+def assert_matches_recompute(db):
+    with db.cursor() as cursor:
+        cursor.execute(RECOMPUTED)
+        rows = cursor.fetchall()
+    assert rows
+    for user_id, rating_sum, rating_count, rating, expected_sum, expected_count, expected_rating in rows:
+        assert (rating_sum, rating_count, rating) == (expected_sum, expected_count, expected_rating), user_id
+
+
+def test_feedback_folds_into_the_vendor_rating(db, make_user, make_complaint):
+    citizen_id, _ = make_user("citizen")
+    busy_id, _ = make_user("vendor")
+    quiet_id, _ = make_user("vendor")
+    make_user("vendor")  # no feedback at all
+    for rating in (5, 4, 4, 2, 3):
+        complaint_id = make_complaint(citizen_id, status='Resolved', selected_vendor_id=busy_id)
+        assert Complaint.submit_feedback(complaint_id, rating, "ok")
+    assert Complaint.submit_feedback(make_complaint(citizen_id, status='Resolved', selected_vendor_id=quiet_id), 1, "")
+    # Feedback on a job with no selected vendor moves nobody's rating
+    assert Complaint.submit_feedback(make_complaint(citizen_id, status='Resolved'), 5, "")
+
+    assert_matches_recompute(db)
+    with db.cursor() as cursor:
+        cursor.execute("SELECT rating_sum, rating_count, rating FROM vendors WHERE user_id = %s", (busy_id,))
+        assert cursor.fetchone() == (18, 5, Decimal("3.60"))
+
+
+def test_rebuild_catches_up_with_edited_and_deleted_feedback(db, make_user, make_complaint):
+    # The API only ever inserts feedback; edits made out of band are reconciled by
+    # `manage.py rebuild-vendor-ratings`, which must land on the same numbers as AVG
+    citizen_id, _ = make_user("citizen")
+    vendor_id, _ = make_user("vendor")
+    complaints = [make_complaint(citizen_id, status='Resolved', selected_vendor_id=vendor_id) for _ in range(4)]
+    for complaint_id, rating in zip(complaints, (5, 3, 1, 4)):
+        assert Complaint.submit_feedback(complaint_id, rating, "")
+    with db.cursor() as cursor:
+        cursor.execute("UPDATE feedback SET rating = 2 WHERE complaint_id = %s", (complaints[0],))
+        cursor.execute("DELETE FROM feedback WHERE complaint_id = %s", (complaints[2],))
+
+    assert Vendor.rebuild_ratings() == 1
+    assert_matches_recompute(db)
+    with db.cursor() as cursor:
+        cursor.execute("SELECT rating_sum, rating_count, rating FROM vendors WHERE user_id = %s", (vendor_id,))
+        assert cursor.fetchone() == (9, 3, Decimal("3.00"))
@@ -0,0 +1,60 @@
+from models.complaint_model import Complaint
+from models.quotation_model import Quotation
+from models.vendor_model import VendorStats
+
+# The three queries get_vendor_stats used to run per dashboard load
+OLD_STATS = (
+    "SELECT COUNT(*) FROM quotations WHERE vendor_id = %(vendor)s AND status = 'Pending'",
+    "SELECT COUNT(*) FROM complaints WHERE selected_vendor_id = %(vendor)s AND status = 'Resolved'",
+    """
+    SELECT SUM(q.price)
+    FROM complaints c
+    JOIN quotations q ON c.id = q.complaint_id AND c.selected_vendor_id = q.vendor_id
+    WHERE c.selected_vendor_id = %(vendor)s AND c.status = 'Resolved'
+    """,
+)
+
+
+def old_stats(db, vendor_id):
+    values = []
+    with db.cursor() as cursor:
+        for query in OLD_STATS:
+            cursor.execute(query, {"vendor": vendor_id})
+            values.append(cursor.fetchone()[0] or 0)
+    return {"active_bids": values[0], "completed_jobs": values[1], "total_earnings": float(values[2])}
+
+
+def assert_matches_old(db, vendors):
+    for vendor_id in vendors:
+        stats = Complaint.get_vendor_stats(vendor_id)
+        assert {k: stats[k] for k in ("active_bids", "completed_jobs", "total_earnings")} == old_stats(db, vendor_id), vendor_id
+        assert stats["computed_at"]
+
+
+def test_counters_match_the_old_queries(db, make_user, make_complaint):
+    citizen_id, _ = make_user("citizen")
+    vendors = [make_user("vendor")[0] for _ in range(3)]
+    jobs = [make_complaint(citizen_id, status='Awaiting Quotes', resolution_type='private') for _ in range(4)]
+    for job in jobs:
+        for vendor_id, price in zip(vendors, (200, 250.75, 300)):
+            assert Quotation.create(job, vendor_id, price, "2 days")
+    assert_matches_old(db, vendors)
+
+    assert Complaint.approve_quotation(jobs[0], vendors[0])
+    assert Complaint.approve_quotation(jobs[1], vendors[1])
+    assert Complaint.approve_quotation(jobs[2], vendors[1])
+    assert_matches_old(db, vendors)
+
+    for job in jobs[:3]:
+        assert Complaint.update_status(job, 'In Progress')
+        assert Complaint.update_status(job, 'Resolved', "Fixed")
+    assert_matches_old(db, vendors)
+
+    # Reopening a resolved job takes it back out of completed jobs and earnings
+    assert Complaint.update_status(jobs[2], 'In Progress')
+    assert Complaint.update_status(jobs[0], 'Resolved', "Still fixed")
+    assert_matches_old(db, vendors)
+
+    # And the rebuild command lands on the same numbers
+    assert VendorStats.rebuild() == len(vendors)
+    assert_matches_old(db, vendors)
@@ -1,23 +1,113 @@
 from functools import wraps
-from flask import request, jsonify
+from flask import request, jsonify, current_app
+import hashlib
+import time
 import jwt
 from config import Config
+from database import after_commit
+from models.user_model import User
 from contextlib import contextmanager
+from utils.cache import TTLCache
+
+# Already-verified tokens, keyed by SHA-256 of the token. An entry lives until the token's `exp`
+# but at most TOKEN_RECHECK_SECONDS: revocations are stored in the database (logout from one
+# worker must hold on all of them), and a cache miss is when they are looked up again.
+_verified_tokens = TTLCache(maxsize=Config.TOKEN_CACHE_SIZE)
+
+
+class TokenRevoked(jwt.InvalidTokenError):
+    pass
+
+
+def _digest(token):
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def query_token_allowed(f):
+    """
+    Lets a route take its token from ?access_token=. Only for event streams: EventSource cannot
+    send headers, and query strings end up in access logs and Referer headers. Apply below
+    @token_required.
+    """
+    f.query_token_allowed = True
+    return f
+
+
+def get_bearer_token():
+    auth_header = request.headers.get('Authorization', '')
+    if auth_header.startswith("Bearer "):
+        return auth_header.split(" ")[1]
+    view = current_app.view_functions.get(request.endpoint)
+    if getattr(view, 'query_token_allowed', False):
+        return request.args.get('access_token')
+    return None
+
+
+def verify_token(token):
+    """
+    Returns the token payload. The signature and the revocation tables are checked on a
+    cache miss, i.e. the first time a token is seen and every TOKEN_RECHECK_SECONDS after that.
+    Raises jwt.InvalidTokenError (or TokenRevoked) like jwt.decode does.
+    """
+    digest = _digest(token)
+    data = _verified_tokens.get(digest)
+    if data is None:
+        data = jwt.decode(token, Config.SECRET_KEY, algorithms=["HS256"])
+        # `iat` is whole seconds, as is users.tokens_valid_after
+        revoked = User.is_token_revoked(digest, data.get('id'), int(data.get('iat', 0)))
+        if revoked is None:
+            raise jwt.InvalidTokenError("Could not check token revocation")
+        if revoked:
+            raise TokenRevoked("Token has been revoked")
+        expires_at = time.time() + Config.TOKEN_RECHECK_SECONDS
+        if data.get('exp'):
+            expires_at = min(expires_at, data['exp'])
+        _verified_tokens.set(digest, data, expires_at=expires_at)
+
+    # Hand out a copy so a route mutating request.user cannot poison the cache
+    return dict(data)
+
+
+def revoke_token(token):
+    """Logs one token out everywhere. False if the revocation could not be stored."""
+    digest = _digest(token)
+    try:
+        exp = jwt.decode(token, options={"verify_signature": False}).get('exp')
+    except jwt.InvalidTokenError:
+        exp = None
+    if not User.revoke_token(digest, exp or time.time() + Config.TOKEN_LIFETIME_HOURS * 3600):
+        return False
+    # This worker forgets the token once the revocation is committed; others within TOKEN_RECHECK_SECONDS
+    after_commit(lambda: _verified_tokens.pop(digest))
+    return True
+
+
+def revoke_user(user_id):
+    """
+    Invalidates every token issued to user_id up to now. Tokens carry `iat` in whole seconds,
+    so a token issued later within the same second is rejected as well.
+    """
+    if not User.revoke_all_tokens(user_id, int(time.time())):
+        return False
+    # Cached entries are keyed by token, not user: start this worker's cache over
+    after_commit(_verified_tokens.clear)
+    return True
+
+
+def token_cache_stats():
+    return _verified_tokens.stats()
+
 
 def token_required(f):
     @wraps(f)
     def decorated(*args, **kwargs):
-        token = None
-        if 'Authorization' in request.headers:
-            auth_header = request.headers['Authorization']
-            if auth_header.startswith("Bearer "):
-                token = auth_header.split(" ")[1]
-        
+        token = get_bearer_token()
+
         if not token:
             return jsonify({'message': 'Token is missing!', 'success': False}), 403
 
         try:
-            data = jwt.decode(token, Config.SECRET_KEY, algorithms=["HS256"])
+            data = verify_token(token)
             # Inject user data into kwargs or g (global context)
             # Here keeping it simple by passing 'current_user' to route if it accepts it
             # But standard Flask way is to use g OR just pass data.
@@ -0,0 +1,216 @@
+"""
+Content-addressed blob store for complaint, proof and job update images.
+
+Images are stored once per SHA-256 digest and rows keep only a short reference,
+"/api/blobs/<digest>", which clients can use directly as an image URL. The filesystem
+backend lays files out as <root>/ab/cd/<digest>; another backend (object storage, ...) only
+has to provide the same put_stream / open / path / exists methods and be returned by
+get_blob_store().
+
+Thumbnails are generated on first request when Pillow is installed.
+"""
+import base64
+import binascii
+import hashlib
+import io
+import os
+import re
+import tempfile
+import threading
+from config import Config
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+BLOB_URL_PREFIX = "/api/blobs/"
+CHUNK_SIZE = 64 * 1024
+
+_DIGEST_RE = re.compile(r"^[0-9a-f]{64}$")
+_DATA_URL_RE = re.compile(r"^data:([\w.+-]+/[\w.+-]+)?(;[\w-]+=[^;,]*)*;base64,", re.IGNORECASE)
+
+# Magic numbers of the formats the app accepts; anything else is served as octet-stream
+_SIGNATURES = (
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+    (b"%PDF-", "application/pdf"),
+)
+
+
+# What POST /api/blobs accepts; older stored content may be of any type in _SIGNATURES
+UPLOAD_CONTENT_TYPES = ("image/jpeg", "image/png", "image/gif", "image/webp")
+SNIFF_SIZE = 16
+
+
+class InvalidBlob(ValueError):
+    pass
+
+
+class BlobTooLarge(InvalidBlob):
+    pass
+
+
+def make_ref(digest):
+    return BLOB_URL_PREFIX + digest
+
+
+def parse_ref(value):
+    """The digest a stored reference points at, or None for anything else (URLs, inline data, ...)."""
+    if isinstance(value, str) and value.startswith(BLOB_URL_PREFIX):
+        digest = value[len(BLOB_URL_PREFIX):]
+        if _DIGEST_RE.match(digest):
+            return digest
+    return None
+
+
+def is_valid_digest(digest):
+    return bool(_DIGEST_RE.match(digest or ""))
+
+
+def sniff_content_type(head):
+    for signature, content_type in _SIGNATURES:
+        if head.startswith(signature):
+            return content_type
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    return "application/octet-stream"
+
+
+def _check_content_type(head, content_types):
+    if sniff_content_type(head) not in content_types:
+        raise InvalidBlob(f"Unsupported file type; allowed: {', '.join(content_types)}")
+
+
+class FilesystemBlobStore:
+    def __init__(self, root, max_size):
+        self.root = root
+        self.max_size = max_size
+        self._tmp_dir = os.path.join(root, "tmp")
+        os.makedirs(self._tmp_dir, exist_ok=True)
+
+    def path(self, digest, suffix=""):
+        return os.path.join(self.root, digest[:2], digest[2:4], digest + suffix)
+
+    def exists(self, digest):
+        return os.path.exists(self.path(digest))
+
+    def open(self, digest):
+        return open(self.path(digest), "rb")
+
+    def put_stream(self, stream, content_types=None):
+        """
+        Copies a file-like object into the store chunk by chunk, hashing as it goes.
+        Returns (digest, size). Identical content is stored once. With `content_types`, content
+        whose magic bytes are not one of those types is rejected with InvalidBlob.
+        """
+        sha = hashlib.sha256()
+        size = 0
+        head = b""
+        fd, tmp_path = tempfile.mkstemp(dir=self._tmp_dir)
+        try:
+            with os.fdopen(fd, "wb") as tmp:
+                while True:
+                    chunk = stream.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    size += len(chunk)
+                    if size > self.max_size:
+                        raise BlobTooLarge(f"Blob exceeds {self.max_size} bytes")
+                    if content_types and len(head) < SNIFF_SIZE:
+                        head += chunk[:SNIFF_SIZE - len(head)]
+                        if len(head) == SNIFF_SIZE:
+                            _check_content_type(head, content_types)
+                    sha.update(chunk)
+                    tmp.write(chunk)
+            if size == 0:
+                raise InvalidBlob("Empty upload")
+            if content_types and len(head) < SNIFF_SIZE:
+                _check_content_type(head, content_types)
+
+            digest = sha.hexdigest()
+            final_path = self.path(digest)
+            if os.path.exists(final_path):
+                os.unlink(tmp_path)
+            else:
+                os.makedirs(os.path.dirname(final_path), exist_ok=True)
+                os.replace(tmp_path, final_path)
+            return digest, size
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+    def put_bytes(self, data):
+        return self.put_stream(io.BytesIO(data))
+
+    def thumbnail(self, digest, size):
+        """Path of a JPEG thumbnail no larger than size x size, or None when it cannot be made."""
+        if Image is None:
+            return None
+        thumb_path = self.path(digest, f".thumb{size}.jpg")
+        if os.path.exists(thumb_path):
+            return thumb_path
+        try:
+            with Image.open(self.path(digest)) as img:
+                img.thumbnail((size, size))
+                fd, tmp_path = tempfile.mkstemp(dir=self._tmp_dir)
+                with os.fdopen(fd, "wb") as tmp:
+                    img.convert("RGB").save(tmp, "JPEG", quality=80)
+            os.replace(tmp_path, thumb_path)
+            return thumb_path
+        except Exception as e:
+            print(f"Error generating thumbnail for {digest}: {e}")
+            return None
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_blob_store():
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = FilesystemBlobStore(Config.BLOB_STORE_PATH, Config.BLOB_MAX_SIZE)
+    return _store
+
+
+def decode_inline_image(value):
+    """Bytes of a base64 string or data: URL, or None when the value is not inline data."""
+    if not isinstance(value, str) or not value or parse_ref(value):
+        return None
+    match = _DATA_URL_RE.match(value)
+    if match:
+        payload = value[match.end():]
+    elif "://" in value or value.startswith("/") or len(value) < 64:
+        # Plain URLs and paths stay as they are
+        return None
+    else:
+        payload = value
+    try:
+        return base64.b64decode(payload.strip(), validate=True)
+    except (binascii.Error, ValueError):
+        if match:
+            raise InvalidBlob("Malformed base64 image data")
+        return None
+
+
+def externalize(value):
+    """
+    Moves inline image data into the blob store and returns its reference. References, URLs,
+    None and anything else that is not inline data are returned unchanged. Raises InvalidBlob
+    for malformed or oversized data; if the store itself is unavailable the value is kept inline.
+    """
+    data = decode_inline_image(value)
+    if data is None:
+        return value
+    try:
+        digest, _ = get_blob_store().put_bytes(data)
+    except OSError as e:
+        print(f"WARNING: Blob store unavailable, keeping image inline: {e}")
+        return value
+    return make_ref(digest)
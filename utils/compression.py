@@ -0,0 +1,96 @@
+"""
+gzip / brotli response compression.
+
+List payloads repeat the same category names, statuses and vendor names on every row (and
+sometimes carry base64 images), so they shrink several times over. Bodies under
+COMPRESSION_MIN_SIZE are sent as-is. Compressed bodies are cached under a hash of the
+uncompressed bytes, so a payload that many pollers fetch is compressed only once per worker.
+Hashing is far cheaper than compressing, and unlike a weak ETag the hash can never map two
+different bodies (say, two JSON encodings of the same version) to one cache entry.
+"""
+import gzip
+import hashlib
+from flask import request
+from config import Config
+from utils.cache import TTLCache
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+_COMPRESSIBLE = ('application/json', 'application/x-ndjson', 'text/')
+
+# (body digest, encoding) -> compressed bytes
+_compressed_bodies = TTLCache(maxsize=max(1, Config.COMPRESSION_CACHE_SIZE), ttl=Config.COMPRESSION_CACHE_TTL)
+
+
+def choose_encoding(accepted):
+    """Preferred encoding for a parsed Accept-Encoding header (werkzeug Accept), or None."""
+    if brotli is not None and accepted['br']:
+        return 'br'
+    if accepted['gzip']:
+        return 'gzip'
+    return None
+
+
+def _compress(data, encoding):
+    if encoding == 'br':
+        return brotli.compress(data, quality=Config.BROTLI_LEVEL)
+    # mtime=0 keeps the output byte-identical for identical input
+    return gzip.compress(data, compresslevel=Config.COMPRESSION_LEVEL, mtime=0)
+
+
+def compress_response(response):
+    response.vary.add('Accept-Encoding')
+
+    # Streamed exports and send_file responses are left alone: compressing them would mean
+    # buffering the whole body in memory
+    if response.direct_passthrough or response.is_streamed:
+        return response
+    if response.status_code < 200 or response.status_code in (204, 206, 304):
+        return response
+    if 'Content-Encoding' in response.headers or not response.mimetype.startswith(_COMPRESSIBLE):
+        return response
+    if response.content_length is not None and response.content_length < Config.COMPRESSION_MIN_SIZE:
+        return response
+
+    encoding = choose_encoding(request.accept_encodings)
+    if encoding is None:
+        return response
+
+    body = compress_body(response.get_data(), encoding)
+    if body is None:
+        return response
+
+    response.set_data(body)
+    response.headers['Content-Encoding'] = encoding
+    return response
+
+
+def compress_body(data, encoding):
+    """
+    `data` compressed with `encoding`, from the cache when the same bytes were compressed
+    before. Returns None when the body is under COMPRESSION_MIN_SIZE.
+    """
+    if len(data) < Config.COMPRESSION_MIN_SIZE:
+        return None
+    if Config.COMPRESSION_CACHE_SIZE <= 0:
+        return _compress(data, encoding)
+    key = (hashlib.blake2b(data, digest_size=16).digest(), encoding)
+    body = _compressed_bodies.get(key)
+    if body is None:
+        body = _compress(data, encoding)
+        _compressed_bodies.set(key, body)
+    return body
+
+
+def compression_cache_stats():
+    stats = _compressed_bodies.stats()
+    stats["brotli"] = brotli is not None
+    return stats
+
+
+def init_app(app):
+    if Config.COMPRESSION_ENABLED:
+        app.after_request(compress_response)
@@ -0,0 +1,34 @@
+"""
+ETag / If-None-Match support for polled list endpoints.
+
+Routes ask the model for a cheap version string of the caller's scope (row count + newest
+updated_at) before running the full query; when it matches the client's ETag we answer
+304 Not Modified and skip both the heavy join and the serialization.
+"""
+import hashlib
+from flask import request, current_app
+
+
+def compute_etag(path, args, version, *scope):
+    """Weak validator for a path + (key, value) query arguments + caller scope at the given data version."""
+    if version is None:
+        return None
+    args = "&".join(f"{k}={v}" for k, v in sorted(args))
+    raw = "|".join([path, args, *(str(part) for part in scope), version])
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
+def list_etag(version, *scope):
+    """compute_etag for the current request."""
+    return compute_etag(request.path, request.args.items(multi=True), version, *scope)
+
+
+def etag_matches(etag):
+    return etag is not None and request.if_none_match.contains_weak(etag)
+
+
+def not_modified_response(etag):
+    response = current_app.response_class(status=304)
+    response.set_etag(etag, weak=True)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
@@ -0,0 +1,243 @@
+"""
+Job progress push via Postgres LISTEN/NOTIFY.
+
+Writers call notify() inside their transaction; Postgres delivers the notification only if
+that transaction commits. Each worker process runs ONE listener thread on ONE dedicated
+connection and fans notifications out to in-process subscriber queues, so the number of
+open streams does not change the number of database connections.
+
+A subscriber is only handed out once LISTEN is active, so history read after subscribe()
+cannot miss an event. Notifications sent while the listener is reconnecting are lost; every
+open stream then gets a "resync" event, on which clients refetch the state they show.
+
+NOTIFY goes through the server session, so EVENTS_DATABASE_URL must point at a direct
+(non-pgbouncer / non "-pooler") endpoint when DATABASE_URL is a transaction pooler.
+"""
+import os
+import queue
+import select
+import threading
+import time
+from flask import Response
+from config import Config
+from utils.json_provider import dumps_bytes, loads
+
+CHANNEL = "civic_events"
+# Postgres rejects NOTIFY payloads of 8000 bytes or more
+MAX_PAYLOAD = 7900
+
+
+class EventsUnavailable(Exception):
+    pass
+
+
+class TooManySubscribers(EventsUnavailable):
+    pass
+
+
+def notify(cursor, event_type, complaint_id, user_id, data):
+    """
+    Queues an event on the writer's transaction. `data` must be JSON-serializable; a long
+    `message` is truncated to respect the payload limit (the full row is in the history endpoints).
+    """
+    event = {"type": event_type, "complaint_id": complaint_id, "user_id": user_id, "data": data}
+    payload = dumps_bytes(event)
+    if len(payload) > MAX_PAYLOAD and isinstance(data.get("message"), str):
+        overflow = len(payload) - MAX_PAYLOAD
+        data = dict(data, message=data["message"][:max(0, len(data["message"]) - overflow - 16)] + "…",
+                    truncated=True)
+        event["data"] = data
+        payload = dumps_bytes(event)
+    if len(payload) > MAX_PAYLOAD:
+        event["data"] = {"truncated": True}
+        payload = dumps_bytes(event)
+    cursor.execute("SELECT pg_notify(%s, %s)", (CHANNEL, payload.decode("utf-8")))
+
+
+class Subscription:
+    def __init__(self, hub, keys):
+        self.hub = hub
+        self.keys = keys
+        self.queue = queue.Queue(maxsize=Config.EVENTS_QUEUE_SIZE)
+        # Set when the subscriber fell too far behind; the stream ends and the client reconnects
+        self.overflowed = False
+
+    def get(self, timeout):
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        self.hub.unsubscribe(self)
+
+
+class EventHub:
+    def __init__(self, dsn=None):
+        self.dsn = dsn
+        self._subscribers = {}   # ("complaint", id) | ("user", id) -> set of Subscription
+        self._count = 0
+        self._lock = threading.Lock()
+        self._thread = None
+        self._listening = threading.Event()   # set while LISTEN is active on the listener connection
+        self._connected_before = False
+
+    def subscribe(self, complaint_id=None, user_id=None):
+        keys = []
+        if complaint_id is not None:
+            keys.append(("complaint", complaint_id))
+        if user_id is not None:
+            keys.append(("user", user_id))
+        subscription = Subscription(self, keys)
+        with self._lock:
+            if self._count >= Config.EVENTS_MAX_SUBSCRIBERS:
+                raise TooManySubscribers("Too many open event streams")
+            for key in keys:
+                self._subscribers.setdefault(key, set()).add(subscription)
+            self._count += 1
+            self._ensure_listener()
+        # The caller reads history right after this: only safe once notifications are being received
+        if not self._listening.wait(Config.EVENTS_LISTEN_TIMEOUT):
+            subscription.close()
+            raise EventsUnavailable("Event stream unavailable, retry shortly")
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            removed = False
+            for key in subscription.keys:
+                subscribers = self._subscribers.get(key)
+                if subscribers and subscription in subscribers:
+                    subscribers.discard(subscription)
+                    removed = True
+                    if not subscribers:
+                        del self._subscribers[key]
+            if removed:
+                self._count -= 1
+
+    def stats(self):
+        with self._lock:
+            return {"subscribers": self._count, "keys": len(self._subscribers),
+                    "listening": self._listening.is_set()}
+
+    def dispatch(self, event):
+        keys = [("complaint", event.get("complaint_id")), ("user", event.get("user_id"))]
+        with self._lock:
+            targets = set()
+            for key in keys:
+                targets |= self._subscribers.get(key, set())
+        for subscription in targets:
+            try:
+                subscription.queue.put_nowait(event)
+            except queue.Full:
+                subscription.overflowed = True
+
+    def broadcast(self, event):
+        with self._lock:
+            targets = set().union(*self._subscribers.values())
+        for subscription in targets:
+            try:
+                subscription.queue.put_nowait(event)
+            except queue.Full:
+                subscription.overflowed = True
+
+    def _ensure_listener(self):
+        # Called with self._lock held
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._listen_forever, name="event-listener", daemon=True)
+            self._thread.start()
+
+    def _listen_forever(self):
+        from database import open_connection
+        backoff = 1
+        while True:
+            conn = open_connection(self.dsn)
+            if conn is None:
+                time.sleep(backoff)
+                backoff = min(backoff * 2, 30)
+                continue
+            try:
+                conn.autocommit = True
+                with conn.cursor() as cursor:
+                    cursor.execute(f"LISTEN {CHANNEL}")
+                backoff = 1
+                self._listening.set()
+                if self._connected_before:
+                    # Whatever was notified while we were disconnected is gone
+                    self.broadcast({"type": "resync", "data": {"reason": "reconnected"}})
+                self._connected_before = True
+                while True:
+                    # Wake up now and then even when idle, so a dead connection is noticed
+                    if select.select([conn], [], [], 30) == ([], [], []):
+                        with conn.cursor() as cursor:
+                            cursor.execute("SELECT 1")
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        notification = conn.notifies.pop(0)
+                        try:
+                            self.dispatch(loads(notification.payload))
+                        except ValueError:
+                            print(f"Ignoring malformed event payload: {notification.payload[:100]}")
+            except Exception as e:
+                print(f"Event listener lost its connection, reconnecting: {e}")
+            finally:
+                self._listening.clear()
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+            time.sleep(backoff)
+
+
+_hub = None
+_hub_pid = None
+_hub_lock = threading.Lock()
+
+
+def get_hub():
+    """The worker's EventHub; re-created after a fork since threads do not survive it."""
+    global _hub, _hub_pid
+    if _hub is None or _hub_pid != os.getpid():
+        with _hub_lock:
+            if _hub is None or _hub_pid != os.getpid():
+                _hub = EventHub(Config.EVENTS_DATABASE_URL)
+                _hub_pid = os.getpid()
+    return _hub
+
+
+def format_event(event_type, data):
+    """One Server-Sent Events frame."""
+    return f"event: {event_type}\n".encode() + b"data: " + dumps_bytes(data) + b"\n\n"
+
+
+def stream_response(subscription, backlog):
+    """
+    text/event-stream response: the `backlog` frames once, then live events as they are
+    dispatched, with keepalive comments in between. The stream does not touch the database,
+    so it holds no pooled connection while open.
+    """
+    def generate():
+        try:
+            yield b"retry: 5000\n\n"
+            for frame in backlog:
+                yield frame
+            while True:
+                event = subscription.get(Config.EVENTS_HEARTBEAT)
+                if subscription.overflowed:
+                    # Too slow to keep up: end the stream, the browser reconnects and gets a fresh backlog
+                    break
+                if event is None:
+                    yield b": keepalive\n\n"
+                    continue
+                yield format_event(event["type"], event["data"])
+        finally:
+            subscription.close()
+
+    response = Response(generate(), mimetype="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no",
+    })
+    # Also covers clients that disconnect before the generator ever starts
+    response.call_on_close(subscription.close)
+    return response
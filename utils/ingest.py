@@ -0,0 +1,143 @@
+"""
+Parsing and validation for bulk complaint ingest (NDJSON or CSV from partner channels).
+
+Records are checked here, in one pass over the input, and the valid ones are written out
+as COPY-ready CSV. Category names and user ids are resolved later, set-based, by
+Complaint.bulk_ingest against the staging table.
+"""
+import csv
+import datetime
+import io
+import tempfile
+from utils.json_provider import loads
+from utils.blob_store import externalize, InvalidBlob
+
+INGEST_FORMATS = ('ndjson', 'csv')
+RESOLUTION_TYPES = ('government', 'private')
+
+# Column order of the staging table (see Complaint.bulk_ingest)
+STAGING_COLUMNS = ("line", "user_id", "category_id", "category_name", "description", "location",
+                   "image_path", "resolution_type", "created_at")
+
+MAX_TEXT_LENGTH = 10000
+MAX_REPORTED_REJECTS = 1000
+
+
+def read_records(stream, fmt):
+    """Yields (line_number, record_dict or None, error or None) for a binary stream."""
+    text = io.TextIOWrapper(stream, encoding="utf-8", errors="replace", newline="")
+    if fmt == 'csv':
+        reader = csv.DictReader(text)
+        for record in reader:
+            yield reader.line_num, record, None
+        return
+    for line_number, line in enumerate(text, 1):
+        if not line.strip():
+            continue
+        try:
+            record = loads(line)
+        except ValueError:
+            yield line_number, None, "Invalid JSON"
+            continue
+        if not isinstance(record, dict):
+            yield line_number, None, "Expected a JSON object"
+            continue
+        yield line_number, record, None
+
+
+def _text(record, key):
+    value = record.get(key)
+    if value is None:
+        return None
+    value = str(value).strip()
+    return value or None
+
+
+def _int(record, key):
+    value = _text(record, key)
+    if value is None:
+        return None
+    value = int(value)
+    if value <= 0:
+        raise ValueError
+    return value
+
+
+def validate_record(record, default_user_id):
+    """Returns (staging_row_without_line, None) or (None, error message)."""
+    description = _text(record, 'description')
+    location = _text(record, 'location')
+    if not description or not location:
+        return None, "Description and Location are required"
+    if len(description) > MAX_TEXT_LENGTH or len(location) > MAX_TEXT_LENGTH:
+        return None, "Description or Location too long"
+
+    try:
+        user_id = _int(record, 'user_id') or default_user_id
+        category_id = _int(record, 'category_id')
+    except ValueError:
+        return None, "user_id and category_id must be positive integers"
+    if not user_id:
+        return None, "user_id is required"
+    category_name = _text(record, 'category')
+    if not category_id and not category_name:
+        return None, "category or category_id is required"
+
+    resolution_type = _text(record, 'resolution_type')
+    if resolution_type and resolution_type not in RESOLUTION_TYPES:
+        return None, f"resolution_type must be one of: {', '.join(RESOLUTION_TYPES)}"
+
+    created_at = _text(record, 'created_at')
+    if created_at:
+        try:
+            created_at = datetime.datetime.fromisoformat(created_at.replace("Z", "+00:00"))
+        except ValueError:
+            return None, "Invalid created_at"
+        # complaints.created_at is a naive UTC timestamp
+        if created_at.tzinfo is not None:
+            created_at = created_at.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+        created_at = created_at.isoformat()
+
+    try:
+        image_path = externalize(_text(record, 'image_path'))
+    except InvalidBlob as e:
+        return None, str(e)
+
+    return (user_id, category_id, category_name, description, location,
+            image_path, resolution_type, created_at), None
+
+
+class IngestBatch:
+    """
+    Validated rows spooled as COPY-ready CSV (in memory up to a few MB, then on disk),
+    plus the rows that were rejected on the way.
+    """
+
+    def __init__(self):
+        self.buffer = tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024, mode="w+", newline="")
+        self.writer = csv.writer(self.buffer)
+        self.accepted = 0
+        self.rejected = []
+        self.rejected_count = 0
+
+    def reject(self, line_number, error):
+        self.rejected_count += 1
+        if len(self.rejected) < MAX_REPORTED_REJECTS:
+            self.rejected.append({"line": line_number, "error": error})
+
+    def close(self):
+        self.buffer.close()
+
+
+def build_batch(stream, fmt, default_user_id):
+    batch = IngestBatch()
+    for line_number, record, error in read_records(stream, fmt):
+        if record is not None:
+            row, error = validate_record(record, default_user_id)
+        if error:
+            batch.reject(line_number, error)
+            continue
+        batch.writer.writerow((line_number,) + row)
+        batch.accepted += 1
+    batch.buffer.seek(0)
+    return batch
@@ -0,0 +1,106 @@
+"""
+Fast JSON provider for Flask.
+
+Uses orjson when it is installed and the stdlib json module otherwise. Output matches Flask's
+DefaultJSONProvider on the wire: keys sorted, Decimal -> string, date/datetime -> HTTP date
+(set JSON_DATETIME_FORMAT=iso for ISO 8601 instead).
+"""
+import dataclasses
+import datetime
+import decimal
+import json
+import uuid
+from flask.json.provider import DefaultJSONProvider
+from werkzeug.http import http_date
+from config import Config
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class RawJSON:
+    """Already-encoded JSON bytes. success_response splices these into the envelope without re-encoding."""
+    __slots__ = ("data",)
+
+    def __init__(self, data):
+        self.data = data
+
+
+_DAYS = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+_MONTHS = ("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec")
+
+
+def _http_date(o):
+    # Same output as werkzeug.http.http_date, without its per-call overhead, for the
+    # naive (UTC) timestamps psycopg2 returns for TIMESTAMP columns
+    if type(o) is datetime.datetime and o.tzinfo is None:
+        return (f"{_DAYS[o.weekday()]}, {o.day:02d} {_MONTHS[o.month - 1]} {o.year:04d} "
+                f"{o.hour:02d}:{o.minute:02d}:{o.second:02d} GMT")
+    return http_date(o)
+
+
+def _default(o):
+    if isinstance(o, decimal.Decimal):
+        return str(o)
+    if isinstance(o, datetime.date):
+        if Config.JSON_DATETIME_FORMAT == 'iso':
+            return o.isoformat()
+        return _http_date(o)
+    if isinstance(o, uuid.UUID):
+        return str(o)
+    if dataclasses.is_dataclass(o) and not isinstance(o, type):
+        return dataclasses.asdict(o)
+    if hasattr(o, "__html__"):
+        return str(o.__html__())
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+if orjson is not None:
+    # Passthrough so datetimes/dataclasses go through _default and stay identical to the default provider
+    _ORJSON_OPTIONS = orjson.OPT_SORT_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+
+    def dumps_bytes(obj):
+        return orjson.dumps(obj, default=_default, option=_ORJSON_OPTIONS)
+
+    def loads(s):
+        return orjson.loads(s)
+else:
+    _encoder = json.JSONEncoder(default=_default, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+
+    def dumps_bytes(obj):
+        return _encoder.encode(obj).encode("utf-8")
+
+    def loads(s):
+        return json.loads(s)
+
+
+def encode_rows(rows):
+    """Encodes query results once, e.g. in the model layer, so callers can cache or pass the bytes along."""
+    return RawJSON(dumps_bytes(rows))
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            # Callers asking for specific json.dumps options (indent, ...) get the stdlib path
+            kwargs.setdefault("default", _default)
+            return json.dumps(obj, **kwargs)
+        return dumps_bytes(obj).decode("utf-8")
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return json.loads(s, **kwargs)
+        return loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        # Skip the bytes -> str -> bytes round trip of the base implementation
+        return self._app.response_class(dumps_bytes(obj), mimetype=self.mimetype)
+
+
+def init_app(app):
+    if Config.JSON_PROVIDER == 'fast':
+        app.json_provider_class = FastJSONProvider
+        app.json = FastJSONProvider(app)
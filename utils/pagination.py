@@ -0,0 +1,81 @@
+import base64
+import datetime
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 200
+
+
+def parse_limit(value, default=DEFAULT_LIMIT, maximum=MAX_LIMIT):
+    """Clamps a ?limit= query value into [1, maximum]; falls back to default when missing or invalid."""
+    try:
+        limit = int(value) if value not in (None, '') else default
+    except (TypeError, ValueError):
+        return default
+    return max(1, min(limit, maximum))
+
+
+def parse_fields(value):
+    """
+    Splits a ?fields=id,status,... value into names. None (missing) selects the listing's
+    summary projection; "all" selects every column. Names are checked by the model.
+    """
+    if not value:
+        return None
+    return [name.strip() for name in value.split(",") if name.strip()] or None
+
+
+def encode_cursor(created_at, row_id):
+    """Opaque keyset token for the (created_at, id) position of the last row on a page."""
+    raw = f"{created_at.isoformat()}|{row_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token):
+    """Inverse of encode_cursor. Raises ValueError for malformed tokens."""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode()).decode()
+        created_at, row_id = raw.rsplit("|", 1)
+        return datetime.datetime.fromisoformat(created_at), int(row_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+def parse_date(value, end_of_range=False):
+    """
+    Accepts YYYY-MM-DD or a full ISO timestamp. Returns None when missing, raises ValueError when malformed.
+    With end_of_range=True a bare date is moved to the following midnight so "to=2024-05-01" includes that day.
+    """
+    if not value:
+        return None
+    try:
+        parsed = datetime.datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"Invalid date: {value}")
+    if end_of_range and len(value) == 10:
+        parsed += datetime.timedelta(days=1)
+    return parsed
+
+
+def parse_id(value, name):
+    """Reads an integer id filter. Returns None when missing, raises ValueError when malformed."""
+    if value in (None, ''):
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"{name} must be an integer")
+
+
+def encode_since(timestamp):
+    """Opaque delta-sync token for a database timestamp (see utils/sync.py)."""
+    return base64.urlsafe_b64encode(timestamp.isoformat().encode()).decode().rstrip("=")
+
+
+def decode_since(token):
+    """Inverse of encode_since. Raises ValueError for malformed tokens."""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        return datetime.datetime.fromisoformat(base64.urlsafe_b64decode(padded.encode()).decode())
+    except Exception:
+        raise ValueError("Invalid since token")
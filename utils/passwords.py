@@ -0,0 +1,98 @@
+"""
+Password hashing off the request thread.
+
+scrypt/pbkdf2 are deliberately CPU- and memory-heavy, so hashes are computed in a small process
+pool instead of inline in the Flask worker. The pool accepts at most
+PASSWORD_HASH_WORKERS + PASSWORD_HASH_QUEUE jobs at once; beyond that callers get HashingBusy
+immediately and the route answers 503 instead of stalling every other endpoint.
+"""
+import hmac
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from werkzeug.security import generate_password_hash, check_password_hash
+from config import Config
+
+
+class HashingBusy(Exception):
+    """Raised when the hashing pool is saturated (or too slow); routes answer 503."""
+
+
+_executor = None
+_executor_pid = None
+_executor_lock = threading.Lock()
+_slots = threading.BoundedSemaphore(max(1, Config.PASSWORD_HASH_WORKERS + Config.PASSWORD_HASH_QUEUE))
+_method_prefix = None
+
+
+def _get_executor():
+    global _executor, _executor_pid
+    if Config.PASSWORD_HASH_WORKERS <= 0:
+        return None
+    if _executor is not None and _executor_pid == os.getpid():
+        return _executor
+    with _executor_lock:
+        if _executor is None or _executor_pid != os.getpid():
+            try:
+                # Spawned, not forked: the workers only need werkzeug, and forking a threaded server
+                # would copy its locks and open pool connections into every child
+                _executor = ProcessPoolExecutor(max_workers=Config.PASSWORD_HASH_WORKERS,
+                                                mp_context=multiprocessing.get_context("spawn"))
+                _executor_pid = os.getpid()
+            except Exception as e:
+                # e.g. no /dev/shm on some serverless runtimes: fall back to hashing inline
+                print(f"WARNING: Password hashing pool unavailable, hashing inline: {e}")
+                Config.PASSWORD_HASH_WORKERS = 0
+                return None
+    return _executor
+
+
+def _run(fn, *args):
+    executor = _get_executor()
+    if executor is None:
+        return fn(*args)
+    if not _slots.acquire(blocking=False):
+        raise HashingBusy("Password hashing queue is full")
+    try:
+        future = executor.submit(fn, *args)
+    except Exception:
+        _slots.release()
+        raise
+    future.add_done_callback(lambda _: _slots.release())
+    try:
+        return future.result(timeout=Config.PASSWORD_HASH_TIMEOUT)
+    except FutureTimeout:
+        raise HashingBusy("Password hashing timed out")
+
+
+def hash_password(password):
+    return _run(generate_password_hash, password, Config.PASSWORD_HASH_METHOD)
+
+
+def is_hashed(stored):
+    return stored.startswith(("scrypt:", "pbkdf2:")) and stored.count("$") >= 2
+
+
+def verify_password(stored, password):
+    if not stored or not isinstance(password, str):
+        return False
+    if is_hashed(stored):
+        return _run(check_password_hash, stored, password)
+    # Plain text seed accounts (see migrations.TEST_USERS) - upgraded by needs_rehash() on login
+    return hmac.compare_digest(stored.encode(), password.encode())
+
+
+def _current_method_prefix():
+    """The "method:params" part werkzeug writes for PASSWORD_HASH_METHOD, e.g. "scrypt:32768:8:1"."""
+    global _method_prefix
+    if _method_prefix is None:
+        _method_prefix = generate_password_hash("", Config.PASSWORD_HASH_METHOD).split("$", 1)[0]
+    return _method_prefix
+
+
+def needs_rehash(stored):
+    """True for plain text passwords and for hashes made with another method or cost."""
+    if not is_hashed(stored):
+        return True
+    return stored.split("$", 1)[0] != _current_method_prefix()
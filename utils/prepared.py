@@ -0,0 +1,186 @@
+"""
+Server-side prepared statements for the hot model queries.
+
+Models run their hot queries through execute(cursor, name, sql, params) instead of
+cursor.execute(sql, params). The first call on a connection sends PREPARE; every call runs
+EXECUTE, so Postgres skips parsing and (after a few runs) planning the big joins.
+Prepared statements belong to the server session, so they are tracked per psycopg2
+connection: a reconnect or a recycled pool connection simply prepares again.
+
+SQL-level PREPARE does not survive a transaction-mode pooler (pgbouncer, Neon's "-pooler"
+endpoints), where each transaction may land on another session. DB_PREPARED_STATEMENTS=auto
+(the default) turns the cache off for connections to such DSNs, primary and replicas alike;
+"off" forces plain execution everywhere.
+
+A session that lost its statements anyway (DISCARD ALL, a proxy switching sessions) or a
+plan invalidated by a migration ("cached plan must not change result type") is repaired on
+the spot: the failed EXECUTE is rolled back to a savepoint, the statements are prepared
+again and the query is retried once.
+"""
+import re
+import threading
+import weakref
+import psycopg2
+import psycopg2.errors
+from config import Config
+
+# Distinct SQL texts kept per query name (field projections, optional filters, ...);
+# further variants run unprepared rather than filling every session with statements
+MAX_VARIANTS = 16
+
+_PLACEHOLDER = re.compile(r"%([s%])")
+
+# Set in the same round trip as every EXECUTE inside a transaction, so a failed EXECUTE can be
+# undone without aborting the caller's transaction, and released right after a successful one:
+# left open they would nest once per call, and a later write gives every open level a
+# subtransaction id (past 64 per backend, the whole cluster contends on pg_subtrans).
+_SAVEPOINT = "SAVEPOINT prepared_execute; "
+
+
+def to_positional(sql):
+    """Rewrites psycopg2 %s placeholders as $1, $2, ... for PREPARE. Returns (sql, parameter count)."""
+    count = 0
+
+    def positional(match):
+        nonlocal count
+        if match.group(1) == "%":
+            return "%"
+        count += 1
+        return f"${count}"
+
+    return _PLACEHOLDER.sub(positional, sql), count
+
+
+class _Statement:
+    __slots__ = ("name", "query_name", "prepare_sql", "execute_sql", "executions", "prepares", "failed")
+
+    def __init__(self, name, query_name, sql):
+        body, count = to_positional(sql)
+        self.name = name
+        self.query_name = query_name
+        self.prepare_sql = f"PREPARE {name} AS {body}"
+        self.execute_sql = f"EXECUTE {name} ({', '.join(['%s'] * count)})" if count else f"EXECUTE {name}"
+        self.executions = 0
+        self.prepares = 0
+        self.failed = False
+
+
+_statements = {}                          # (query name, sql) -> _Statement
+_variants = {}                            # query name -> variants registered
+_prepared = weakref.WeakKeyDictionary()   # psycopg2 connection -> names prepared in its session
+_enabled_connections = weakref.WeakKeyDictionary()   # psycopg2 connection -> enabled(its DSN)
+_lock = threading.Lock()
+
+
+def enabled(dsn=None):
+    """Whether statements are prepared on connections to `dsn` (default: DATABASE_URL)."""
+    mode = Config.DB_PREPARED_STATEMENTS
+    if mode == 'auto':
+        url = (Config.DATABASE_URL if dsn is None else dsn) or ''
+        return '-pooler' not in url and 'pgbouncer' not in url
+    return mode == 'on'
+
+
+def _statement(query_name, sql):
+    key = (query_name, sql)
+    statement = _statements.get(key)
+    if statement is None:
+        with _lock:
+            statement = _statements.get(key)
+            if statement is None:
+                variant = _variants.get(query_name, 0)
+                if variant >= MAX_VARIANTS:
+                    return None
+                _variants[query_name] = variant + 1
+                statement = _statements[key] = _Statement(f"{query_name}_{variant}", query_name, sql)
+    return statement
+
+
+def _prepare(cursor, statement):
+    # Inside a transaction a failed PREPARE (e.g. a parameter type Postgres cannot infer)
+    # must not abort the caller's work, hence the savepoint
+    in_transaction = not cursor.connection.autocommit
+    if in_transaction:
+        cursor.execute("SAVEPOINT prepare_statement")
+    try:
+        cursor.execute(statement.prepare_sql)
+    except psycopg2.Error as e:
+        if in_transaction:
+            cursor.execute("ROLLBACK TO SAVEPOINT prepare_statement")
+        statement.failed = True
+        print(f"WARNING: Could not prepare {statement.name}, running it unprepared: {e}")
+        return False
+    if in_transaction:
+        cursor.execute("RELEASE SAVEPOINT prepare_statement")
+    with _lock:
+        statement.prepares += 1
+    return True
+
+
+def _connection_enabled(conn):
+    # The DSN of this very connection: replicas can sit behind a pooler when the primary does not
+    with _lock:
+        allowed = _enabled_connections.get(conn)
+        if allowed is None:
+            allowed = _enabled_connections[conn] = enabled(conn.dsn)
+    return allowed
+
+
+def execute(cursor, query_name, sql, params=None):
+    """Same effect as cursor.execute(sql, params), through a statement prepared once per connection."""
+    conn = cursor.connection
+    statement = _statement(query_name, sql) if _connection_enabled(conn) else None
+    if statement is None or statement.failed:
+        cursor.execute(sql, params)
+        return
+
+    with _lock:
+        names = _prepared.get(conn)
+        if names is None:
+            names = _prepared[conn] = set()
+    if statement.name not in names:
+        if not _prepare(cursor, statement):
+            cursor.execute(sql, params)
+            return
+        names.add(statement.name)
+
+    in_transaction = not conn.autocommit
+    try:
+        cursor.execute((_SAVEPOINT if in_transaction else "") + statement.execute_sql, params or None)
+    except (psycopg2.errors.InvalidSqlStatementName, psycopg2.errors.FeatureNotSupported) as e:
+        # The session lost its statements or a migration changed a table under a "SELECT *"
+        # plan: drop whatever this session still has, prepare again and retry once
+        print(f"WARNING: Re-preparing statements on this connection: {e}")
+        if in_transaction:
+            cursor.execute("ROLLBACK TO SAVEPOINT prepared_execute; RELEASE SAVEPOINT prepared_execute")
+        cursor.execute("DEALLOCATE ALL")
+        names.clear()
+        if not _prepare(cursor, statement):
+            cursor.execute(sql, params)
+            return
+        names.add(statement.name)
+        cursor.execute(statement.execute_sql, params or None)
+    else:
+        if in_transaction:
+            # Another cursor, so the caller's result set stays fetchable
+            with conn.cursor() as release:
+                release.execute("RELEASE SAVEPOINT prepared_execute")
+    with _lock:
+        statement.executions += 1
+
+
+def registered():
+    """(statement name, sql) of every query variant this process has run through execute()."""
+    with _lock:
+        return [(statement.name, sql) for (_, sql), statement in _statements.items()]
+
+
+def stats():
+    with _lock:
+        statements = [{"name": s.name, "query": s.query_name, "executions": s.executions,
+                       "prepares": s.prepares, "failed": s.failed} for s in _statements.values()]
+    return {
+        "enabled": enabled(),
+        "replicas_enabled": [enabled(url) for url in Config.DATABASE_REPLICA_URLS],
+        "statements": sorted(statements, key=lambda s: -s["executions"]),
+    }
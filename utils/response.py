@@ -1,11 +1,32 @@
-from flask import jsonify
+from flask import jsonify, current_app
+from utils.json_provider import RawJSON, dumps_bytes
 
-def success_response(data=None, message="Success", status_code=200):
-    return jsonify({
-        "success": True,
-        "message": message,
-        "data": data
-    }), status_code
+def success_response(data=None, message="Success", status_code=200, meta=None, etag=None):
+    if isinstance(data, RawJSON):
+        response, status_code = _raw_success_response(data, message, status_code, meta)
+    else:
+        body = {
+            "success": True,
+            "message": message,
+            "data": data
+        }
+        # Pagination / sync information travels next to the data so `data` keeps its shape
+        if meta is not None:
+            body["meta"] = meta
+        response = jsonify(body)
+    if etag:
+        # Clients may keep the body but must revalidate it (see utils/conditional.py)
+        response.set_etag(etag, weak=True)
+        response.headers['Cache-Control'] = 'private, no-cache'
+    return response, status_code
+
+def _raw_success_response(data, message, status_code, meta):
+    # Same envelope (and key order) as jsonify produces, with the pre-encoded data spliced in
+    body = b'{"data":' + data.data + b',"message":' + dumps_bytes(message)
+    if meta is not None:
+        body += b',"meta":' + dumps_bytes(meta)
+    body += b',"success":true}'
+    return current_app.response_class(body, mimetype="application/json"), status_code
 
 def error_response(message="Error", status_code=400):
     return jsonify({
@@ -0,0 +1,61 @@
+"""
+Delta sync for the citizen, vendor and officer complaint lists.
+
+A client sends back the `meta.since` token of its previous response as ?since=<token> and
+receives only the rows whose updated_at is newer, plus `meta.deleted`: ids that left its list
+(deleted or reassigned, from the complaint_tombstones table). Clients apply `deleted` first
+and then upsert `data` by id. Tokens overlap by SYNC_OVERLAP_SECONDS, so a row may be sent
+twice but a row written by a transaction still in flight is not missed.
+"""
+from flask import request
+from models.complaint_model import Complaint
+from utils.pagination import encode_since, decode_since
+
+
+def read_since():
+    """The decoded ?since= token, or None. Raises ValueError for malformed tokens."""
+    token = request.args.get('since')
+    return decode_since(token) if token else None
+
+
+def sync_list(scope, scope_id, since, fetch):
+    """
+    Runs fetch(since) for the scope and returns (rows, meta), or (None, None) on a database
+    error. A token older than the tombstone retention gets the full list with meta.reset = true.
+    """
+    next_since, deleted, reset = Complaint.sync_point(scope, scope_id, since)
+    if next_since is None:
+        return None, None
+    rows = fetch(None if reset else since)
+    if not rows and Complaint.last_error:
+        return None, None
+    return rows, _sync_meta(rows, since, next_since, deleted, reset)
+
+
+async def sync_list_async(scope, scope_id, since, fetch):
+    """sync_list for the async serving mode: `fetch` is a coroutine function returning rows or None."""
+    from models.async_complaint_model import AsyncComplaint
+    from async_database import read_routing
+    next_since, deleted, reset = await AsyncComplaint.sync_point(scope, scope_id, since)
+    if next_since is None:
+        return None, None
+    # next_since is the primary's clock: a replica lagging by more than SYNC_OVERLAP_SECONDS
+    # would miss rows committed just before it, and no later token would return them
+    with read_routing(primary=True):
+        rows = await fetch(None if reset else since)
+    if rows is None:
+        return None, None
+    return rows, _sync_meta(rows, since, next_since, deleted, reset)
+
+
+def _sync_meta(rows, since, next_since, deleted, reset):
+    # A complaint that left and came back since the token is in `data`, not `deleted`
+    present = {row['id'] for row in rows}
+    meta = {
+        "since": encode_since(next_since),
+        "deleted": [complaint_id for complaint_id in deleted if complaint_id not in present],
+        "full": since is None or reset,
+    }
+    if reset:
+        meta["reset"] = True
+    return meta